@@ -280,8 +280,10 @@ def main():
                 # 파일 삭제
                 if DATA_FILE.exists():
                     DATA_FILE.unlink()
-                for snapshot_file in snapshots_dir.glob("*.json"):
-                    snapshot_file.unlink()
+                # JSON 스냅샷과 실시간 버퍼 스냅샷(.npy) 모두 삭제 (남아 있으면 재시작 시 이전 버퍼가 복원됨)
+                for pattern in ("*.json", "*.npy"):
+                    for snapshot_file in snapshots_dir.glob(pattern):
+                        snapshot_file.unlink()
                 st.success("초기화 완료!")
                 time.sleep(1)
                 st.rerun()
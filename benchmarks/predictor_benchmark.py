@@ -0,0 +1,304 @@
+# benchmarks/predictor_benchmark.py
+#
+# 예측기 학습/추론 벤치마크
+#   python -m benchmarks.predictor_benchmark                          # 10^4, 10^5, 10^6행 x 전체 모델
+#   python -m benchmarks.predictor_benchmark --rows 10000 10000000 --models RandomForest LogisticRegression
+#   python -m benchmarks.predictor_benchmark --compare base.json head.json
+#
+# (행 수, 모델) 조합마다 새 프로세스에서 실행해 최대 RSS가 다른 조합의 영향을 받지 않도록 합니다.
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# 반복되는 행이 예측 캐시에 적중해 지연시간이 작게 측정되지 않도록 캐시를 끔 (import 전에 설정)
+os.environ.setdefault('PREDICTION_CACHE_SIZE', '0')
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+
+from benchmarks.synthetic import make_die_casting_data
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+DEFAULT_MODELS = ['RandomForest', 'GradientBoosting', 'ExtraTrees', 'LogisticRegression', 'SVM']
+
+# 모델별 최대 행 수 (넘으면 건너뜀 - SVM은 학습 비용이 행 수의 제곱 이상으로 증가)
+MODEL_ROW_LIMITS = {
+    'SVM': 20_000,
+    'GradientBoosting': 1_000_000,
+    'RandomForest': 1_000_000,
+    'ExtraTrees': 1_000_000,
+    'LogisticRegression': 10_000_000
+}
+
+# 단일 행 지연시간 / 리플레이 조회 측정 횟수
+SINGLE_ROW_SAMPLES = 1000
+REPLAY_LOOKUP_SAMPLES = 200
+
+RESULTS_DIR = project_root / "benchmarks" / "results"
+
+# 비교 시 값이 클수록 좋은 지표 (나머지는 작을수록 좋음)
+HIGHER_IS_BETTER = {'batch_rows_per_second'}
+COMPARED_METRICS = ['fit_seconds', 'batch_rows_per_second', 'single_row_p50_ms', 'single_row_p99_ms',
+                    'lookup_p50_ms', 'lookup_p99_ms', 'peak_rss_mb']
+
+def _peak_rss_mb():
+    # Linux의 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _latency(seconds, prefix):
+    ms = np.asarray(seconds) * 1000
+    return {
+        f'{prefix}_p50_ms': float(np.percentile(ms, 50)),
+        f'{prefix}_p99_ms': float(np.percentile(ms, 99)),
+        f'{prefix}_mean_ms': float(ms.mean())
+    }
+
+def run_model_benchmark(model_name, n_rows, seed=42, single_row_samples=SINGLE_ROW_SAMPLES):
+    """
+    모델 하나의 학습 시간, 배치 처리량, 단일 행 지연시간, 최대 RSS 측정 (워커 프로세스에서 실행)
+
+    train_models와 같은 전처리(FeaturePipeline), 같은 분할(80/20 층화), 같은 후보 모델 설정을 쓰고,
+    추론은 predict_batch / predict_one 경로를 그대로 사용합니다.
+    """
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from models.predictor.die_casting_predictor import DiecastingQualityPredictor, SCALED_MODELS
+    from models.predictor.flat_forest import compile_model
+
+    result = {'benchmark': 'model', 'model': model_name, 'rows': n_rows}
+
+    started = time.perf_counter()
+    df = make_die_casting_data(n_rows, seed)
+    result['generate_seconds'] = time.perf_counter() - started
+
+    predictor = DiecastingQualityPredictor()
+    predictor.df = df
+    started = time.perf_counter()
+    processed = predictor._preprocess_features(copy=False)
+    result['preprocess_seconds'] = time.perf_counter() - started
+    del df, predictor.df
+
+    X = processed.drop(columns=[predictor.target_column])
+    y = (processed[predictor.target_column] == 'Pass').astype(int)
+    del processed
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    del X, y
+    result['data_rss_mb'] = _peak_rss_mb()
+
+    model = predictor._candidate_models()[model_name]
+    scaler = StandardScaler().fit(X_train) if model_name in SCALED_MODELS else None
+    started = time.perf_counter()
+    model.fit(scaler.transform(X_train) if scaler is not None else X_train, y_train)
+    result['fit_seconds'] = time.perf_counter() - started
+    result['train_rows'] = len(X_train)
+    del X_train, y_train
+
+    predictor.model = model
+    predictor.best_model_name = model_name
+    predictor.scaler = scaler
+    predictor.feature_columns = list(X_test.columns)
+    predictor.flat_model = compile_model(model)[1]
+    result['flat_forest'] = predictor.flat_model is not None
+
+    started = time.perf_counter()
+    predictions = predictor.predict_batch(X_test)
+    batch_seconds = time.perf_counter() - started
+    result['test_rows'] = len(X_test)
+    result['batch_seconds'] = batch_seconds
+    result['batch_rows_per_second'] = len(X_test) / batch_seconds if batch_seconds > 0 else None
+    result['auc'] = float(roc_auc_score(y_test, predictions['Probability_Pass']))
+
+    records = X_test.iloc[:single_row_samples].to_dict('records')
+    timings = []
+    for record in records:
+        started = time.perf_counter()
+        predictor.predict_one(record)
+        timings.append(time.perf_counter() - started)
+    result.update(_latency(timings, 'single_row'))
+
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+def run_replay_lookup_benchmark(n_rows, seed=42, samples=REPLAY_LOOKUP_SAMPLES):
+    """
+    data/test.py get_current_data_by_id의 id 조회(test[test['id'] == id]) 지연시간 측정
+
+    모델 점수화는 제외하고, 리플레이 전처리를 거친 테이블에서 행을 찾아 피처 벡터를 꺼내는 비용만 잽니다.
+    """
+    from models.predictor.feature_pipeline import FeaturePipeline
+
+    result = {'benchmark': 'replay_lookup', 'model': None, 'rows': n_rows}
+    df = make_die_casting_data(n_rows, seed)
+    df['working'] = np.where(df['working'] == 1, '가동', '비가동')
+
+    pipeline = FeaturePipeline.for_replay()
+    started = time.perf_counter()
+    df = df[~df['working'].isna()]
+    df = df[~pipeline.outlier_mask(df)]
+    test = pipeline.fit_transform(df).reset_index(drop=True)
+    result['preprocess_seconds'] = time.perf_counter() - started
+    del df
+
+    feature_columns = [col for col in test.columns if col not in ('id', 'passorfail')]
+    ids = np.random.default_rng(seed).choice(test['id'].to_numpy(), size=min(samples, len(test)), replace=False)
+    timings = []
+    for record_id in ids:
+        started = time.perf_counter()
+        sample = test[test['id'] == record_id]
+        sample.iloc[0][feature_columns].values
+        timings.append(time.perf_counter() - started)
+    result.update(_latency(timings, 'lookup'))
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+def _git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=project_root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=project_root,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+def environment_info():
+    import pandas as pd
+    import sklearn
+
+    commit, dirty = _git_commit()
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'started_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__
+    }
+
+def _run_isolated(func, *args):
+    """새 프로세스(spawn)에서 func 실행 - 최대 RSS를 조합별로 분리"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(func, *args).result()
+
+def run_benchmarks(rows=DEFAULT_ROWS, models=DEFAULT_MODELS, seed=42, row_limits=MODEL_ROW_LIMITS,
+                   replay_lookup=True):
+    """
+    행 수 x 모델 조합 벤치마크 실행
+
+    Returns:
+        dict: {'environment': ..., 'results': [조합별 결과, ...]}
+    """
+    report = {'environment': environment_info(), 'results': []}
+    for n_rows in rows:
+        jobs = []
+        if replay_lookup:
+            jobs.append((run_replay_lookup_benchmark, (n_rows, seed), {'benchmark': 'replay_lookup', 'model': None}))
+        for name in models:
+            if n_rows > row_limits.get(name, float('inf')):
+                report['results'].append({'benchmark': 'model', 'model': name, 'rows': n_rows,
+                                          'skipped': f"행 수 제한 {row_limits[name]:,} 초과"})
+                continue
+            jobs.append((run_model_benchmark, (name, n_rows, seed), {'benchmark': 'model', 'model': name}))
+
+        for func, args, base in jobs:
+            print(f"▶ {base['model'] or base['benchmark']} / {n_rows:,}행 ...", flush=True)
+            started = time.perf_counter()
+            try:
+                result = _run_isolated(func, *args)
+            except Exception as e:
+                result = {**base, 'rows': n_rows, 'error': repr(e)}
+            result['wall_seconds'] = time.perf_counter() - started
+            report['results'].append(result)
+            print(f"  {_summary_line(result)}", flush=True)
+    return report
+
+def _summary_line(result):
+    if 'skipped' in result or 'error' in result:
+        return result.get('skipped') or result.get('error')
+    if result['benchmark'] == 'replay_lookup':
+        return (f"조회 p50 {result['lookup_p50_ms']:.2f}ms / p99 {result['lookup_p99_ms']:.2f}ms, "
+                f"RSS {result['peak_rss_mb']:.0f}MB")
+    return (f"학습 {result['fit_seconds']:.2f}s, 배치 {result['batch_rows_per_second']:,.0f}행/s, "
+            f"단일 행 p50 {result['single_row_p50_ms']:.2f}ms / p99 {result['single_row_p99_ms']:.2f}ms, "
+            f"RSS {result['peak_rss_mb']:.0f}MB, AUC {result['auc']:.3f}")
+
+def compare_reports(base, head, threshold=0.1):
+    """
+    두 결과 JSON의 같은 (벤치마크, 모델, 행 수) 조합을 비교
+
+    Returns:
+        (비교 행 리스트, 회귀 행 리스트) - 회귀: threshold 비율 이상 나빠진 지표
+    """
+    def key(result):
+        return result['benchmark'], result.get('model'), result['rows']
+
+    base_results = {key(result): result for result in base['results']}
+    rows, regressions = [], []
+    for result in head['results']:
+        previous = base_results.get(key(result))
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            row = {'benchmark': key(result), 'metric': metric, 'base': old, 'head': new, 'change': change}
+            rows.append(row)
+            if worse >= threshold:
+                regressions.append(row)
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="다이캐스팅 예측기 학습/추론 벤치마크")
+    parser.add_argument("--rows", type=float, nargs="+", default=DEFAULT_ROWS, help="합성 데이터 행 수 (예: 1e4 1e7)")
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS, help="측정할 후보 모델")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-limits", action="store_true", help="모델별 행 수 제한 무시")
+    parser.add_argument("--skip-replay", action="store_true", help="리플레이 id 조회 측정 생략")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: benchmarks/results/<시각>_<커밋>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="두 결과 JSON 비교")
+    parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 볼 변화 비율 (비교 모드)")
+    args = parser.parse_args()
+
+    if args.compare:
+        base, head = (json.loads(Path(path).read_text(encoding='utf-8')) for path in args.compare)
+        rows, regressions = compare_reports(base, head, args.threshold)
+        for row in rows:
+            flag = " ⚠️ 회귀" if row in regressions else ""
+            benchmark, model, n_rows = row['benchmark']
+            print(f"{benchmark:<14}{str(model or '-'):<20}{n_rows:>12,}  {row['metric']:<24}"
+                  f"{row['base']:>14.4g} → {row['head']:<14.4g}{row['change']:+8.1%}{flag}")
+        print(f"\n회귀 {len(regressions)}건 (기준 {args.threshold:.0%})")
+        sys.exit(1 if regressions else 0)
+
+    rows = [int(n) for n in args.rows]
+    limits = {} if args.no_limits else MODEL_ROW_LIMITS
+    report = run_benchmarks(rows, args.models, args.seed, limits, replay_lookup=not args.skip_replay)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{(report['environment']['commit'] or 'nogit')[:8]}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n💾 결과 저장: {output}")
+
+if __name__ == "__main__":
+    main()
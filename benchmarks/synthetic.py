@@ -0,0 +1,94 @@
+# benchmarks/synthetic.py
+import numpy as np
+import pandas as pd
+
+from variables.molds import MOLD_CODES
+
+# 수치 센서 컬럼별 (평균, 표준편차, 소수 자릿수) - 현장 데이터처럼 정수/소수 1자리 값
+SENSOR_DISTRIBUTIONS = {
+    'molten_temp': (720, 12, 0),
+    'facility_operation_cycleTime': (121, 8, 0),
+    'production_cycletime': (123, 8, 0),
+    'low_section_speed': (110, 8, 0),
+    'high_section_speed': (112, 10, 0),
+    'molten_volume': (85, 40, 0),
+    'cast_pressure': (325, 18, 0),
+    'biscuit_thickness': (50, 6, 0),
+    'upper_mold_temp1': (185, 30, 0),
+    'upper_mold_temp2': (160, 25, 0),
+    'upper_mold_temp3': (1200, 400, 0),
+    'lower_mold_temp1': (200, 35, 0),
+    'lower_mold_temp2': (200, 30, 0),
+    'lower_mold_temp3': (1400, 100, 0),
+    'sleeve_temperature': (450, 70, 0),
+    'physical_strength': (700, 25, 0),
+    'Coolant_temperature': (32, 2, 0),
+    'EMS_operation_time': (20, 4, 0)
+}
+
+# 데이터 생성 단위 (행 수가 커도 임시 배열 크기를 일정하게 유지)
+GENERATE_CHUNK_ROWS = 1_000_000
+
+_time_label_table = []
+
+def _time_labels():
+    """하루 86400초의 'HH:MM:SS' 문자열 표"""
+    if not _time_label_table:
+        second = np.arange(86400)
+        _time_label_table.append(np.array(
+            [f"{h:02d}:{m:02d}:{s:02d}" for h, m, s in zip(second // 3600, second // 60 % 60, second % 60)],
+            dtype=object
+        ))
+    return _time_label_table[0]
+
+def _generate_chunk(rng, start, n_rows):
+    data = {'id': np.arange(start + 1, start + n_rows + 1)}
+    for col, (mean, std, decimals) in SENSOR_DISTRIBUTIONS.items():
+        data[col] = np.round(rng.normal(mean, std, n_rows), decimals).astype(np.float32)
+
+    # 결측 센서 값 (전체의 약 1%)
+    for col in ('molten_temp', 'upper_mold_temp3', 'lower_mold_temp3'):
+        data[col][rng.random(n_rows) < 0.01] = np.nan
+
+    mold_index = rng.integers(0, len(MOLD_CODES), n_rows)
+    data['mold_code'] = np.asarray(MOLD_CODES)[mold_index]
+    data['line'] = np.full(n_rows, '전자교반 3라인 2호기', dtype=object)
+    data['name'] = np.full(n_rows, 'TM Carrier RH', dtype=object)
+    data['mold_name'] = np.full(n_rows, 'TM Carrier RH-Semi-Solid DIE-06', dtype=object)
+    data['heating_furnace'] = np.where(rng.random(n_rows) < 0.5, 'A', 'B').astype(object)
+    # 가동/비상정지/트라이샷 신호는 예측기 예제 데이터(main의 create_sample_data)처럼 0/1
+    data['working'] = (rng.random(n_rows) < 0.99).astype(np.int8)
+    data['emergency_stop'] = (rng.random(n_rows) < 0.001).astype(np.int8)
+    data['tryshot_signal'] = (rng.random(n_rows) < 0.02).astype(np.int8)
+    data['count'] = (data['id'] % 300).astype(np.int32)
+
+    # 주조 간격 1분, 2019-01-02 07:00부터 (date/time 문자열은 행마다 strftime하지 않고 표에서 조회)
+    seconds = 7 * 3600 + data['id'] * 60
+    days, second_of_day = np.divmod(seconds, 86400)
+    data['registration_time'] = pd.Timestamp('2019-01-02') + pd.to_timedelta(seconds, unit='s')
+    data['date'] = pd.date_range('2019-01-02', periods=int(days.max()) + 1).strftime('%Y-%m-%d').to_numpy(object)[days]
+    data['time'] = _time_labels()[second_of_day]
+
+    # 불량: 용탕온도/주조압력/저속구간속도가 정상 범위를 벗어날수록, 몰드별로 다른 확률
+    z = (
+        np.abs(np.nan_to_num(data['molten_temp'], nan=720) - 720) / 12
+        + np.abs(data['cast_pressure'] - 325) / 18
+        + np.maximum(data['low_section_speed'] - 118, 0) / 4
+        + mold_index * 0.15
+    )
+    fail = rng.random(n_rows) < 1 / (1 + np.exp(-(z - 4.5) * 1.5))
+    data['passorfail'] = np.where(fail, 'Fail', 'Pass').astype(object)
+    return pd.DataFrame(data)
+
+def make_die_casting_data(n_rows, seed=42, chunk_rows=GENERATE_CHUNK_ROWS):
+    """
+    학습 CSV와 같은 원본 컬럼 구성의 합성 다이캐스팅 데이터 (불량률 약 5%)
+
+    센서 값은 float32로 만들어 행 수가 10^7이어도 메모리를 줄입니다.
+    """
+    rng = np.random.default_rng(seed)
+    chunks = [
+        _generate_chunk(rng, start, min(chunk_rows, n_rows - start))
+        for start in range(0, n_rows, chunk_rows)
+    ]
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
@@ -1,9 +1,9 @@
 # test.py
+import sys
 import pandas as pd
 import joblib
 from datetime import datetime
 from pathlib import Path
-from sklearn.preprocessing import LabelEncoder
 import warnings
 
 warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
@@ -12,62 +12,68 @@ warnings.filterwarnings("ignore", message=".*InconsistentVersionWarning.*")
 project_root = Path(__file__).resolve().parents[1]
 test_path = project_root / "data/test.csv"
 model_path = project_root / "models/best_model_20250610_1.pkl"
+sys.path.append(str(project_root))
+
+from models.predictor.flat_forest import compile_model
+from models.predictor.feature_pipeline import FeaturePipeline
+from models.predictor.prediction_service import MicroBatchPredictor, get_prediction_service, model_scorer
+from models.predictor.prediction_cache import cached_scorer, model_token
+from models.predictor.explanation_service import ExplanationService, get_explanation_service
+
+# CustomCleaner와 같은 전처리기 (범주 목록/중앙값/이상치 임계값을 한 번 학습해 모든 행에 재사용)
+replay_pipeline = FeaturePipeline.for_replay()
 
 def preprocess_input(df):
     """CustomCleaner와 동일한 전처리 로직"""
-    df = df.copy()
-    
-    # 불필요한 컬럼 제거
-    df = df.drop(columns=[
-        'mold_name', 'name', 'line', 'emergency_stop', 'count',
-        'tryshot_signal', 'upper_mold_temp3', 'lower_mold_temp3',
-        'molten_volume', 'time', 'date', 'heating_furnace'
-    ], errors='ignore')
-
-    # working이 null인 행 제거
+    # working이 null인 행과 센서 이상치 행 제거
     df = df[~df['working'].isna()]
+    df = df[~replay_pipeline.outlier_mask(df)]
     
-    # registration_time을 datetime으로 변환
-    df['registration_time'] = pd.to_datetime(df['registration_time'], errors='coerce')
-    
-    # 데이터 타입 변경
-    df['EMS_operation_time'] = df['EMS_operation_time'].astype('object')
-    df['mold_code'] = df['mold_code'].astype('object')
-    
-    # 이상치 필터링
-    df = df[~((df['molten_temp'] == 0) |
-              (df['low_section_speed'] >= 60000) |
-              (df['production_cycletime'] == 0) |
-              (df['upper_mold_temp1'] >= 1449) |
-              (df['sleeve_temperature'] >= 1449) |
-              (df['physical_strength'] >= 60000) |
-              (df['Coolant_temperature'] >= 1449) |
-              (df['upper_mold_temp2'] >= 4000))]
-    
-    # hour 피처 추가 (중요: 이 부분이 빠져있었음!)
-    df['hour'] = df['registration_time'].dt.hour
-    
-    # registration_time 컬럼 제거
-    df = df.drop(columns=['registration_time'])
-    
-    # working 컬럼 인코딩
-    df['working'] = df['working'].map({'가동': 1, '비가동': 0})
-
-    # 범주형 변수 인코딩
-    for col in ['EMS_operation_time', 'mold_code']:
-        if col in df.columns:
-            le = LabelEncoder()
-            df[col] = le.fit_transform(df[col].astype(str))
-
-    # 결측치 처리
-    df = df.fillna(df.median(numeric_only=True))
-    
-    return df.reset_index(drop=True)
+    if not replay_pipeline.fitted:
+        replay_pipeline.fit(df)
+    return replay_pipeline.transform(df).reset_index(drop=True)
 
 # 모델과 데이터 로드
 model = joblib.load(model_path)
 test = pd.read_csv(test_path)
+# 모델/데이터 파일이 바뀌면 프로세스에 등록된 서비스도 새 모델로 교체
+data_version = (model_path.stat().st_mtime_ns, test_path.stat().st_mtime_ns)
 test = preprocess_input(test)
+feature_columns = [col for col in test.columns if col != 'id']
+
+def _create_prediction_service():
+    # 포레스트 모델이면 평탄화 평가기로 점수화 (sklearn 검증/디스패치 오버헤드 제거)
+    # current_data_id가 처음으로 돌아가 같은 행을 다시 점수화하면 예측 캐시에서 바로 반환
+    flat_preprocess, flat_model = compile_model(model)
+    return MicroBatchPredictor(
+        cached_scorer(model_scorer(model, flat_model=flat_model, preprocess=flat_preprocess), model_token(model)),
+        feature_columns, name="test_replay"
+    )
+
+# 동시 요청을 모아 한 번에 점수화하는 서비스 (모듈을 다시 실행해도 파일이 그대로면 프로세스당 하나를 공유)
+prediction_service = get_prediction_service(model_path, _create_prediction_service, version=data_version)
+
+def _create_explanation_service():
+    # NG 테이블이 DB에서 조회한 (이 프로세스에서 점수화하지 않은) 불량 id도 설명할 수 있도록
+    # 리플레이 데이터에서 id로 피처를 찾는 함수를 함께 등록
+    features_by_id = test.drop_duplicates('id').set_index('id')[feature_columns]
+
+    def feature_source(record_id):
+        try:
+            return features_by_id.loc[int(record_id)].to_numpy()
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    # 리플레이 모델은 1이 불량(Fail)
+    return ExplanationService(model, feature_columns, model_token(model), fail_class=1,
+                              feature_source=feature_source)
+
+# 불량 판정의 피처 기여도를 워커 풀에서 계산하는 설명 서비스 (포레스트 모델만 지원)
+try:
+    explanation_service = get_explanation_service(model_path, _create_explanation_service, version=data_version)
+except TypeError as e:
+    print(f"예측 설명 비활성화: {e}")
+    explanation_service = None
 
 # 디버깅: 피처 수 확인
 print(f"전처리된 테스트 데이터 피처 수: {test.shape[1]}")
@@ -84,9 +90,6 @@ def get_current_data_by_id(id):
 
     sample_row = sample.iloc[0].copy()
     
-    # 예측을 위한 피처 준비 (id 컬럼 제외)
-    feature_columns = [col for col in test.columns if col != 'id']
-    
     # DataFrame 형태로 입력 준비 (파이프라인이 DataFrame을 기대함)
     sample_input_df = sample_row[feature_columns].to_frame().T
     
@@ -97,9 +100,8 @@ def get_current_data_by_id(id):
     print(f"sample_input_df type: {type(sample_input_df)}")
     
     try:
-        # 예측 (DataFrame을 직접 전달)
-        prediction = model.predict(sample_input_df)[0]
-        proba_array = model.predict_proba(sample_input_df)[0]
+        # 예측 - 라벨과 확률을 한 번에 계산 (마이크로 배칭 서비스 경유)
+        prediction, proba_array = prediction_service.predict(sample_row[feature_columns].values, timeout=30)
         proba = proba_array[1] if len(proba_array) > 1 else proba_array[0]
         pred_label = "Pass" if prediction == 0 else "Fail"
     except Exception as e:
@@ -108,6 +110,10 @@ def get_current_data_by_id(id):
         print(f"sample_input_df dtypes: {sample_input_df.dtypes}")
         raise
     
+    # 불량이면 설명 계산을 백그라운드로 요청 (NG 테이블이 id로 조회)
+    if pred_label == "Fail" and explanation_service is not None:
+        explanation_service.submit(int(id), sample_row[feature_columns].values)
+    
     # 결과 딕셔너리 생성
     result = sample_row.to_dict()
     
@@ -0,0 +1,190 @@
+# models/predictor/artifact_store.py
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+
+from models.predictor.flat_forest import FlatForest, is_supported_forest
+from utils.feature_drift import DriftReference
+
+project_root = Path(__file__).resolve().parents[2]
+ARTIFACT_DIR = Path(os.getenv('MODEL_ARTIFACT_DIR', project_root / "models" / "artifacts"))
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+
+# 번들 구성 파일 (압축하지 않아야 joblib mmap_mode로 배열을 메모리 매핑할 수 있음)
+MODEL_FILE = "model.joblib"
+PREPROCESS_FILE = "preprocess.joblib"
+# 학습된 전처리기 (sklearn 객체가 없어 서빙 경로가 sklearn 없이 로드 가능)
+FEATURE_PIPELINE_FILE = "feature_pipeline.joblib"
+# 포레스트 모델의 평탄화 노드 배열 (.npy, 단일 행 추론용)
+FLAT_MODEL_DIR = "flat_forest"
+# 피처별 학습 데이터 기준 히스토그램 (드리프트 모니터용)
+DRIFT_REFERENCE_FILE = "drift_reference.json"
+
+class InferenceBundle:
+    """추론에 필요한 모든 구성 요소(모델, 스케일러, 인코더, 피처 순서)와 매니페스트"""
+
+    def __init__(self, model, scaler, label_encoders, feature_columns, best_model_name, manifest, path=None,
+                 flat_model=None, feature_pipeline=None, drift_reference=None):
+        self.model = model
+        self.drift_reference = drift_reference
+        self.feature_pipeline = feature_pipeline
+        self.flat_model = flat_model
+        self.scaler = scaler
+        self.label_encoders = label_encoders
+        self.feature_columns = feature_columns
+        self.best_model_name = best_model_name
+        self.manifest = manifest
+        self.path = path
+
+    @property
+    def version(self):
+        return self.manifest['version']
+
+def _new_version():
+    return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+def save_bundle(model, scaler, label_encoders, feature_columns, best_model_name,
+                metrics=None, data_hash=None, extra=None, store_dir=ARTIFACT_DIR, feature_pipeline=None,
+                drift_reference=None):
+    """
+    추론 번들을 새 버전 디렉토리에 저장하고 LATEST 포인터 갱신
+
+    임시 디렉토리에 모두 기록한 뒤 rename으로 옮기므로, 저장 중인 번들을
+    다른 프로세스가 반쯤 읽는 일이 없습니다.
+
+    Returns:
+        저장된 버전 디렉토리 경로
+    """
+    import sklearn
+
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    version = _new_version()
+
+    staging = Path(tempfile.mkdtemp(prefix=f".{version}_", dir=store_dir))
+    try:
+        joblib.dump(model, staging / MODEL_FILE)
+        joblib.dump({'scaler': scaler, 'label_encoders': label_encoders}, staging / PREPROCESS_FILE)
+        files = [MODEL_FILE, PREPROCESS_FILE]
+        if feature_pipeline is not None:
+            joblib.dump(feature_pipeline, staging / FEATURE_PIPELINE_FILE)
+            files.append(FEATURE_PIPELINE_FILE)
+        if is_supported_forest(model):
+            FlatForest.from_estimator(model).save(staging / FLAT_MODEL_DIR)
+            files.append(FLAT_MODEL_DIR)
+        if drift_reference is not None:
+            (staging / DRIFT_REFERENCE_FILE).write_text(json.dumps(drift_reference.to_dict()), encoding='utf-8')
+            files.append(DRIFT_REFERENCE_FILE)
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            'best_model_name': best_model_name,
+            'model_class': type(model).__name__,
+            'feature_columns': list(feature_columns),
+            'label_encoders': {
+                col: [str(c) for c in encoder.classes_] for col, encoder in label_encoders.items()
+            },
+            'feature_pipeline': feature_pipeline.summary() if feature_pipeline is not None else None,
+            'metrics': metrics or {},
+            'data_hash': data_hash,
+            'sklearn_version': sklearn.__version__,
+            'files': files
+        }
+        if extra:
+            manifest.update(extra)
+        (staging / MANIFEST_FILE).write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2, default=str), encoding='utf-8'
+        )
+
+        target = store_dir / version
+        staging.rename(target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # LATEST 포인터도 임시 파일 교체로 원자적으로 갱신
+    pointer = store_dir / f".{LATEST_FILE}.tmp"
+    pointer.write_text(version, encoding='utf-8')
+    os.replace(pointer, store_dir / LATEST_FILE)
+    return target
+
+def list_versions(store_dir=ARTIFACT_DIR):
+    """저장된 번들 버전 목록 (오래된 순)"""
+    store_dir = Path(store_dir)
+    if not store_dir.exists():
+        return []
+    return sorted(
+        path.name for path in store_dir.iterdir()
+        if path.is_dir() and (path / MANIFEST_FILE).exists()
+    )
+
+def latest_version(store_dir=ARTIFACT_DIR):
+    """LATEST 포인터가 가리키는 버전 (없으면 가장 최근 디렉토리)"""
+    pointer = Path(store_dir) / LATEST_FILE
+    if pointer.exists():
+        return pointer.read_text(encoding='utf-8').strip()
+    versions = list_versions(store_dir)
+    return versions[-1] if versions else None
+
+def read_manifest(version=None, store_dir=ARTIFACT_DIR):
+    """번들을 로드하지 않고 매니페스트만 읽기"""
+    version = version or latest_version(store_dir)
+    if version is None:
+        raise FileNotFoundError(f"저장된 모델 번들이 없습니다: {store_dir}")
+    return json.loads((Path(store_dir) / version / MANIFEST_FILE).read_text(encoding='utf-8'))
+
+def load_drift_reference(version=None, store_dir=ARTIFACT_DIR):
+    """번들의 드리프트 기준 히스토그램만 로드 (없으면 None)"""
+    version = version or latest_version(store_dir)
+    if version is None:
+        return None
+    path = Path(store_dir) / version / DRIFT_REFERENCE_FILE
+    if not path.exists():
+        return None
+    return DriftReference.from_dict(json.loads(path.read_text(encoding='utf-8')))
+
+def load_feature_pipeline(path, preprocess=None):
+    """번들 디렉토리의 학습된 전처리기 (이전 번들은 preprocess.joblib 안에 저장됨, 없으면 None)"""
+    path = Path(path)
+    if (path / FEATURE_PIPELINE_FILE).exists():
+        return joblib.load(path / FEATURE_PIPELINE_FILE)
+    if preprocess is None and (path / PREPROCESS_FILE).exists():
+        preprocess = joblib.load(path / PREPROCESS_FILE)
+    return (preprocess or {}).get('feature_pipeline')
+
+def load_bundle(version=None, store_dir=ARTIFACT_DIR, mmap_mode='r'):
+    """
+    추론 번들 로드
+
+    mmap_mode='r'이면 모델 안의 numpy 배열(선형 모델 계수, SVM 서포트 벡터 등)을
+    페이지 캐시에서 읽기 전용으로 매핑하므로, 여러 프로세스가 같은 번들을 로드해도
+    물리 메모리는 한 벌만 사용하고 콜드 로드가 빠릅니다.
+    """
+    manifest = read_manifest(version, store_dir)
+    path = Path(store_dir) / manifest['version']
+
+    model = joblib.load(path / MODEL_FILE, mmap_mode=mmap_mode)
+    preprocess = joblib.load(path / PREPROCESS_FILE)
+    flat_model = None
+    if (path / FLAT_MODEL_DIR).exists():
+        flat_model = FlatForest.load(path / FLAT_MODEL_DIR, mmap_mode=mmap_mode)
+
+    return InferenceBundle(
+        model=model,
+        scaler=preprocess['scaler'],
+        label_encoders=preprocess['label_encoders'],
+        feature_columns=manifest['feature_columns'],
+        best_model_name=manifest['best_model_name'],
+        manifest=manifest,
+        path=path,
+        flat_model=flat_model,
+        feature_pipeline=load_feature_pipeline(path, preprocess),
+        drift_reference=load_drift_reference(manifest['version'], store_dir)
+    )
@@ -0,0 +1,124 @@
+# models/predictor/batch_inference.py
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from models.predictor.prediction_cache import get_prediction_cache
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# 양품으로 보는 모델 라벨 (숫자 인코딩 타겟과 'Pass'/'Fail' 문자열 타겟 모두 지원)
+PASS_LABELS = (1, 'Pass')
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE, **read_csv_kwargs):
+    """
+    입력을 고정 크기 DataFrame 청크로 순회
+
+    Args:
+        source: DataFrame, CSV 경로(str/Path), DB 커서(fetchmany/description 지원 - DB-API 커서나
+                SQLAlchemy Result) 또는 DataFrame을 내는 iterable
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+    elif isinstance(source, (str, Path)):
+        with pd.read_csv(source, chunksize=chunk_size, **read_csv_kwargs) as reader:
+            yield from reader
+    elif hasattr(source, 'fetchmany'):
+        if hasattr(source, 'keys'):
+            columns = list(source.keys())
+        else:
+            columns = [column[0] for column in source.description]
+        while True:
+            rows = source.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    else:
+        yield from source
+
+def build_results(predictions, probabilities):
+    """
+    예측 라벨(1 또는 'Pass'=양품)과 Pass 확률 배열로 결과 DataFrame을 벡터 연산으로 생성
+    (행마다 dict를 만들던 방식 대체, 컬럼 구성은 기존 결과와 동일)
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    is_pass = pd.Series(predictions).isin(PASS_LABELS).to_numpy()
+    return pd.DataFrame({
+        'Index': np.arange(len(predictions)),
+        'Prediction': np.where(is_pass, 'Pass', 'Fail'),
+        'Confidence': np.where(is_pass, probabilities, 1 - probabilities),
+        'Probability_Pass': probabilities,
+        'Probability_Fail': 1 - probabilities
+    })
+
+def score_chunk(model, scaler, feature_columns, chunk, transform=None, cache=None, version=None):
+    """
+    청크 하나 점수화 - predict_proba 한 번으로 라벨과 확률을 함께 계산
+
+    cache(PredictionCache)가 있으면 스케일링 전 피처 벡터로 캐시를 조회하고 없는 행만 점수화합니다.
+
+    Returns:
+        (라벨 배열, Pass 확률 배열)
+    """
+    if transform is not None:
+        chunk = transform(chunk)
+    X = chunk[feature_columns]
+
+    def score(X):
+        if scaler is not None:
+            X = scaler.transform(X)
+        proba = model.predict_proba(X)
+        if getattr(model, 'probability', False):
+            # SVC의 predict는 Platt 확률이 아닌 decision_function 기준이므로 그대로 사용
+            return model.predict(X), proba
+        return np.asarray(model.classes_)[proba.argmax(axis=1)], proba
+
+    predictions, proba = cache.score(X, version, score) if cache is not None else score(X)
+    return predictions, proba[:, 1]
+
+# 워커 프로세스별 모델 (initializer에서 한 번만 역직렬화)
+_worker_state = {}
+
+def _init_worker(model, scaler, feature_columns, transform, version):
+    cache = get_prediction_cache() if version is not None else None
+    _worker_state.update(model=model, scaler=scaler, feature_columns=feature_columns, transform=transform,
+                         cache=cache, version=version)
+
+def _score_in_worker(chunk):
+    state = _worker_state
+    return score_chunk(state['model'], state['scaler'], state['feature_columns'], chunk, state['transform'],
+                       state['cache'], state['version'])
+
+def iter_predictions(model, scaler, feature_columns, source, chunk_size=DEFAULT_CHUNK_SIZE,
+                     n_workers=1, transform=None, cache=None, version=None, **read_csv_kwargs):
+    """
+    청크 단위 예측 결과를 입력 순서대로 내보내는 제너레이터
+
+    n_workers > 1이면 청크를 워커 프로세스에 나눠 보내며, 모델은 워커 초기화 시 한 번만
+    전달합니다. 동시에 처리 중인 청크는 워커 수의 2배로 제한해 메모리 사용량을 일정하게 유지합니다.
+    cache가 있으면 워커는 각자의 프로세스 캐시를 사용합니다 (통계도 워커별).
+
+    Yields:
+        (라벨 배열, Pass 확률 배열) - 청크별
+    """
+    chunks = iter_chunks(source, chunk_size, **read_csv_kwargs)
+
+    if n_workers <= 1:
+        for chunk in chunks:
+            yield score_chunk(model, scaler, feature_columns, chunk, transform, cache, version)
+        return
+
+    worker_version = version if cache is not None else None
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(model, scaler, feature_columns, transform, worker_version)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_score_in_worker, chunk))
+            if len(pending) >= 2 * n_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,83 @@
+# models/predictor/data_loader.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from models.predictor.feature_pipeline import PREDICTOR_PIPELINE_CONFIG, FeaturePipeline
+
+# 학습 CSV를 읽을 청크 크기(행) - 날짜/시간 문자열 등 변환 전 임시 값은 청크 크기만큼만 존재
+LOAD_CHUNK_ROWS = int(os.getenv('LOAD_CHUNK_ROWS', 500_000))
+
+# 센서 측정값 (float32로 충분한 정밀도 - 값은 정수 또는 소수 1자리)
+SENSOR_COLUMNS = list(PREDICTOR_PIPELINE_CONFIG['numeric_columns'])
+
+# 반복되는 문자열/코드 값
+CATEGORY_COLUMNS = ['line', 'name', 'mold_name', 'mold_code', 'heating_furnace', 'passorfail']
+
+# 날짜/시간 컬럼과 형식 (None이면 형식 추론)
+DATETIME_COLUMNS = {'date': None, 'time': '%H:%M:%S', 'registration_time': None}
+
+def compact_dtypes(pipeline=None):
+    """
+    원본 컬럼별 읽기 dtype과 날짜/시간 형식
+
+    전처리기가 있으면 그 구성에 맞춥니다 - 범주로 인코딩하거나 값 매핑하는 컬럼은 category
+    (리플레이 전처리기의 mold_code/working/EMS_operation_time), 수치 컬럼은 float32
+    (예측기 전처리기의 EMS_operation_time).
+
+    Returns:
+        (read_csv dtype dict, {컬럼: 날짜 형식})
+    """
+    dtypes = {col: np.float32 for col in SENSOR_COLUMNS}
+    dtypes.update({col: 'category' for col in CATEGORY_COLUMNS})
+    datetimes = dict(DATETIME_COLUMNS)
+    if pipeline is not None:
+        dtypes.update({col: 'category' for col in pipeline.categorical_columns + list(pipeline.value_maps)})
+        dtypes.update({col: np.float32 for col in pipeline.numeric_columns or ()})
+        datetimes.update({col: fmt for col, fmt, _ in pipeline.datetime_features})
+    for col in datetimes:
+        dtypes.pop(col, None)
+    return dtypes, datetimes
+
+def _compact_chunk(chunk, datetimes):
+    """청크의 날짜/시간을 datetime64로, 선언하지 않은 정수 컬럼은 가장 작은 정수형으로"""
+    for col, fmt in datetimes.items():
+        if col in chunk.columns:
+            chunk[col] = pd.to_datetime(chunk[col], format=fmt, errors='coerce')
+    for col in chunk.select_dtypes(include='integer').columns:
+        chunk[col] = pd.to_numeric(chunk[col], downcast='integer')
+    return chunk
+
+def _concat_chunks(chunks):
+    """청크 병합 - 청크마다 다른 범주 목록을 합쳐 category dtype을 유지 (object로 풀리지 않도록)"""
+    if len(chunks) == 1:
+        return chunks[0]
+    for col in chunks[0].select_dtypes(include='category').columns:
+        categories = chunks[0][col].cat.categories
+        for chunk in chunks[1:]:
+            categories = categories.union(chunk[col].cat.categories)
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+def read_training_csv(path, pipeline=None, chunk_rows=LOAD_CHUNK_ROWS, **read_csv_kwargs):
+    """
+    학습용 CSV를 작은 dtype으로 청크 단위로 읽기
+
+    센서는 float32, 반복 문자열은 category, 날짜/시간은 datetime64, 나머지 정수는 downcast합니다.
+    기본 dtype(float64/int64/object 문자열)으로 전체를 읽은 뒤 변환하지 않으므로 큰 임시 사본이
+    생기지 않습니다. 전처리기(FeaturePipeline)를 넘기면 그 구성에 맞는 dtype을 사용합니다.
+
+    Args:
+        path: CSV 경로
+        pipeline: 이 데이터를 변환할 전처리기 (기본: 예측기 전처리기 구성)
+        chunk_rows: 한 번에 읽을 행 수
+    """
+    dtypes, datetimes = compact_dtypes(pipeline if pipeline is not None else FeaturePipeline.for_predictor())
+    dtypes.update(read_csv_kwargs.pop('dtype', None) or {})
+    with pd.read_csv(path, dtype=dtypes, chunksize=chunk_rows, **read_csv_kwargs) as reader:
+        chunks = [_compact_chunk(chunk, datetimes) for chunk in reader]
+    if not chunks:
+        return pd.read_csv(path, dtype=dtypes, **read_csv_kwargs)
+    return _concat_chunks(chunks)
@@ -1,34 +1,107 @@
+# sklearn 학습/평가 모듈은 사용하는 메서드 안에서 import (추론만 하는 프로세스의 import 비용 절감)
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.preprocessing import StandardScaler, LabelEncoder, OneHotEncoder
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, ExtraTreesClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score, roc_curve
-from sklearn.impute import SimpleImputer
+import os
+import sys
+import time
 import warnings
-warnings.filterwarnings('ignore')
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from threadpoolctl import threadpool_limits
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.append(str(project_root))
+
+from models.predictor.artifact_store import ARTIFACT_DIR, save_bundle, load_bundle
+from models.predictor.flat_forest import compile_model
+from models.predictor.feature_pipeline import FeaturePipeline, add_engineered_features
+from models.predictor.data_loader import LOAD_CHUNK_ROWS, read_training_csv
+from utils.feature_drift import DriftReference
+from variables.monitoring import MONITORING_VARIABLES
+from models.predictor.batch_inference import DEFAULT_CHUNK_SIZE, build_results, iter_predictions, score_chunk
+from models.predictor.prediction_cache import get_prediction_cache, model_token
+from models.predictor.serving import SCALED_MODELS
+
+# 내부적으로 n_jobs 병렬화가 가능한 모델
+MULTITHREADED_MODELS = ['RandomForest', 'ExtraTrees']
+
+# 대략적인 학습 비용 순서 (오래 걸리는 모델부터 제출해 전체 소요 시간 단축)
+MODEL_COST_ORDER = ['SVM', 'GradientBoosting', 'RandomForest', 'ExtraTrees', 'LogisticRegression']
+
+def _thread_budgets(model_names, n_workers, total_cores):
+    """
+    모델별 스레드 예산 배분
+    
+    단일 스레드 모델은 1개씩, 남는 코어는 n_jobs를 쓸 수 있는 포레스트 모델에 나눠
+    동시에 실행되는 프로세스들의 스레드 합이 코어 수를 크게 넘지 않도록 합니다.
+    """
+    parallel_models = [name for name in model_names if name in MULTITHREADED_MODELS]
+    spare = max(total_cores - n_workers, 0)
+    extra = spare // len(parallel_models) if parallel_models else 0
+    return {
+        name: 1 + extra if name in MULTITHREADED_MODELS else 1
+        for name in model_names
+    }
+
+def _fit_candidate(name, model, n_threads, X_train, y_train, X_test, y_test):
+    """
+    후보 모델 하나를 학습/평가 (프로세스 풀 워커에서 실행되므로 모듈 수준 함수)
+    
+    BLAS/OpenMP 스레드는 threadpool_limits로, 포레스트는 n_jobs로 스레드 예산을 제한하고
+    학습+평가의 wall-clock/CPU 시간을 함께 측정합니다.
+    수렴 경고(LogisticRegression 등)는 학습 중에만 숨깁니다.
+    """
+    from sklearn.exceptions import ConvergenceWarning
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_threads)
+    
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    with threadpool_limits(limits=n_threads), warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+        y_pred_proba = model.predict_proba(X_test)[:, 1]
+    
+    return {
+        'model': model,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'auc': roc_auc_score(y_test, y_pred_proba),
+        'predictions': y_pred,
+        'probabilities': y_pred_proba,
+        'threads': n_threads,
+        'wall_time': time.perf_counter() - wall_start,
+        'cpu_time': time.process_time() - cpu_start
+    }
 
 class DiecastingQualityPredictor:
     def __init__(self):
         self.model = None
-        self.scaler = StandardScaler()
+        self.flat_model = None
+        self.scaler = None
         self.label_encoders = {}
+        self.feature_pipeline = None
+        self.drift_reference = None
         self.feature_columns = []
         self.target_column = 'passorfail'
         
-    def load_and_preprocess_data(self, data_path=None, df=None):
+    def load_and_preprocess_data(self, data_path=None, df=None, chunk_rows=LOAD_CHUNK_ROWS):
+        """
+        데이터 로딩과 전처리
         
+        CSV는 작은 dtype(float32 센서, category, datetime64)으로 청크 단위로 읽고, 전처리는 읽은
+        DataFrame을 직접 변환합니다. 넘겨받은 df는 수정하지 않도록 전처리기가 한 번만 복사합니다.
+        전처리가 끝나면 원본(self.df)은 해제하고 df_processed만 유지합니다.
+        """
         print("📊 데이터 로딩 및 전처리 시작...")
         
         if df is not None:
-            self.df = df.copy()
+            self.df = df
         else:
             # CSV 파일에서 데이터 로딩
-            self.df = pd.read_csv(data_path)
+            self.df = read_training_csv(data_path, chunk_rows=chunk_rows)
         
         print(f"원본 데이터 크기: {self.df.shape}")
         print(f"결측값 개수:\\n{self.df.isnull().sum()}")
@@ -41,64 +114,32 @@ class DiecastingQualityPredictor:
         print(f"\\n🎯 타겟 변수 분포:")
         print(self.df[self.target_column].value_counts())
         
-        # 3. 전처리 단계
-        self.df_processed = self._preprocess_features()
+        # 3. 전처리 단계 (직접 읽은 데이터는 복사하지 않고 변환)
+        self.df_processed = self._preprocess_features(copy=df is not None)
+        self.df = None
         
         return self.df_processed
     
-    def _preprocess_features(self):
+    def _preprocess_features(self, copy=True):
         """
-        피처 전처리 수행
+        피처 전처리 수행 - 학습된 전처리기(FeaturePipeline)를 만들어 두고 서빙에서도 그대로 사용
+        
+        Args:
+            copy: False면 self.df를 직접 변환 (이후 self.df는 원본이 아님)
         """
-        df = self.df.copy()
-        
-        # 1. 날짜/시간 피처 처리
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            df['day_of_week'] = df['date'].dt.dayofweek
-            df['month'] = df['date'].dt.month
-            df['day'] = df['date'].dt.day
-        
-        if 'time' in df.columns:
-            # 시간을 분 단위로 변환
-            df['time'] = pd.to_datetime(df['time'], format='%H:%M:%S', errors='coerce')
-            df['hour'] = df['time'].dt.hour
-            df['minute'] = df['time'].dt.minute
-        
-        # 2. 카테고리 변수 인코딩
-        categorical_columns = ['line', 'name', 'mold_name', 'mold_code', 'heating_furnace']
-        
-        for col in categorical_columns:
-            if col in df.columns:
-                # 결측값을 'Unknown'으로 채움
-                df[col] = df[col].fillna('Unknown')
-                
-                # 라벨 인코딩
-                le = LabelEncoder()
-                df[f'{col}_encoded'] = le.fit_transform(df[col].astype(str))
-                self.label_encoders[col] = le
-        
-        # 3. 수치형 변수 결측값 처리
-        numeric_columns = [
-            'molten_temp', 'facility_operation_cycleTime', 'production_cycletime',
-            'low_section_speed', 'high_section_speed', 'molten_volume', 'cast_pressure',
-            'biscuit_thickness', 'upper_mold_temp1', 'upper_mold_temp2', 'upper_mold_temp3',
-            'lower_mold_temp1', 'lower_mold_temp2', 'lower_mold_temp3', 'sleeve_temperature',
-            'physical_strength', 'Coolant_temperature', 'EMS_operation_time'
-        ]
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                # 중앙값으로 결측값 채움
-                df[col] = df[col].fillna(df[col].median())
-        
-        # 4. 피처 엔지니어링
-        df = self._feature_engineering(df)
-        
-        # 5. 불필요한 컬럼 제거
-        columns_to_drop = ['id', 'date', 'time', 'registration_time'] + categorical_columns
-        columns_to_drop = [col for col in columns_to_drop if col in df.columns]
-        df = df.drop(columns=columns_to_drop, errors='ignore')
+        from sklearn.preprocessing import LabelEncoder
+        
+        # 센서 피처별 학습 분포 (서빙 시 드리프트 비교 기준으로 번들에 저장) - 결측 대체 전 원본 값 기준
+        self.drift_reference = DriftReference.from_dataframe(self.df, list(MONITORING_VARIABLES))
+        
+        self.feature_pipeline = FeaturePipeline.for_predictor()
+        df = self.feature_pipeline.fit_transform(self.df, copy=copy)
+        
+        # 번들 매니페스트 호환을 위해 범주 목록을 LabelEncoder 형태로도 보관
+        for col, categories in self.feature_pipeline.categories_.items():
+            le = LabelEncoder()
+            le.classes_ = categories
+            self.label_encoders[col] = le
         
         return df
     
@@ -106,44 +147,49 @@ class DiecastingQualityPredictor:
         """
         피처 엔지니어링 - 새로운 피처 생성
         """
-        # 온도 관련 피처
-        temp_cols = ['upper_mold_temp1', 'upper_mold_temp2', 'upper_mold_temp3',
-                     'lower_mold_temp1', 'lower_mold_temp2', 'lower_mold_temp3']
-        
-        existing_temp_cols = [col for col in temp_cols if col in df.columns]
-        if existing_temp_cols:
-            df['avg_mold_temp'] = df[existing_temp_cols].mean(axis=1)
-            df['temp_variation'] = df[existing_temp_cols].std(axis=1)
-        
-        # 속도 관련 피처
-        if 'low_section_speed' in df.columns and 'high_section_speed' in df.columns:
-            df['speed_ratio'] = df['high_section_speed'] / (df['low_section_speed'] + 1e-8)
-            df['speed_diff'] = df['high_section_speed'] - df['low_section_speed']
-        
-        # 온도 차이 피처
-        if 'molten_temp' in df.columns and 'avg_mold_temp' in df.columns:
-            df['temp_diff_molten_mold'] = df['molten_temp'] - df['avg_mold_temp']
-        
-        # 압력-부피 관련 피처
-        if 'cast_pressure' in df.columns and 'molten_volume' in df.columns:
-            df['pressure_volume_ratio'] = df['cast_pressure'] / (df['molten_volume'] + 1e-8)
+        return add_engineered_features(df)
+    
+    def _candidate_models(self):
+        """비교할 후보 모델 정의"""
+        from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, ExtraTreesClassifier
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.svm import SVC
         
-        return df
+        return {
+            'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42),
+            'GradientBoosting': GradientBoostingClassifier(random_state=42),
+            'ExtraTrees': ExtraTreesClassifier(n_estimators=100, random_state=42),
+            'LogisticRegression': LogisticRegression(random_state=42, max_iter=1000),
+            'SVM': SVC(probability=True, random_state=42)
+        }
     
-    def train_models(self):
+    def train_models(self, n_workers=None, search=False, search_time_budget=None, search_candidates=16):
         """
         여러 모델을 훈련하고 최적 모델 선택
+        
+        후보 모델들을 프로세스 풀에서 동시에 학습하며, 모델별 스레드 예산을 나눠
+        코어를 과점유하지 않도록 합니다. n_workers=1이면 현재 프로세스에서 순차 실행합니다.
+        
+        Args:
+            n_workers: 동시에 학습할 프로세스 수 (기본: min(모델 수, CPU 코어 수))
+            search: True면 모델별로 연속 절반 탐색을 먼저 수행해 하이퍼파라미터 결정
+            search_time_budget: 탐색 전체에 쓸 시간 예산(초), 모델별로 남은 예산을 나눠 사용
+            search_candidates: 모델별 첫 단계 후보 설정 수
         """
-        print("\\n🤖 모델 훈련 시작...")
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        from models.predictor.hyperparameter_search import data_fingerprint
+        
+        print("\n🤖 모델 훈련 시작...")
         
         # 피처와 타겟 분리
         X = self.df_processed.drop(columns=[self.target_column])
         y = self.df_processed[self.target_column]
         
-        # Pass/Fail을 1/0으로 변환
-        y = (y == 'Pass').astype(int)
+        y = self.encode_target(y)
         
         self.feature_columns = X.columns.tolist()
+        self.data_hash = data_fingerprint(X, y)
         
         # 훈련/테스트 분할
         X_train, X_test, y_train, y_test = train_test_split(
@@ -151,53 +197,58 @@ class DiecastingQualityPredictor:
         )
         
         # 피처 스케일링
+        self.scaler = StandardScaler()
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
-        # 여러 모델 정의
-        models = {
-            'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42),
-            'GradientBoosting': GradientBoostingClassifier(random_state=42),
-            'ExtraTrees': ExtraTreesClassifier(n_estimators=100, random_state=42),
-            'LogisticRegression': LogisticRegression(random_state=42, max_iter=1000),
-            'SVM': SVC(probability=True, random_state=42)
-        }
+        # 여러 모델 정의 (오래 걸리는 모델부터 제출)
+        models = self._candidate_models()
+        
+        # 하이퍼파라미터 탐색 (선택)
+        if search:
+            self._search_hyperparameters(
+                models, X_train, X_train_scaled, y_train, search_time_budget, search_candidates
+            )
+        
+        names = sorted(models, key=lambda n: MODEL_COST_ORDER.index(n) if n in MODEL_COST_ORDER else len(MODEL_COST_ORDER))
+        
+        total_cores = os.cpu_count() or 1
+        n_workers = n_workers or min(len(models), total_cores)
+        budgets = _thread_budgets(names, n_workers, total_cores)
+        
+        def fit_args(name):
+            if name in SCALED_MODELS:
+                return (name, models[name], budgets[name], X_train_scaled, y_train, X_test_scaled, y_test)
+            return (name, models[name], budgets[name], X_train, y_train, X_test, y_test)
         
         # 모델 성능 비교
         model_scores = {}
+        overall_start = time.perf_counter()
+        
+        if n_workers > 1:
+            print(f"   {n_workers}개 프로세스로 병렬 학습 (CPU 코어 {total_cores}개)")
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = {executor.submit(_fit_candidate, *fit_args(name)): name for name in names}
+                for future in as_completed(futures):
+                    model_scores[futures[future]] = future.result()
+        else:
+            for name in names:
+                print(f"\n🔍 {name} 모델 훈련 중...")
+                model_scores[name] = _fit_candidate(*fit_args(name))
         
-        for name, model in models.items():
-            print(f"\\n🔍 {name} 모델 훈련 중...")
-            
-            if name in ['LogisticRegression', 'SVM']:
-                model.fit(X_train_scaled, y_train)
-                y_pred = model.predict(X_test_scaled)
-                y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
-            else:
-                model.fit(X_train, y_train)
-                y_pred = model.predict(X_test)
-                y_pred_proba = model.predict_proba(X_test)[:, 1]
-            
-            accuracy = accuracy_score(y_test, y_pred)
-            auc_score = roc_auc_score(y_test, y_pred_proba)
-            
-            model_scores[name] = {
-                'model': model,
-                'accuracy': accuracy,
-                'auc': auc_score,
-                'predictions': y_pred,
-                'probabilities': y_pred_proba
-            }
-            
-            print(f"   정확도: {accuracy:.4f}")
-            print(f"   AUC: {auc_score:.4f}")
+        overall_wall = time.perf_counter() - overall_start
+        
+        # 원래 모델 순서로 정리
+        model_scores = {name: model_scores[name] for name in models}
+        self._print_training_report(model_scores, overall_wall)
         
         # 최적 모델 선택 (AUC 기준)
         best_model_name = max(model_scores.keys(), key=lambda x: model_scores[x]['auc'])
         self.model = model_scores[best_model_name]['model']
         self.best_model_name = best_model_name
+        self.flat_model = compile_model(self.model)[1]
         
-        print(f"\\n🏆 최적 모델: {best_model_name}")
+        print(f"\n🏆 최적 모델: {best_model_name}")
         print(f"   정확도: {model_scores[best_model_name]['accuracy']:.4f}")
         print(f"   AUC: {model_scores[best_model_name]['auc']:.4f}")
         
@@ -209,10 +260,116 @@ class DiecastingQualityPredictor:
         
         return model_scores
     
+    def encode_target(self, y):
+        """타겟 Pass/Fail을 모델 라벨 1/0으로 변환 (학습과 점진 갱신이 같은 규칙 사용)"""
+        return (y == 'Pass').astype(int)
+    
+    def _search_hyperparameters(self, models, X_train, X_train_scaled, y_train, time_budget, n_candidates):
+        """
+        모델별 연속 절반 탐색으로 하이퍼파라미터를 정하고 models에 반영
+        
+        탐색 결과는 학습 데이터 지문별로 캐시되어, 같은 데이터로 다시 실행하면
+        이미 평가한 (설정, 자원) 조합은 건너뜁니다.
+        """
+        from models.predictor.hyperparameter_search import SearchCache, data_fingerprint, successive_halving
+        
+        fingerprint = data_fingerprint(X_train, y_train)
+        cache = SearchCache(fingerprint)
+        print(f"\n🔎 하이퍼파라미터 탐색 (연속 절반 탐색, 데이터 지문 {fingerprint}, 캐시 {len(cache.entries)}건)")
+        
+        search_start = time.perf_counter()
+        self.search_results = {}
+        for position, (name, model) in enumerate(models.items()):
+            budget = None
+            if time_budget is not None:
+                remaining = time_budget - (time.perf_counter() - search_start)
+                budget = max(remaining / (len(models) - position), 0)
+            
+            X = X_train_scaled if name in SCALED_MODELS else X_train
+            configured = model.get_params()
+            result = successive_halving(name, model, X, y_train, n_candidates=n_candidates,
+                                        time_budget=budget, cache=cache)
+            
+            model.set_params(**result['best_params'])
+            if result['resource_name'] == 'n_estimators':
+                # 단계별 트리 수는 설정 순위를 매기는 데만 사용 - 시간 예산으로 일찍 끝나 마지막 단계가
+                # 10~30개여도 최종 모델은 원래 설정한 트리 수(더 큰 단계까지 검증했으면 그 수)로 학습
+                model.set_params(n_estimators=max(configured['n_estimators'], result['rungs'][-1]['resource']))
+            self.search_results[name] = result
+            
+            print(f"   → {name}: 검증 AUC {result['best_score']:.4f}, {result['best_params']} "
+                  f"(평가 {result['evaluated']}회, 캐시 {result['cached']}회, {result['elapsed']:.1f}s)")
+    
+    def _print_training_report(self, model_scores, overall_wall):
+        """
+        모델별 성능과 학습 시간(wall/CPU), 순차 실행 대비 속도 향상 출력
+        
+        동시 실행 중에는 모델별 wall-clock이 코어 경합으로 늘어나므로, 순차 실행 시간은
+        모델별 CPU 시간 합으로 추정합니다: 속도 향상 = CPU 시간 합 / 전체 wall-clock
+        """
+        sequential_estimate = sum(info['cpu_time'] for info in model_scores.values())
+        speedup = sequential_estimate / overall_wall if overall_wall > 0 else 1.0
+        
+        print("\n⏱️ 모델별 학습 결과:")
+        print("=" * 72)
+        print(f"{'모델':<20}{'정확도':>8}{'AUC':>8}{'스레드':>8}{'Wall(s)':>12}{'CPU(s)':>12}")
+        for name, info in model_scores.items():
+            print(f"{name:<20}{info['accuracy']:>8.4f}{info['auc']:>8.4f}{info['threads']:>8d}"
+                  f"{info['wall_time']:>12.2f}{info['cpu_time']:>12.2f}")
+        print("-" * 72)
+        print(f"전체 wall-clock: {overall_wall:.2f}s / 순차 실행 추정(CPU 합계): {sequential_estimate:.2f}s / 속도 향상: {speedup:.2f}x")
+        
+        self.training_report = {
+            'models': {
+                name: {key: info[key] for key in ('accuracy', 'auc', 'threads', 'wall_time', 'cpu_time')}
+                for name, info in model_scores.items()
+            },
+            'overall_wall_time': overall_wall,
+            'sequential_estimate': sequential_estimate,
+            'speedup': speedup
+        }
+    
+    def save_model(self, store_dir=ARTIFACT_DIR, extra=None):
+        """
+        학습된 모델을 추론 번들(모델, 스케일러, 인코더, 피처 순서, 지표, 데이터 해시)로 저장
+        
+        Returns:
+            저장된 버전 디렉토리 경로
+        """
+        if self.model is None:
+            raise ValueError("저장할 모델이 없습니다. train_models()를 먼저 실행하세요.")
+        
+        report = getattr(self, 'training_report', {})
+        metrics = report.get('models', {}).get(self.best_model_name, {})
+        path = save_bundle(
+            self.model, self.scaler, self.label_encoders, self.feature_columns, self.best_model_name,
+            metrics=metrics, data_hash=getattr(self, 'data_hash', None), extra=extra, store_dir=store_dir,
+            feature_pipeline=self.feature_pipeline, drift_reference=self.drift_reference
+        )
+        print(f"💾 모델 번들 저장: {path}")
+        return path
+    
+    def load_model(self, version=None, store_dir=ARTIFACT_DIR, mmap_mode='r'):
+        """저장된 추론 번들을 로드해 예측에 필요한 상태를 복원 (기본: 최신 버전)"""
+        bundle = load_bundle(version, store_dir=store_dir, mmap_mode=mmap_mode)
+        self.model = bundle.model
+        self.scaler = bundle.scaler
+        self.label_encoders = bundle.label_encoders
+        self.feature_columns = bundle.feature_columns
+        self.best_model_name = bundle.best_model_name
+        self.data_hash = bundle.manifest.get('data_hash')
+        self.model_version = bundle.version
+        self.flat_model = bundle.flat_model
+        self.feature_pipeline = bundle.feature_pipeline
+        self.drift_reference = bundle.drift_reference
+        return bundle
+    
     def _detailed_evaluation(self, y_test, best_model_info):
         """
         상세 모델 평가
         """
+        from sklearn.metrics import classification_report, confusion_matrix
+        
         print("\\n📊 상세 평가 리포트:")
         print("="*50)
         print(classification_report(y_test, best_model_info['predictions'], target_names=['Fail', 'Pass']))
@@ -237,84 +394,96 @@ class DiecastingQualityPredictor:
             for idx, row in feature_importance.head(10).iterrows():
                 print(f"{row['feature']:<25}: {row['importance']:.4f}")
     
-    def predict_individual_samples(self, df=None):
-
-        print("\\n🎯 개별 샘플 예측 시작...")
-        
-        if df is None:
-            df = self.df_processed
-        
-        X = df[self.feature_columns]
-        
-        # 스케일링 (필요한 경우)
-        if self.best_model_name in ['LogisticRegression', 'SVM']:
-            X_scaled = self.scaler.transform(X)
-            predictions = self.model.predict(X_scaled)
-            probabilities = self.model.predict_proba(X_scaled)[:, 1]
-        else:
-            predictions = self.model.predict(X)
-            probabilities = self.model.predict_proba(X)[:, 1]
-        
-        # 결과 정리
-        results = []
-        for i, (pred, prob) in enumerate(zip(predictions, probabilities)):
-            result = {
-                'Index': i,
-                'Prediction': 'Pass' if pred == 1 else 'Fail',
-                'Confidence': prob if pred == 1 else 1-prob,
-                'Probability_Pass': prob,
-                'Probability_Fail': 1-prob
-            }
-            results.append(result)
-        
-        results_df = pd.DataFrame(results)
-        
-        # 실제값과 비교 (있는 경우)
+    def _inference_scaler(self):
+        """최적 모델이 스케일링된 입력을 쓰는 경우에만 스케일러 반환"""
+        return self.scaler if self.best_model_name in SCALED_MODELS else None
+    
+    def _cache_args(self):
+        """현재 모델용 예측 캐시와 버전 토큰 (캐시를 쓰지 않으면 (None, None))"""
+        cache = get_prediction_cache()
+        return (cache, model_token(self.model)) if cache is not None else (None, None)
+    
+    def _attach_actual(self, results_df, df):
+        """실제값이 있으면 결과에 비교 컬럼 추가"""
         if self.target_column in df.columns:
             actual = df[self.target_column].values
             results_df['Actual'] = actual
-            results_df['Correct'] = (results_df['Prediction'] == actual)
+            results_df['Correct'] = (results_df['Prediction'].values == actual)
             accuracy = results_df['Correct'].mean()
-            print(f"\\n전체 정확도: {accuracy:.4f}")
-        
+            print(f"\n전체 정확도: {accuracy:.4f}")
         return results_df
     
-    def predict_individual_samples_one_by_one(self, df=None):
+    def predict_individual_samples(self, df=None):
+
+        print("\n🎯 개별 샘플 예측 시작...")
         
         if df is None:
             df = self.df_processed
         
-        X = df[self.feature_columns]
-        
-        if self.best_model_name in ['LogisticRegression', 'SVM']:
-            X_scaled = self.scaler.transform(X)
-            predictions = self.model.predict(X_scaled)
-            probabilities = self.model.predict_proba(X_scaled)[:, 1]
-        else:
-            predictions = self.model.predict(X)
-            probabilities = self.model.predict_proba(X)[:, 1]
-        
-        results = []
-        for i, (pred, prob) in enumerate(zip(predictions, probabilities)):
-            result = {
-                'Index': i,
-                'Prediction': 'Pass' if pred == 1 else 'Fail',
-                'Confidence': prob if pred == 1 else 1-prob,
-                'Probability_Pass': prob,
-                'Probability_Fail': 1-prob
-            }
-            results.append(result)
-        
-        results_df = pd.DataFrame(results)
+        predictions, probabilities = score_chunk(
+            self.model, self._inference_scaler(), self.feature_columns, df, None, *self._cache_args()
+        )
+        return self._attach_actual(build_results(predictions, probabilities), df)
+    
+    def predict_individual_samples_one_by_one(self, df=None):
+        """이전 행 단위 예측 API - 벡터화된 predict_individual_samples와 같은 결과"""
+        return self.predict_individual_samples(df)
+    
+    def predict_one(self, record):
+        """
+        단일 레코드(dict 또는 Series) 예측 - 포레스트 모델이면 평탄화 평가기로 한 번에 계산
+
+        Returns:
+            (라벨, Pass 확률)
+        """
+        values = np.array([[record[col] for col in self.feature_columns]], dtype=np.float64)
+        cache, version = self._cache_args()
+        if self.flat_model is not None:
+            score = self.flat_model.predict_with_proba
+            labels, proba = cache.score(values, version, score) if cache is not None else score(values)
+            return labels[0], float(proba[0, 1])
+
+        row = pd.DataFrame(values, columns=self.feature_columns)
+        labels, probabilities = score_chunk(
+            self.model, self._inference_scaler(), self.feature_columns, row, None, cache, version
+        )
+        return labels[0], float(probabilities[0])
+    
+    def predict_batch(self, source, chunk_size=DEFAULT_CHUNK_SIZE, n_workers=1, transform=None, raw=False,
+                      **read_csv_kwargs):
+        """
+        대용량 입력을 고정 크기 청크로 나눠 예측 (메모리 사용량은 청크 크기에 비례)
         
-        if self.target_column in df.columns:
-            actual = df[self.target_column].values
-            results_df['Actual'] = actual
-            results_df['Correct'] = (results_df['Prediction'] == actual)
-            accuracy = results_df['Correct'].mean()
-            print(f"\\n전체 정확도: {accuracy:.4f}")
+        Args:
+            source: DataFrame, CSV 경로, DB 커서(fetchmany 지원) 또는 DataFrame iterable
+            chunk_size: 청크당 행 수
+            n_workers: 1보다 크면 청크를 워커 프로세스에 분산
+            transform: 청크를 모델 입력 피처로 변환하는 함수 (입력이 이미 피처 컬럼을 가지면 None)
+            raw: True면 원본 컬럼 입력으로 보고 학습된 전처리기(feature_pipeline)로 변환
         
-        return results_df
+        Returns:
+            DataFrame: Index, Prediction, Confidence, Probability_Pass, Probability_Fail
+        """
+        if self.model is None:
+            raise ValueError("모델이 없습니다. train_models() 또는 load_model()을 먼저 실행하세요.")
+        if raw and transform is None:
+            if self.feature_pipeline is None:
+                raise ValueError("학습된 전처리기가 없습니다.")
+            transform = self.feature_pipeline.transform
+        
+        cache, version = self._cache_args()
+        label_parts, proba_parts = [], []
+        for predictions, probabilities in iter_predictions(
+            self.model, self._inference_scaler(), self.feature_columns, source,
+            chunk_size=chunk_size, n_workers=n_workers, transform=transform, cache=cache, version=version,
+            **read_csv_kwargs
+        ):
+            label_parts.append(predictions)
+            proba_parts.append(probabilities)
+        
+        if not label_parts:
+            return build_results(np.empty(0, dtype=int), np.empty(0))
+        return build_results(np.concatenate(label_parts), np.concatenate(proba_parts))
     
     def print_prediction_summary(self, results_df):
 
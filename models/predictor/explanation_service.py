@@ -0,0 +1,270 @@
+# models/predictor/explanation_service.py
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from models.predictor.flat_forest import compile_model
+
+try:
+    import shap
+except ImportError:  # 선택 의존성 - 없으면 결정 경로 기여도로 대체
+    shap = None
+
+logger = logging.getLogger(__name__)
+
+# 불량 판정 설명에 보여줄 상위 피처 수 / 설명 계산 워커 수 / 캐시 항목 수
+EXPLANATION_TOP_K = int(os.getenv('EXPLANATION_TOP_K', 3))
+EXPLANATION_WORKERS = int(os.getenv('EXPLANATION_WORKERS', 2))
+EXPLANATION_CACHE_SIZE = int(os.getenv('EXPLANATION_CACHE_SIZE', 10_000))
+
+# 설명 계산에 실패한 레코드의 캐시 값 (같은 레코드를 조회할 때마다 다시 계산하지 않도록)
+EXPLANATION_FAILED = 'failed'
+
+def path_contributions(flat_model, X, class_index):
+    """
+    결정 경로 기여도 (TreeSHAP 근사 - shap 패키지가 없을 때 사용)
+
+    트리마다 루트에서 리프까지 내려가며 분기 전후 노드의 클래스 확률 변화를 분기 피처에
+    더합니다. 기여도 합 + 기준값(루트 확률 평균)이 예측 확률과 정확히 같습니다.
+
+    Returns:
+        ((행, 피처) 기여도 배열, 기준값)
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+    rows = np.arange(len(X))[:, np.newaxis]
+    nodes = np.broadcast_to(flat_model.roots, (len(X), flat_model.n_trees))
+    contributions = np.zeros(X.shape, dtype=np.float64)
+    node_value = flat_model.leaf_value[:, class_index]
+
+    for _ in range(flat_model.max_depth):
+        feature = flat_model.feature[nodes]
+        x = X[rows, feature]
+        go_left = np.where(np.isnan(x), flat_model.missing_left[nodes], x <= flat_model.threshold[nodes])
+        children = np.where(go_left, flat_model.left[nodes], flat_model.right[nodes])
+        # 리프는 자기 자신을 가리키므로 변화량이 0
+        delta = node_value[children] - node_value[nodes]
+        np.add.at(contributions, (np.broadcast_to(rows, nodes.shape), feature), delta)
+        nodes = children
+
+    contributions /= flat_model.n_trees
+    return contributions, float(node_value[flat_model.roots].mean())
+
+class ExplanationService:
+    """
+    불량 예측의 피처 기여도를 UI 스레드 밖에서 계산하는 설명 서비스
+
+    submit()은 레코드를 워커 풀에 넘기고 바로 반환하며, 결과(불량 쪽으로 기여한 상위 피처)는
+    (레코드 id, 모델 버전)을 키로 LRU 캐시에 보관해 get()으로 즉시 조회합니다.
+    shap이 설치되어 있으면 TreeExplainer로 TreeSHAP 값을, 없으면 평탄화 포레스트의 결정 경로
+    기여도를 계산합니다.
+    """
+
+    def __init__(self, model, feature_columns, version, fail_class=1, top_k=EXPLANATION_TOP_K,
+                 n_workers=EXPLANATION_WORKERS, cache_size=EXPLANATION_CACHE_SIZE, feature_source=None):
+        """
+        Args:
+            model: 포레스트 모델 또는 마지막 단계가 포레스트인 Pipeline
+            feature_columns: submit()에 넘기는 값의 피처 순서
+            version: 모델 버전 (캐시 키)
+            fail_class: 불량을 뜻하는 모델 라벨 (리플레이 모델은 1, 예측기 모델은 'Fail' 또는 0)
+            feature_source: 레코드 id -> 피처 값(없으면 None) 함수 - 이 프로세스에서 점수화하지 않은
+                            레코드(DB에서 조회한 과거 불량 등)도 request()로 설명을 계산할 수 있게 함
+        """
+        self.preprocess, self.flat_model = compile_model(model)
+        if self.flat_model is None:
+            raise TypeError(f"트리 앙상블 모델만 설명할 수 있습니다: {type(model).__name__}")
+        self.estimator = model.steps[-1][1] if hasattr(model, 'steps') else model
+        self.feature_columns = list(feature_columns)
+        self.version = version
+        self.class_index = list(self.flat_model.classes.tolist()).index(fail_class)
+        self.top_k = top_k
+        self.cache_size = cache_size
+        self.method = 'treeshap' if shap is not None else 'path'
+        self.feature_source = feature_source
+        self.counters = {'submitted': 0, 'computed': 0, 'cache_hits': 0, 'errors': 0}
+        self._explainer = None
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="explain")
+        if shap is None:
+            logger.info("shap 패키지가 없어 결정 경로 기여도로 설명합니다.")
+
+    def submit(self, record_id, features):
+        """
+        설명 계산 요청 (블로킹 없음) - 캐시에 있거나 계산 중이면 그 결과를 공유
+
+        Args:
+            features: feature_columns 순서의 값 배열, 또는 피처 이름을 키로 갖는 dict/Series
+
+        Returns:
+            Future - 결과는 [{'feature', 'value', 'contribution'}, ...] (기여도 내림차순 top_k),
+            이전에 계산에 실패한 레코드면 EXPLANATION_FAILED
+        """
+        key = (record_id, self.version)
+        if isinstance(features, (dict, pd.Series)):
+            features = [features[col] for col in self.feature_columns]
+        with self._lock:
+            self.counters['submitted'] += 1
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.counters['cache_hits'] += 1
+                future = Future()
+                future.set_result(self._cache[key])
+                return future
+            if key in self._pending:
+                return self._pending[key]
+            future = self._executor.submit(self._explain, key, features)
+            self._pending[key] = future
+        return future
+
+    def request(self, record_id):
+        """
+        캐시에도 없고 계산 중도 아닌 레코드의 설명을 feature_source로 찾아 요청
+
+        Returns:
+            요청했으면 True (피처를 찾을 수 없으면 False)
+        """
+        if self.feature_source is None:
+            return False
+        features = self.feature_source(record_id)
+        if features is None:
+            return False
+        self.submit(record_id, features)
+        return True
+
+    def get(self, record_id):
+        """캐시된 설명 (아직 없으면 None, 계산에 실패했으면 EXPLANATION_FAILED)"""
+        with self._lock:
+            return self._cache.get((record_id, self.version))
+
+    def pending(self, record_id):
+        with self._lock:
+            return (record_id, self.version) in self._pending
+
+    def _feature_names(self, n_features):
+        """모델 입력 피처 이름 - 전처리가 컬럼 이름을 바꾸지 않으면 원래 컬럼 이름"""
+        if self.preprocess is not None and hasattr(self.preprocess, 'get_feature_names_out'):
+            try:
+                names = list(self.preprocess.get_feature_names_out())
+                if len(names) == n_features and names != [f"x{i}" for i in range(n_features)]:
+                    return names
+            except Exception:
+                pass
+        if len(self.feature_columns) == n_features:
+            return self.feature_columns
+        return [f"feature_{i}" for i in range(n_features)]
+
+    def explain_rows(self, X):
+        """
+        모델 입력 공간의 불량 클래스 기여도
+
+        Returns:
+            (모델 입력 배열, (행, 피처) 기여도 배열, 피처 이름)
+        """
+        X = pd.DataFrame(np.atleast_2d(np.asarray(X, dtype=np.float64)), columns=self.feature_columns)
+        if self.preprocess is not None:
+            X = self.preprocess.transform(X)
+        X = X.toarray() if hasattr(X, 'toarray') else np.asarray(X, dtype=np.float64)
+
+        if self.method == 'treeshap':
+            if self._explainer is None:
+                self._explainer = shap.TreeExplainer(self.estimator)
+            values = self._explainer.shap_values(X, check_additivity=False)
+            if isinstance(values, list):  # 이전 shap: 클래스별 (행, 피처) 리스트
+                values = values[self.class_index]
+            else:                         # shap 0.45+: (행, 피처, 클래스)
+                values = values[..., self.class_index]
+        else:
+            values = path_contributions(self.flat_model, X, self.class_index)[0]
+        return X, values, self._feature_names(X.shape[1])
+
+    def _explain(self, key, features):
+        try:
+            X, values, names = self.explain_rows([features])
+            # 피처 이름이 입력 컬럼과 같으면 운영자가 보는 원래 값(스케일링 전)을 표시
+            shown = np.asarray(features, dtype=np.float64) if names == self.feature_columns else X[0]
+            order = [j for j in np.argsort(-values[0])[:self.top_k] if values[0, j] > 0]
+            result = [
+                {'feature': names[j], 'value': float(shown[j]), 'contribution': float(values[0, j])}
+                for j in order
+            ]
+            with self._lock:
+                self._store(key, result)
+                self.counters['computed'] += 1
+            return result
+        except Exception as e:
+            # 실패도 캐시에 기록 - 화면에 남아 있는 행이 재실행마다 다시 요청되어 재계산/로그가 반복되지 않도록
+            with self._lock:
+                self._store(key, EXPLANATION_FAILED)
+                self.counters['errors'] += 1
+            logger.error(f"예측 설명 계산 실패 (id={key[0]}): {e}")
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _store(self, key, result):
+        """캐시에 저장하고 LRU 크기 유지 (lock 안에서 호출)"""
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, 'cached': len(self._cache), 'pending': len(self._pending), 'method': self.method}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+def format_explanation(result, digits=3):
+    """설명 결과를 표에 넣을 짧은 문자열로 ('cast_pressure(+0.120), ...')"""
+    if not result:
+        return ""
+    return ", ".join(f"{item['feature']}({item['contribution']:+.{digits}f})" for item in result)
+
+_services = {}
+_service_versions = {}
+_services_lock = threading.Lock()
+
+def get_explanation_service(key, factory, version=None):
+    """
+    key별로 프로세스당 하나의 설명 서비스 (모듈을 다시 실행하는 호출자도 공유)
+
+    version(예: 모델/데이터 파일 수정 시각)이 바뀌면 이전 서비스를 종료하고 새로 만듭니다.
+    """
+    key = str(key)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None or _service_versions.get(key) != version:
+            previous, service = service, factory()
+            _services[key] = service
+            _service_versions[key] = version
+            if previous is not None:
+                previous.close()
+        return service
+
+def lookup_explanation(record_id, request=False):
+    """
+    등록된 설명 서비스에서 레코드의 캐시된 설명 조회 - (결과 또는 None, 계산 중 여부)
+
+    결과가 EXPLANATION_FAILED면 계산에 실패한 레코드이며 다시 요청하지 않습니다.
+    request=True면 캐시에 없고 계산 중도 아닌 레코드를 피처를 찾을 수 있는 서비스에 요청합니다.
+    """
+    with _services_lock:
+        services = list(_services.values())
+    pending = False
+    for service in services:
+        result = service.get(record_id)
+        if result is not None:
+            return result, False
+        pending |= service.pending(record_id)
+    if request and not pending:
+        pending = any(service.request(record_id) for service in services)
+    return None, pending
@@ -0,0 +1,230 @@
+# models/predictor/feature_pipeline.py
+import numpy as np
+import pandas as pd
+
+# DiecastingQualityPredictor 학습/추론용 전처리 구성
+PREDICTOR_PIPELINE_CONFIG = {
+    'datetime_features': [
+        ('date', None, {'day_of_week': 'dayofweek', 'month': 'month', 'day': 'day'}),
+        ('time', '%H:%M:%S', {'hour': 'hour', 'minute': 'minute'})
+    ],
+    'categorical_columns': ['line', 'name', 'mold_name', 'mold_code', 'heating_furnace'],
+    'category_fill': 'Unknown',
+    'encoded_suffix': '_encoded',
+    'numeric_columns': [
+        'molten_temp', 'facility_operation_cycleTime', 'production_cycletime',
+        'low_section_speed', 'high_section_speed', 'molten_volume', 'cast_pressure',
+        'biscuit_thickness', 'upper_mold_temp1', 'upper_mold_temp2', 'upper_mold_temp3',
+        'lower_mold_temp1', 'lower_mold_temp2', 'lower_mold_temp3', 'sleeve_temperature',
+        'physical_strength', 'Coolant_temperature', 'EMS_operation_time'
+    ],
+    'engineered_features': True,
+    'drop_after': ['id', 'date', 'time', 'registration_time',
+                   'line', 'name', 'mold_name', 'mold_code', 'heating_furnace']
+}
+
+# data/test.py 리플레이 모델(CustomCleaner로 학습된 Pipeline)용 전처리 구성
+REPLAY_PIPELINE_CONFIG = {
+    'drop_before': [
+        'mold_name', 'name', 'line', 'emergency_stop', 'count',
+        'tryshot_signal', 'upper_mold_temp3', 'lower_mold_temp3',
+        'molten_volume', 'time', 'date', 'heating_furnace'
+    ],
+    'datetime_features': [
+        ('registration_time', None, {'hour': 'hour'})
+    ],
+    'value_maps': {'working': {'가동': 1, '비가동': 0}},
+    'categorical_columns': ['EMS_operation_time', 'mold_code'],
+    'numeric_columns': None,
+    'drop_after': ['registration_time'],
+    # 값이 이 이상이면 센서 이상치
+    'outlier_upper': {
+        'low_section_speed': 60000, 'upper_mold_temp1': 1449, 'sleeve_temperature': 1449,
+        'physical_strength': 60000, 'Coolant_temperature': 1449, 'upper_mold_temp2': 4000
+    },
+    # 값이 0이면 센서 이상치
+    'outlier_zero': ['molten_temp', 'production_cycletime']
+}
+
+def add_engineered_features(df):
+    """온도/속도/압력 파생 피처 추가 (df를 직접 수정)"""
+    temp_cols = ['upper_mold_temp1', 'upper_mold_temp2', 'upper_mold_temp3',
+                 'lower_mold_temp1', 'lower_mold_temp2', 'lower_mold_temp3']
+
+    existing_temp_cols = [col for col in temp_cols if col in df.columns]
+    if existing_temp_cols:
+        df['avg_mold_temp'] = df[existing_temp_cols].mean(axis=1)
+        df['temp_variation'] = df[existing_temp_cols].std(axis=1)
+
+    if 'low_section_speed' in df.columns and 'high_section_speed' in df.columns:
+        df['speed_ratio'] = df['high_section_speed'] / (df['low_section_speed'] + 1e-8)
+        df['speed_diff'] = df['high_section_speed'] - df['low_section_speed']
+
+    if 'molten_temp' in df.columns and 'avg_mold_temp' in df.columns:
+        df['temp_diff_molten_mold'] = df['molten_temp'] - df['avg_mold_temp']
+
+    if 'cast_pressure' in df.columns and 'molten_volume' in df.columns:
+        df['pressure_volume_ratio'] = df['cast_pressure'] / (df['molten_volume'] + 1e-8)
+
+    return df
+
+class FeaturePipeline:
+    """
+    학습과 서빙이 함께 쓰는 학습된 전처리기
+
+    fit()에서 범주 목록(정렬된 배열), 결측 대체용 중앙값, 이상치 임계값을 배열로 저장하고,
+    transform()은 한 행이든 백만 행이든 같은 벡터 연산으로 변환합니다.
+    범주 코드는 LabelEncoder와 같은 규칙(문자열 정렬 순서)이며, 학습 때 없던 값은 -1입니다.
+    """
+
+    def __init__(self, drop_before=(), datetime_features=(), value_maps=None,
+                 categorical_columns=(), category_fill=None, encoded_suffix='',
+                 numeric_columns=(), engineered_features=False, drop_after=(),
+                 outlier_upper=None, outlier_zero=()):
+        self.drop_before = list(drop_before)
+        self.datetime_features = [(col, fmt, dict(attrs)) for col, fmt, attrs in datetime_features]
+        self.value_maps = dict(value_maps or {})
+        self.categorical_columns = list(categorical_columns)
+        self.category_fill = category_fill
+        self.encoded_suffix = encoded_suffix
+        self.numeric_columns = None if numeric_columns is None else list(numeric_columns)
+        self.engineered_features = engineered_features
+        self.drop_after = list(drop_after)
+
+        # 이상치 임계값 (컬럼별 상한과 0 금지 여부를 배열로)
+        outlier_upper = dict(outlier_upper or {})
+        self.outlier_columns = list(dict.fromkeys(list(outlier_upper) + list(outlier_zero)))
+        self.outlier_upper = np.array([outlier_upper.get(col, np.inf) for col in self.outlier_columns], dtype=np.float64)
+        self.outlier_zero = np.array([col in outlier_zero for col in self.outlier_columns], dtype=bool)
+
+        self.categories_ = {}
+        self.median_columns_ = []
+        self.medians_ = np.empty(0)
+        self.fitted = False
+
+    @classmethod
+    def for_predictor(cls):
+        return cls(**PREDICTOR_PIPELINE_CONFIG)
+
+    @classmethod
+    def for_replay(cls):
+        return cls(**REPLAY_PIPELINE_CONFIG)
+
+    def outlier_mask(self, df):
+        """이상치 행 마스크 (True=이상치) - 값이 NaN이면 이상치로 보지 않음"""
+        columns = [col for col in self.outlier_columns if col in df.columns]
+        if not columns or len(df) == 0:
+            return np.zeros(len(df), dtype=bool)
+        positions = [self.outlier_columns.index(col) for col in columns]
+        values = df[columns].to_numpy(dtype=np.float64)
+        upper = self.outlier_upper[positions]
+        zero = self.outlier_zero[positions]
+        return ((values >= upper) | (zero & (values == 0))).any(axis=1)
+
+    def fit(self, df):
+        self._apply(df, fit=True)
+        self.fitted = True
+        return self
+
+    def transform(self, df):
+        if not self.fitted:
+            raise ValueError("fit()을 먼저 실행하세요.")
+        return self._apply(df, fit=False)
+
+    def fit_transform(self, df, copy=True):
+        """
+        Args:
+            copy: False면 df를 직접 변환 (호출자가 원본을 더 쓰지 않을 때 전체 복사본을 만들지 않음)
+        """
+        result = self._apply(df, fit=True, copy=copy)
+        self.fitted = True
+        return result
+
+    def encode(self, column, values):
+        """범주 값 배열을 학습된 코드로 변환 (없는 값은 -1)"""
+        categories = self.categories_[column]
+        values = np.asarray(values, dtype=str)
+        if len(categories) == 0:
+            return np.full(len(values), -1, dtype=np.int64)
+        index = np.searchsorted(categories, values)
+        clipped = np.minimum(index, len(categories) - 1)
+        return np.where(categories[clipped] == values, clipped, -1).astype(np.int64)
+
+    def _apply(self, df, fit, copy=True):
+        drop_before = [col for col in self.drop_before if col in df.columns]
+        if copy:
+            df = df.drop(columns=drop_before)
+        else:
+            df.drop(columns=drop_before, inplace=True)
+
+        for col, fmt, attrs in self.datetime_features:
+            if col in df.columns:
+                parsed = pd.to_datetime(df[col], format=fmt, errors='coerce')
+                df[col] = parsed
+                for name, attr in attrs.items():
+                    df[name] = getattr(parsed.dt, attr)
+
+        for col, mapping in self.value_maps.items():
+            if col in df.columns:
+                values = df[col]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.astype(object)
+                df[col] = values.map(mapping)
+
+        for col in self.categorical_columns:
+            # 고유값만 문자열로 바꾸고 행에는 코드로 펼침 (범주형 컬럼은 범주 코드를 그대로 사용)
+            fill = self.category_fill if self.category_fill is not None else 'nan'
+            if col in df.columns:
+                codes, uniques = pd.factorize(df[col])
+                # LabelEncoder(astype(str))와 같은 문자열 규칙, 결측(코드 -1)은 마지막 항목
+                labels = np.append(np.asarray(uniques, dtype=object).astype(str), fill)
+            elif not fit and col in self.categories_:
+                # 서빙 입력에 없는 컬럼은 결측으로 취급
+                codes, labels = np.full(len(df), -1, dtype=np.intp), np.array([fill])
+            else:
+                continue
+            if fit:
+                self.categories_[col] = np.unique(labels if (codes < 0).any() else labels[:-1])
+            if col in self.categories_:
+                df[f'{col}{self.encoded_suffix}'] = self.encode(col, labels)[codes]
+
+        if fit:
+            if self.numeric_columns is None:
+                columns = df.select_dtypes(include='number').columns.tolist()
+            else:
+                columns = [col for col in self.numeric_columns if col in df.columns]
+            self.median_columns_ = columns
+            self.medians_ = df[columns].median().to_numpy(dtype=np.float64) if columns else np.empty(0)
+
+        if self.median_columns_:
+            missing = {}
+            # 결측이 있는 컬럼만 채움 (프레임 전체를 다시 만들지 않고, float32 컬럼은 float32로 유지)
+            for col, median in zip(self.median_columns_, self.medians_):
+                if col not in df.columns:
+                    missing[col] = median
+                elif df[col].hasnans:
+                    dtype = df[col].dtype
+                    df[col] = df[col].fillna(dtype.type(median) if dtype.kind == 'f' else median)
+            # 서빙 입력(DB 등)에 없는 수치 컬럼은 학습 중앙값으로 채움
+            if missing:
+                df = df.assign(**missing)
+
+        if self.engineered_features:
+            df = add_engineered_features(df)
+
+        drop_after = [col for col in self.drop_after if col in df.columns]
+        if copy:
+            return df.drop(columns=drop_after)
+        df.drop(columns=drop_after, inplace=True)
+        return df
+
+    def summary(self):
+        """매니페스트 기록용 요약"""
+        return {
+            'categories': {col: cats.tolist() for col, cats in self.categories_.items()},
+            'medians': dict(zip(self.median_columns_, self.medians_.tolist())),
+            'outlier_upper': {
+                col: float(upper) for col, upper in zip(self.outlier_columns, self.outlier_upper) if np.isfinite(upper)
+            },
+            'outlier_zero': [col for col, zero in zip(self.outlier_columns, self.outlier_zero) if zero]
+        }
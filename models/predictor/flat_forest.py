@@ -0,0 +1,217 @@
+# models/predictor/flat_forest.py
+import time
+from pathlib import Path
+
+import numpy as np
+
+def is_supported_forest(model):
+    """
+    평탄화를 지원하는 앙상블(RandomForest/ExtraTrees - 모두 트리 확률 평균으로 예측)인지 확인
+
+    sklearn은 여기서 import하므로, 저장된 평탄화 배열만 평가하는 서빙 경로는 sklearn이 필요 없습니다.
+    """
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    return isinstance(model, (RandomForestClassifier, ExtraTreesClassifier))
+
+# FlatForest.save()가 기록하는 배열 (.npy로 저장해 np.load mmap_mode로 매핑 가능)
+FLAT_ARRAYS = ('feature', 'threshold', 'left', 'right', 'missing_left', 'leaf_value', 'roots', 'classes')
+
+class FlatForest:
+    """
+    학습된 RandomForest/ExtraTrees를 평탄한 NumPy 노드 배열로 컴파일한 평가기
+
+    모든 트리의 노드를 하나의 배열로 이어 붙이고 (행 x 트리) 노드 인덱스 행렬을
+    깊이 단위로 한꺼번에 전진시켜, 라벨과 확률을 한 번의 순회로 계산합니다.
+    sklearn의 입력 검증과 joblib 디스패치가 없어 단일 행 지연시간이 짧습니다.
+
+    sklearn과 같은 결과(비트 단위)를 내기 위해
+      - 입력을 float32로 변환한 뒤 float64 임계값과 '<='로 비교하고
+      - 리프 값은 트리별로 정규화한 확률을 사용하며
+      - 트리 확률은 트리 순서대로 누적한 뒤 트리 수로 나눕니다.
+    (학습 모델의 n_jobs > 1이면 sklearn 쪽 누적 순서가 스레드에 따라 달라져 마지막 비트가 다를 수 있음)
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, leaf_value, roots, classes, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.classes = classes
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_estimator(cls, forest):
+        """학습된 포레스트를 컴파일 (지원하지 않는 모델이면 TypeError)"""
+        if not is_supported_forest(forest):
+            raise TypeError(f"평탄화를 지원하지 않는 모델입니다: {type(forest).__name__}")
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise TypeError("다중 출력 포레스트는 지원하지 않습니다.")
+
+        n_classes = len(forest.classes_)
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            local = np.arange(n)
+
+            # 리프는 자기 자신을 가리키게 해서 깊이만큼 반복해도 제자리에 머물도록 함
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, local, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, local, tree.children_right) + offset)
+            if hasattr(tree, 'missing_go_to_left'):
+                missing.append(np.asarray(tree.missing_go_to_left, dtype=bool))
+            else:
+                missing.append(np.zeros(n, dtype=bool))
+
+            # DecisionTreeClassifier.predict_proba와 같은 방식으로 리프 값 정규화
+            value = np.array(tree.value[:, 0, :n_classes], dtype=np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            missing_left=np.concatenate(missing),
+            leaf_value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.array(forest.classes_.tolist()),  # object 배열은 .npy로 저장할 수 없으므로 구체 dtype으로
+            max_depth=max_depth
+        )
+
+    def apply(self, X):
+        """(행 x 트리) 리프 노드 인덱스 (전역 인덱스)"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        rows = np.arange(len(X))[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        has_missing = np.isnan(X).any()
+
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            if has_missing:
+                go_left = np.where(np.isnan(x), self.missing_left[nodes], go_left)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        """클래스 확률 (sklearn predict_proba와 동일한 결과)"""
+        leaf_values = self.leaf_value[self.apply(X)]          # (행, 트리, 클래스)
+        # cumsum은 트리 순서대로 더하므로 sklearn의 순차 누적과 반올림까지 같음
+        proba = np.cumsum(leaf_values, axis=1)[:, -1, :]
+        proba /= self.n_trees
+        return proba
+
+    def predict_with_proba(self, X):
+        """한 번의 순회로 (라벨 배열, 확률 배열) 반환"""
+        proba = self.predict_proba(X)
+        return self.classes[proba.argmax(axis=1)], proba
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+    def save(self, directory):
+        """배열을 .npy 파일로 저장 (load(mmap_mode='r')로 메모리 매핑 가능)"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in FLAT_ARRAYS:
+            np.save(directory / f"{name}.npy", getattr(self, name), allow_pickle=False)
+        np.save(directory / "max_depth.npy", np.asarray(self.max_depth))
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        directory = Path(directory)
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in FLAT_ARRAYS}
+        return cls(max_depth=np.load(directory / "max_depth.npy"), **arrays)
+
+def compile_model(model):
+    """
+    모델(또는 마지막 단계가 포레스트인 Pipeline)을 평탄화
+
+    Returns:
+        (전처리 단계 또는 None, FlatForest) - 지원하지 않는 모델이면 (None, None)
+    """
+    from sklearn.pipeline import Pipeline
+
+    preprocess = None
+    estimator = model
+    if isinstance(model, Pipeline):
+        preprocess = model[:-1] if len(model.steps) > 1 else None
+        estimator = model.steps[-1][1]
+    if not is_supported_forest(estimator):
+        return None, None
+    return preprocess, FlatForest.from_estimator(estimator)
+
+def benchmark_single_row(model, flat, X, n_rows=1000):
+    """
+    단일 행 지연시간 비교 (sklearn predict+predict_proba vs FlatForest 한 번)
+
+    Returns:
+        dict: 방식별 p50/p99 (ms)와 결과 일치 여부
+    """
+    X = np.asarray(X)
+    n_rows = min(n_rows, len(X))
+    timings = {'sklearn': [], 'flat': []}
+    identical = True
+    for i in range(n_rows):
+        row = X[i:i + 1]
+
+        started = time.perf_counter()
+        label = model.predict(row)
+        proba = model.predict_proba(row)
+        timings['sklearn'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        flat_label, flat_proba = flat.predict_with_proba(row)
+        timings['flat'].append(time.perf_counter() - started)
+
+        identical &= bool(np.array_equal(label, flat_label) and np.array_equal(proba, flat_proba))
+
+    report = {'rows': n_rows, 'identical': identical}
+    for name, values in timings.items():
+        values = np.asarray(values) * 1000
+        report[name] = {'p50_ms': float(np.percentile(values, 50)), 'p99_ms': float(np.percentile(values, 99))}
+    return report
+
+if __name__ == "__main__":
+    # 검증/벤치마크: python -m models.predictor.flat_forest
+    from sklearn.datasets import make_classification
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+    X, y = make_classification(n_samples=20000, n_features=20, n_informative=10, random_state=42)
+    X_train, X_test = X[:15000], X[15000:]
+    for forest in (RandomForestClassifier(n_estimators=100, random_state=42),
+                   ExtraTreesClassifier(n_estimators=100, random_state=42)):
+        forest.fit(X_train, y[:15000])
+        flat = FlatForest.from_estimator(forest)
+
+        batch_equal = np.array_equal(forest.predict_proba(X_test), flat.predict_proba(X_test))
+        report = benchmark_single_row(forest, flat, X_test)
+        print(f"{type(forest).__name__}: 노드 {flat.n_nodes:,}개, 최대 깊이 {flat.max_depth}, "
+              f"배치 일치 {batch_equal}, 단일 행 일치 {report['identical']}")
+        for name in ('sklearn', 'flat'):
+            print(f"   {name:<8} p50 {report[name]['p50_ms']:.3f}ms  p99 {report[name]['p99_ms']:.3f}ms")
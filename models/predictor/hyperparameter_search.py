@@ -0,0 +1,212 @@
+# models/predictor/hyperparameter_search.py
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterSampler, train_test_split
+from threadpoolctl import threadpool_limits
+
+project_root = Path(__file__).resolve().parents[2]
+SEARCH_CACHE_DIR = project_root / "models" / "search_cache"
+
+# 모델별 탐색 공간 (ParameterSampler로 후보를 뽑음)
+SEARCH_SPACES = {
+    'RandomForest': {
+        'max_depth': [None, 8, 16, 24],
+        'min_samples_leaf': [1, 2, 4, 8],
+        'max_features': ['sqrt', 'log2', 0.5],
+        'class_weight': [None, 'balanced']
+    },
+    'ExtraTrees': {
+        'max_depth': [None, 8, 16, 24],
+        'min_samples_leaf': [1, 2, 4, 8],
+        'max_features': ['sqrt', 'log2', 0.5],
+        'class_weight': [None, 'balanced']
+    },
+    'GradientBoosting': {
+        'learning_rate': [0.03, 0.1, 0.3],
+        'max_depth': [2, 3, 5],
+        'subsample': [0.7, 1.0],
+        'min_samples_leaf': [1, 5, 20]
+    },
+    'LogisticRegression': {
+        'C': [0.01, 0.1, 1.0, 10.0],
+        'class_weight': [None, 'balanced']
+    },
+    'SVM': {
+        'C': [0.1, 1.0, 10.0],
+        'gamma': ['scale', 0.01, 0.1],
+        'class_weight': [None, 'balanced']
+    }
+}
+
+# 트리 개수를 자원으로 쓸 수 있는 모델 (그 외는 샘플 수를 자원으로 사용)
+TREE_RESOURCE_MODELS = ['RandomForest', 'ExtraTrees', 'GradientBoosting']
+
+def data_fingerprint(X, y):
+    """학습 데이터(피처 값/컬럼/타겟)의 해시 - 탐색 결과 캐시 키로 사용"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(map(str, X.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    digest.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+class SearchCache:
+    """데이터 지문별 (모델, 파라미터, 자원) -> 점수 캐시 (JSON 파일)"""
+
+    def __init__(self, fingerprint, cache_dir=SEARCH_CACHE_DIR):
+        self.path = Path(cache_dir) / f"{fingerprint}.json"
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def key(model_name, params, resource_name, resource):
+        return json.dumps([model_name, params, resource_name, resource], sort_keys=True, default=str)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, score):
+        self.entries[key] = score
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, ensure_ascii=False), encoding='utf-8')
+
+def _evaluate_config(model, params, resource_name, resource, X_train, y_train, X_val, y_val, seed):
+    """
+    후보 설정 하나를 주어진 자원으로 학습해 검증 AUC 반환 (프로세스 풀 워커에서 실행)
+
+    resource_name이 'n_samples'면 학습 데이터를 층화 추출로 줄이고,
+    'n_estimators'면 트리 개수를 자원으로 사용합니다. 워커당 스레드는 1개로 제한합니다.
+    """
+    model.set_params(**params)
+    if resource_name == 'n_estimators':
+        model.set_params(n_estimators=int(resource))
+    elif resource < len(X_train):
+        X_train, _, y_train, _ = train_test_split(
+            X_train, y_train, train_size=int(resource), random_state=seed, stratify=y_train
+        )
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+
+    with threadpool_limits(limits=1):
+        model.fit(X_train, y_train)
+        # 순위 기반 지표이므로 가능하면 decision_function 사용
+        # (작은 표본에서 SVC의 Platt 확률은 순위가 뒤집힐 수 있음)
+        if hasattr(model, 'decision_function'):
+            scores = model.decision_function(X_val)
+        else:
+            scores = model.predict_proba(X_val)[:, 1]
+    return float(roc_auc_score(y_val, scores))
+
+def successive_halving(model_name, base_model, X, y, n_candidates=16, eta=3,
+                       resource_name=None, min_resource=None, max_resource=None,
+                       time_budget=None, n_workers=None, cache=None, random_state=42):
+    """
+    연속 절반 탐색(successive halving)
+
+    첫 단계에서 n_candidates개 설정을 작은 자원으로 평가하고, 단계마다 상위 1/eta만 남기며
+    자원을 eta배로 늘립니다. 각 단계의 평가는 프로세스 풀에서 병렬 실행되고,
+    time_budget(초)을 넘기면 새 단계를 시작하지 않고 그때까지의 최고 설정을 반환합니다.
+    캐시에 있는 (설정, 자원) 조합은 다시 학습하지 않습니다.
+
+    Returns:
+        dict: best_params, best_score, resource_name, rungs(단계별 기록), evaluated, cached, elapsed
+    """
+    started = time.perf_counter()
+    resource_name = resource_name or ('n_estimators' if model_name in TREE_RESOURCE_MODELS else 'n_samples')
+
+    # 학습 데이터 안에서 검증 세트 분리 (테스트 세트는 최종 비교에만 사용)
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X, y, test_size=0.25, random_state=random_state, stratify=y
+    )
+
+    if resource_name == 'n_estimators':
+        max_resource = max_resource or 300
+        min_resource = min_resource or 10
+    else:
+        max_resource = max_resource or len(X_fit)
+        min_resource = min_resource or max(50, len(X_fit) // eta ** 3)
+
+    candidates = list(ParameterSampler(
+        SEARCH_SPACES[model_name], n_iter=n_candidates, random_state=random_state
+    )) if SEARCH_SPACES.get(model_name) else [{}]
+    # 탐색 공간보다 많이 뽑힌 중복 설정 제거
+    unique = {json.dumps(c, sort_keys=True, default=str): c for c in candidates}
+    candidates = list(unique.values())
+
+    n_workers = n_workers or os.cpu_count() or 1
+    rungs = []
+    evaluated = cached = 0
+    resource = min_resource
+    best_params, best_score = candidates[0], -np.inf
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        while candidates:
+            if time_budget is not None and rungs and time.perf_counter() - started > time_budget:
+                print(f"   ⏰ 시간 예산 {time_budget:.1f}s 초과 - {len(rungs)}단계에서 탐색 종료")
+                break
+
+            resource = int(min(resource, max_resource))
+            scores = {}
+            futures = {}
+            for index, params in enumerate(candidates):
+                key = SearchCache.key(model_name, params, resource_name, resource)
+                if cache is not None and cache.get(key) is not None:
+                    scores[index] = cache.get(key)
+                    cached += 1
+                    continue
+                future = executor.submit(
+                    _evaluate_config, base_model, params, resource_name, resource,
+                    X_fit, y_fit, X_val, y_val, random_state
+                )
+                futures[future] = (index, key)
+
+            for future in as_completed(futures):
+                index, key = futures[future]
+                try:
+                    scores[index] = future.result()
+                except Exception as e:
+                    print(f"   ⚠️ {model_name} 설정 평가 실패: {e}")
+                    scores[index] = -np.inf
+                evaluated += 1
+                if cache is not None and np.isfinite(scores[index]):
+                    cache.put(key, scores[index])
+
+            ranked = sorted(scores, key=lambda i: scores[i], reverse=True)
+            best_params, best_score = candidates[ranked[0]], scores[ranked[0]]
+            rungs.append({'resource': resource, 'candidates': len(candidates), 'best_score': best_score})
+            print(f"   {model_name} 단계 {len(rungs)}: 후보 {len(candidates)}개, "
+                  f"{resource_name}={resource}, 최고 AUC {best_score:.4f}")
+
+            # 마지막 자원에 도달했거나 후보가 하나 남으면 종료
+            if resource >= max_resource or len(candidates) == 1:
+                break
+            keep = max(1, math.ceil(len(candidates) / eta))
+            candidates = [candidates[i] for i in ranked[:keep]]
+            resource *= eta
+
+    if cache is not None:
+        cache.save()
+
+    return {
+        'best_params': best_params,
+        'best_score': best_score,
+        'resource_name': resource_name,
+        'rungs': rungs,
+        'evaluated': evaluated,
+        'cached': cached,
+        'elapsed': time.perf_counter() - started
+    }
@@ -0,0 +1,224 @@
+# models/predictor/online_update.py
+import copy
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from models.predictor.flat_forest import FlatForest, is_supported_forest
+from models.predictor.prediction_cache import cached_scorer, model_token
+from models.predictor.prediction_service import model_scorer
+
+logger = logging.getLogger(__name__)
+
+# 한 번의 갱신에 쓰는 새 레코드 수 / 갱신마다 추가할 트리 수 / 유지할 최대 트리 수
+ONLINE_WINDOW_SIZE = int(os.getenv('ONLINE_WINDOW_SIZE', 2000))
+ONLINE_TREES_PER_WINDOW = int(os.getenv('ONLINE_TREES_PER_WINDOW', 20))
+ONLINE_MAX_TREES = int(os.getenv('ONLINE_MAX_TREES', 300))
+
+# 윈도우에 클래스별로 최소 이만큼은 있어야 갱신 (한 클래스만 있는 트리는 확률 차원이 맞지 않음)
+ONLINE_MIN_CLASS_COUNT = 10
+
+class OnlineForestUpdater:
+    """
+    새로 라벨링된 레코드로 포레스트 모델을 점진적으로 갱신
+
+    observe()로 들어온 원본 레코드를 모아 window_size가 차면, 현재 모델의 얕은 복사본에
+    warm_start로 trees_per_window개 트리를 새 윈도우 데이터로 추가하고 가장 오래된 트리를
+    잘라 max_trees개를 유지합니다. 기존 트리 객체는 공유하므로 전체 재학습 없이 윈도우
+    크기에 비례하는 비용만 듭니다.
+
+    갱신된 모델은 원본을 수정하지 않고 참조 교체로 반영되므로(원자적 교체), 처리 중인
+    예측은 이전 모델로 끝나고 이후 예측부터 새 모델을 사용합니다.
+    """
+
+    def __init__(self, predictor, window_size=ONLINE_WINDOW_SIZE, trees_per_window=ONLINE_TREES_PER_WINDOW,
+                 max_trees=ONLINE_MAX_TREES, background=True):
+        if not is_supported_forest(predictor.model):
+            raise TypeError(
+                f"점진 학습은 RandomForest/ExtraTrees 모델만 지원합니다: {type(predictor.model).__name__}"
+            )
+        if predictor.feature_pipeline is None:
+            raise ValueError("학습된 전처리기가 없습니다. train_models() 또는 load_model()을 먼저 실행하세요.")
+
+        self.predictor = predictor
+        self.window_size = window_size
+        self.trees_per_window = trees_per_window
+        self.max_trees = max_trees
+        self.updates = 0
+        self.history = []
+        self._listeners = []
+        self._buffer = []
+        self._buffered = 0
+        self._buffer_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="online-update") if background else None
+        self._pending = None
+
+    def add_listener(self, callback):
+        """모델 교체 시 callback(model, flat_model, updates) 호출"""
+        self._listeners.append(callback)
+
+    def bind_service(self, service):
+        """마이크로 배칭 예측 서비스가 교체된 모델을 사용하도록 연결 (캐시 키도 새 모델 버전으로)"""
+        self.add_listener(lambda model, flat_model, _: service.swap_scorer(
+            cached_scorer(model_scorer(model, flat_model=flat_model), model_token(model))
+        ))
+
+    @property
+    def buffered(self):
+        return self._buffered
+
+    def observe(self, records):
+        """
+        라벨(passorfail)이 있는 원본 레코드 추가 (dict, dict 리스트 또는 DataFrame)
+
+        윈도우가 차면 갱신을 시작합니다 (background=True면 별도 스레드에서).
+
+        Returns:
+            갱신을 시작했으면 True
+        """
+        if isinstance(records, dict):
+            records = [records]
+        frame = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+        target = self.predictor.target_column
+        frame = frame[frame[target].notna()] if target in frame.columns else frame.iloc[0:0]
+        if frame.empty:
+            return False
+
+        with self._buffer_lock:
+            self._buffer.append(frame)
+            self._buffered += len(frame)
+            if self._buffered < self.window_size:
+                return False
+            # 이전 갱신이 아직 진행 중이면 윈도우를 계속 모음
+            if self._pending is not None and not self._pending.done():
+                return False
+            window = pd.concat(self._buffer, ignore_index=True)
+            self._buffer, self._buffered = [], 0
+
+        if self._executor is None:
+            return self.update(window)
+        self._pending = self._executor.submit(self._update_or_requeue, window)
+        return True
+
+    def _update_or_requeue(self, window):
+        try:
+            if not self.update(window):
+                self._requeue(window)
+        except Exception as e:
+            logger.error(f"온라인 모델 갱신 실패: {e}")
+
+    def _requeue(self, window):
+        # 클래스가 부족한 윈도우는 다음 레코드와 합쳐 다시 시도 (최근 window_size행만 유지)
+        with self._buffer_lock:
+            self._buffer.insert(0, window.tail(self.window_size))
+            self._buffered += min(len(window), self.window_size)
+
+    def update(self, window):
+        """
+        윈도우 하나로 트리를 추가하고 모델 교체
+
+        Returns:
+            교체했으면 True, 클래스 구성이 부족해 건너뛰었으면 False
+        """
+        predictor = self.predictor
+        started = time.perf_counter()
+
+        features = predictor.feature_pipeline.transform(window)
+        X = features[predictor.feature_columns]
+        # 학습 때와 같은 규칙으로 인코딩 (모델 classes_는 [0, 1])
+        y = predictor.encode_target(features[predictor.target_column])
+
+        current = predictor.model
+        counts = y.value_counts()
+        if any(counts.get(label, 0) < ONLINE_MIN_CLASS_COUNT for label in current.classes_):
+            logger.info(f"온라인 갱신 보류 - 클래스 구성 부족: {counts.to_dict()}")
+            return False
+
+        # 얕은 복사본에 warm_start로 트리 추가 (기존 트리는 공유, 원본 모델은 그대로)
+        updated = copy.copy(current)
+        updated.estimators_ = list(current.estimators_)
+        updated.set_params(
+            warm_start=True,
+            n_estimators=len(updated.estimators_) + self.trees_per_window,
+            n_jobs=1,
+            oob_score=False
+        )
+        updated.fit(X, y)
+
+        # 가장 오래된 트리부터 제거해 최대 트리 수 유지
+        if len(updated.estimators_) > self.max_trees:
+            updated.estimators_ = updated.estimators_[-self.max_trees:]
+            updated.set_params(n_estimators=len(updated.estimators_))
+
+        flat_model = FlatForest.from_estimator(updated)
+        self._swap(updated, flat_model)
+
+        record = {
+            'update': self.updates,
+            'rows': len(window),
+            'trees': len(updated.estimators_),
+            'seconds': time.perf_counter() - started,
+            'window_accuracy': float(np.mean(current.predict(X) == y))
+        }
+        self.history.append(record)
+        logger.info(
+            f"온라인 모델 갱신 #{record['update']}: {record['rows']}행, 트리 {record['trees']}개, "
+            f"{record['seconds']:.2f}s (갱신 전 윈도우 정확도 {record['window_accuracy']:.3f})"
+        )
+        return True
+
+    def _swap(self, model, flat_model):
+        with self._swap_lock:
+            self.predictor.model = model
+            self.predictor.flat_model = flat_model
+            self.updates += 1
+            updates = self.updates
+        for callback in self._listeners:
+            try:
+                callback(model, flat_model, updates)
+            except Exception as e:
+                logger.error(f"모델 교체 알림 실패: {e}")
+
+    def wait(self, timeout=None):
+        """진행 중인 백그라운드 갱신이 끝날 때까지 대기"""
+        if self._pending is not None:
+            self._pending.result(timeout)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+if __name__ == "__main__":
+    # sensor_data를 주기적으로 읽어 최신 번들을 점진 갱신하고 새 버전으로 저장
+    # python -m models.predictor.online_update --interval 60
+    import argparse
+    from models.predictor.die_casting_predictor import DiecastingQualityPredictor
+    from utils.data_utils import get_labelled_sensor_data
+
+    parser = argparse.ArgumentParser(description="라벨 데이터 기반 포레스트 모델 점진 갱신")
+    parser.add_argument("--interval", type=float, default=60, help="조회 주기(초)")
+    parser.add_argument("--window", type=int, default=ONLINE_WINDOW_SIZE, help="갱신당 레코드 수")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    predictor = DiecastingQualityPredictor()
+    bundle = predictor.load_model()
+    updater = OnlineForestUpdater(predictor, window_size=args.window, background=False)
+    # 교체된 모델을 새 번들 버전으로 저장 (LATEST 포인터 교체로 다른 프로세스에도 원자적으로 반영)
+    updater.add_listener(lambda model, flat_model, updates: predictor.save_model(
+        extra={'parent_version': bundle.version, 'online_updates': updates}
+    ))
+
+    since = bundle.manifest.get('created_at')
+    while True:
+        records = get_labelled_sensor_data(since=since, limit=args.window)
+        if not records.empty:
+            since = records['registration_time'].max().isoformat()
+            updater.observe(records)
+        time.sleep(args.interval)
@@ -0,0 +1,218 @@
+# models/predictor/prediction_cache.py
+import hashlib
+import itertools
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 캐시 최대 항목 수 (0이면 캐시 사용 안 함)
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 100_000))
+
+# 키를 만들 때 피처 값을 반올림할 소수 자릿수
+# (센서 값은 정수 또는 소수 1자리이므로 이 정도면 서로 다른 입력이 합쳐지지 않음)
+PREDICTION_CACHE_DECIMALS = int(os.getenv('PREDICTION_CACHE_DECIMALS', 6))
+
+# 이보다 많은 행을 한 번에 점수화하면 캐시를 거치지 않음 (기본: 최대 항목 수의 1/10)
+# 오프라인 일괄 예측은 같은 행을 다시 보는 일이 드물어 키 계산/삽입 비용만 들고,
+# 한 번에 수만 행을 넣으면 실시간 리플레이의 자주 쓰는 항목이 LRU에서 밀려나기 때문
+PREDICTION_CACHE_MAX_BATCH = int(os.getenv('PREDICTION_CACHE_MAX_BATCH', PREDICTION_CACHE_SIZE // 10))
+
+# 통계 로그 간격(초)
+PREDICTION_CACHE_LOG_SECONDS = float(os.getenv('PREDICTION_CACHE_LOG_SECONDS', 60))
+
+_model_tokens = weakref.WeakKeyDictionary()
+_model_counter = itertools.count(1)
+_model_tokens_lock = threading.Lock()
+
+def model_token(model):
+    """
+    프로세스 안에서 모델 객체마다 고유한 버전 토큰
+
+    재학습이나 온라인 갱신으로 모델 객체가 바뀌면 토큰도 바뀌므로, 이전 모델의 캐시 항목은
+    조회되지 않고 LRU 순서에 따라 밀려납니다.
+    """
+    with _model_tokens_lock:
+        token = _model_tokens.get(model)
+        if token is None:
+            token = f"{type(model).__name__}-{next(_model_counter)}"
+            _model_tokens[model] = token
+        return token
+
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+def _hash_rows(bits, seed):
+    """(행, 피처) uint64 비트 배열 -> 행별 64비트 해시 (splitmix64 혼합)"""
+    h = np.full(len(bits), seed, dtype=np.uint64)
+    for j in range(bits.shape[1]):
+        h = (h ^ bits[:, j]) * _HASH_MULTIPLIER
+        h ^= h >> np.uint64(29)
+    h ^= h >> np.uint64(32)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(31)
+    return h
+
+class PredictionCache:
+    """
+    양자화한 피처 벡터 해시와 모델 버전을 키로 하는 LRU 예측 캐시
+
+    값은 (라벨, 클래스 확률 배열)이며, score()는 캐시에 없는 행만 모아 한 번에 점수화합니다.
+    max_batch_rows보다 큰 입력은 캐시를 조회/갱신하지 않고 바로 점수화합니다. 절약 시간은 캐시 미스 행의 평균 점수화 시간 x 적중 행 수로 추정합니다.
+    """
+
+    def __init__(self, max_entries=PREDICTION_CACHE_SIZE, decimals=PREDICTION_CACHE_DECIMALS, name="prediction",
+                 max_batch_rows=PREDICTION_CACHE_MAX_BATCH):
+        self.max_entries = max_entries
+        self.max_batch_rows = max_batch_rows
+        self.decimals = decimals
+        self.name = name
+        self.counters = {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'bypassed': 0,
+            'score_seconds': 0.0, 'saved_seconds': 0.0, 'overhead_seconds': 0.0
+        }
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_log = time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self, values, version):
+        """
+        (행, 피처) 값 -> 행별 캐시 키 (64비트 해시 두 개, 모델 버전을 시드로 섞음)
+
+        행마다 파이썬에서 해시 함수를 부르지 않도록 피처 비트 패턴을 NumPy로 한꺼번에 섞습니다.
+        """
+        values = np.round(np.atleast_2d(np.asarray(values, dtype=np.float64)), self.decimals)
+        # -0.0과 0.0, NaN 비트 패턴 차이로 키가 갈리지 않도록 정규화
+        values = np.where(np.isnan(values), np.nan, values + 0.0)
+        bits = np.ascontiguousarray(values).view(np.uint64)
+        seed = np.frombuffer(hashlib.blake2b(str(version).encode(), digest_size=16).digest(), dtype=np.uint64)
+        return list(zip(_hash_rows(bits, seed[0]).tolist(), _hash_rows(bits, seed[1]).tolist()))
+
+    def score(self, X, version, score_batch):
+        """
+        캐시를 거쳐 점수화
+
+        Args:
+            X: 피처 DataFrame 또는 (행, 피처) 배열
+            version: 모델 버전 (model_token 등)
+            score_batch: 캐시에 없는 행을 받아 (라벨 배열, 클래스 확률 행렬)을 반환하는 함수
+
+        Returns:
+            (라벨 배열, 클래스 확률 행렬)
+        """
+        if len(X) > self.max_batch_rows:
+            with self._lock:
+                self.counters['bypassed'] += len(X)
+            return score_batch(X)
+
+        started = time.perf_counter()
+        values = X.to_numpy(dtype=np.float64) if isinstance(X, pd.DataFrame) else X
+        keys = self.keys(values, version)
+        with self._lock:
+            cached = list(map(self._entries.get, keys))
+            hits = [i for i, entry in enumerate(cached) if entry is not None]
+            for i in hits:
+                self._entries.move_to_end(keys[i])
+        missing = [i for i, entry in enumerate(cached) if entry is None]
+
+        score_seconds = 0.0
+        if missing:
+            subset = X.iloc[missing] if isinstance(X, pd.DataFrame) else np.asarray(X)[missing]
+            score_started = time.perf_counter()
+            labels, proba = score_batch(subset)
+            score_seconds = time.perf_counter() - score_started
+            # 행 뷰가 아닌 파이썬 값으로 보관 (점수화 결과 배열 전체가 캐시에 붙잡히지 않도록)
+            for i, entry in zip(missing, zip(np.asarray(labels).tolist(), np.asarray(proba).tolist())):
+                cached[i] = entry
+
+        labels = np.asarray([entry[0] for entry in cached])
+        proba = np.asarray([entry[1] for entry in cached], dtype=np.float64)
+
+        with self._lock:
+            for i in missing:
+                self._entries[keys[i]] = cached[i]
+            evicted = max(len(self._entries) - self.max_entries, 0)
+            for _ in range(evicted):
+                self._entries.popitem(last=False)
+
+            counters = self.counters
+            counters['hits'] += len(hits)
+            counters['misses'] += len(missing)
+            counters['evictions'] += evicted
+            counters['score_seconds'] += score_seconds
+            if counters['misses']:
+                counters['saved_seconds'] += len(hits) * counters['score_seconds'] / counters['misses']
+            counters['overhead_seconds'] += time.perf_counter() - started - score_seconds
+
+        self._maybe_log()
+        return labels, proba
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """적중률과 절약 시간 추정치"""
+        with self._lock:
+            counters = dict(self.counters)
+            entries = len(self._entries)
+        lookups = counters['hits'] + counters['misses']
+        return {
+            **counters,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'hit_rate': counters['hits'] / lookups if lookups else 0.0,
+            'avg_miss_ms': counters['score_seconds'] / counters['misses'] * 1000 if counters['misses'] else None,
+            'net_saved_seconds': counters['saved_seconds'] - counters['overhead_seconds']
+        }
+
+    def _maybe_log(self):
+        now = time.monotonic()
+        if now - self._last_log < PREDICTION_CACHE_LOG_SECONDS:
+            return
+        self._last_log = now
+        stats = self.stats()
+        logger.info(
+            f"[{self.name}] 예측 캐시 적중률 {stats['hit_rate']:.1%} "
+            f"({stats['hits']:,}/{stats['hits'] + stats['misses']:,}), 항목 {stats['entries']:,}개, "
+            f"절약 추정 {stats['saved_seconds']:.2f}s (조회 오버헤드 {stats['overhead_seconds']:.2f}s)"
+        )
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_prediction_cache():
+    """프로세스 공용 예측 캐시 (PREDICTION_CACHE_SIZE=0이면 None)"""
+    global _cache
+    if PREDICTION_CACHE_SIZE <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PredictionCache()
+        return _cache
+
+def cached_scorer(score_batch, version, cache=None):
+    """
+    model_scorer 형태의 점수화 함수 앞에 캐시를 둔 함수 반환 (캐시를 쓰지 않으면 원래 함수)
+    """
+    cache = cache if cache is not None else get_prediction_cache()
+    if cache is None:
+        return score_batch
+
+    def score(X):
+        return cache.score(X, version, score_batch)
+
+    return score
+
+def prediction_cache_stats():
+    """프로세스 공용 예측 캐시 통계 (캐시가 없으면 빈 dict)"""
+    return _cache.stats() if _cache is not None else {}
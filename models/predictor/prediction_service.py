@@ -0,0 +1,263 @@
+# models/predictor/prediction_service.py
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 한 번의 predict_proba로 묶을 최대 요청 수 / 첫 요청 이후 최대 대기 시간
+PREDICTION_BATCH_MAX_ITEMS = int(os.getenv('PREDICTION_BATCH_MAX_ITEMS', 64))
+PREDICTION_BATCH_MAX_WAIT_MS = float(os.getenv('PREDICTION_BATCH_MAX_WAIT_MS', 5))
+
+# 통계 로그 간격(초)
+PREDICTION_STATS_LOG_SECONDS = float(os.getenv('PREDICTION_STATS_LOG_SECONDS', 60))
+
+# 히스토그램 구간 경계 (마지막 구간은 상한 없음)
+QUEUE_DELAY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+class Histogram:
+    """고정 구간 히스토그램 (구간 상한 이하인 값의 개수를 누적)"""
+
+    def __init__(self, bounds):
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.counts = np.zeros(len(self.bounds) + 1, dtype=np.int64)
+
+    def record(self, values):
+        index = np.searchsorted(self.bounds, np.atleast_1d(values), side='left')
+        np.add.at(self.counts, index, 1)
+
+    def percentile(self, q):
+        """구간 상한으로 근사한 백분위수 (마지막 구간이면 inf)"""
+        total = self.counts.sum()
+        if total == 0:
+            return None
+        index = int(np.searchsorted(np.cumsum(self.counts), total * q / 100.0, side='left'))
+        return float(self.bounds[index]) if index < len(self.bounds) else float('inf')
+
+    def snapshot(self):
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return dict(zip(labels, self.counts.tolist()))
+
+def model_scorer(model, scaler=None, flat_model=None, preprocess=None):
+    """
+    배치 점수화 함수 생성 - DataFrame을 받아 (라벨 배열, 클래스 확률 행렬) 반환
+
+    flat_model(FlatForest)이 있으면 sklearn 호출 없이 평탄화 평가기를 사용합니다.
+    """
+    estimator = getattr(model, '_final_estimator', model)
+
+    def score(X):
+        if preprocess is not None:
+            X = preprocess.transform(X)
+        if flat_model is not None:
+            X = X.toarray() if hasattr(X, 'toarray') else np.asarray(X, dtype=np.float64)
+            return flat_model.predict_with_proba(X)
+        if scaler is not None:
+            X = scaler.transform(X)
+        proba = model.predict_proba(X)
+        if getattr(estimator, 'probability', False):
+            # SVC의 predict는 decision_function 기준이므로 그대로 사용
+            return model.predict(X), proba
+        return np.asarray(model.classes_)[proba.argmax(axis=1)], proba
+
+    return score
+
+class MicroBatchPredictor:
+    """
+    프로세스 내 마이크로 배칭 예측 서비스
+
+    여러 생산자(리플레이, 수동 입력, WebSocket 서버 등)가 동시에 submit()한 요청을
+    백그라운드 스레드가 max_items개 또는 max_wait_ms까지 모아 한 번의 벡터화된
+    점수화 호출로 처리하고, 각 호출자의 Future에 (라벨, 클래스 확률 배열)을 채웁니다.
+    호출마다 들던 입력 검증/디스패치 비용을 배치당 한 번으로 줄입니다.
+    """
+
+    def __init__(self, score_batch, feature_columns, max_items=PREDICTION_BATCH_MAX_ITEMS,
+                 max_wait_ms=PREDICTION_BATCH_MAX_WAIT_MS, name="prediction"):
+        self.score_batch = score_batch
+        self.feature_columns = list(feature_columns)
+        self.max_items = max_items
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.queue_delay = Histogram(QUEUE_DELAY_BUCKETS_MS)
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.counters = {'requests': 0, 'batches': 0, 'errors': 0, 'model_swaps': 0, 'score_seconds': 0.0}
+        self._started = time.monotonic()
+        self._last_log = self._started
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._worker, name=f"{name}-microbatch", daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self):
+        return self._stopped
+
+    def submit(self, features):
+        """
+        요청 하나를 대기열에 추가하고 Future 반환 (블로킹 없음)
+
+        Args:
+            features: feature_columns 순서의 값 배열, 또는 피처 이름을 키로 갖는 dict/Series
+        """
+        if self._stopped:
+            raise RuntimeError("이미 종료된 예측 서비스입니다.")
+        if isinstance(features, (dict, pd.Series)):
+            features = [features[col] for col in self.feature_columns]
+        future = Future()
+        self._queue.put((features, future, time.monotonic()))
+        return future
+
+    def predict(self, features, timeout=None):
+        """submit() 후 결과를 기다리는 편의 함수 - (라벨, 클래스 확률 배열)"""
+        return self.submit(features).result(timeout)
+
+    def swap_scorer(self, score_batch):
+        """
+        점수화 함수 교체 (모델 갱신 시)
+
+        워커는 배치마다 현재 함수 참조를 한 번 읽으므로, 처리 중인 배치는 이전 모델로
+        끝나고 다음 배치부터 새 모델을 사용합니다.
+        """
+        self.score_batch = score_batch
+        with self._stats_lock:
+            self.counters['model_swaps'] += 1
+
+    def close(self, timeout=10):
+        """대기 중인 요청을 처리하고 백그라운드 스레드 종료"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        """처리량과 대기열 지연/배치 크기 히스토그램"""
+        with self._stats_lock:
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            counters = dict(self.counters)
+            return {
+                **counters,
+                'uptime_seconds': elapsed,
+                'throughput_per_second': counters['requests'] / elapsed,
+                'avg_batch_size': counters['requests'] / counters['batches'] if counters['batches'] else 0.0,
+                'queue_delay_p50_ms': self.queue_delay.percentile(50),
+                'queue_delay_p99_ms': self.queue_delay.percentile(99),
+                'queue_delay_ms': self.queue_delay.snapshot(),
+                'batch_size': self.batch_sizes.snapshot()
+            }
+
+    def _run_batch(self, batch):
+        started = time.monotonic()
+        futures = [future for _, future, _ in batch]
+        try:
+            X = pd.DataFrame(
+                np.asarray([features for features, _, _ in batch], dtype=np.float64),
+                columns=self.feature_columns
+            )
+            score_batch = self.score_batch
+            labels, proba = score_batch(X)
+            for i, future in enumerate(futures):
+                future.set_result((labels[i], proba[i]))
+        except Exception as e:
+            with self._stats_lock:
+                self.counters['errors'] += 1
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            logger.error(f"배치 예측 실패 ({len(batch)}건): {e}")
+
+        finished = time.monotonic()
+        with self._stats_lock:
+            self.counters['requests'] += len(batch)
+            self.counters['batches'] += 1
+            self.counters['score_seconds'] += finished - started
+            self.queue_delay.record([(started - enqueued) * 1000 for _, _, enqueued in batch])
+            self.batch_sizes.record(len(batch))
+
+        if finished - self._last_log >= PREDICTION_STATS_LOG_SECONDS:
+            self._last_log = finished
+            stats = self.stats()
+            logger.info(
+                f"[{self.name}] 처리량 {stats['throughput_per_second']:.1f}건/s, "
+                f"평균 배치 {stats['avg_batch_size']:.1f}건, "
+                f"대기 p50 {stats['queue_delay_p50_ms']}ms / p99 {stats['queue_delay_p99_ms']}ms"
+            )
+
+    def _worker(self):
+        running = True
+        while running:
+            item = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.max_wait
+
+            # 첫 요청 이후 max_items 또는 max_wait까지 모아서 한 번에 처리
+            while True:
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_items:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            # 종료 신호 전에 들어온 요청까지 처리
+            if not running:
+                while True:
+                    try:
+                        pending = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if pending is not None:
+                        batch.append(pending)
+
+            if batch:
+                self._run_batch(batch)
+
+_services = {}
+_service_versions = {}
+_services_lock = threading.Lock()
+
+def get_prediction_service(key, factory, version=None):
+    """
+    key별로 프로세스당 하나의 예측 서비스를 반환
+
+    모듈을 매번 다시 실행하는 호출자(data/test.py)도 같은 서비스를 공유하도록,
+    서비스가 없거나 종료된 경우, 또는 version(예: 모델 파일 수정 시각)이 바뀐 경우에만
+    factory()로 새로 만듭니다. 교체된 이전 서비스는 종료합니다.
+    """
+    key = str(key)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None or service.closed or _service_versions.get(key) != version:
+            previous, service = service, factory()
+            _services[key] = service
+            _service_versions[key] = version
+            if previous is not None:
+                previous.close()
+        return service
+
+def prediction_service_stats():
+    """등록된 모든 예측 서비스의 통계"""
+    with _services_lock:
+        return {key: service.stats() for key, service in _services.items()}
+
+@atexit.register
+def _close_all_services():
+    for service in list(_services.values()):
+        service.close()
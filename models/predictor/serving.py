@@ -0,0 +1,126 @@
+# models/predictor/serving.py
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from models.predictor.artifact_store import (
+    ARTIFACT_DIR, FLAT_MODEL_DIR, MODEL_FILE, PREPROCESS_FILE, load_feature_pipeline, read_manifest
+)
+from models.predictor.batch_inference import build_results
+from models.predictor.flat_forest import FlatForest
+from models.predictor.prediction_cache import get_prediction_cache
+
+# 스케일링된 입력을 사용하는 모델
+SCALED_MODELS = ['LogisticRegression', 'SVM']
+
+class ServingModel:
+    """
+    저장된 번들로 예측만 하는 경량 추론 경로
+
+    학습 코드(DiecastingQualityPredictor)와 sklearn 학습/평가 모듈을 import하지 않고,
+    번들에서 예측에 필요한 것만 로드합니다.
+      - 포레스트 모델: 평탄화 배열(.npy)과 전처리기만 로드 (sklearn 불필요)
+      - 그 외 모델: model.joblib (스케일링 모델이면 스케일러까지) - 역직렬화 시 해당 sklearn 모듈만 import
+    """
+
+    def __init__(self, manifest, feature_pipeline, flat_model=None, model=None, scaler=None, path=None):
+        self.manifest = manifest
+        self.feature_pipeline = feature_pipeline
+        self.flat_model = flat_model
+        self.model = model
+        self.scaler = scaler
+        self.path = path
+        self.feature_columns = list(manifest['feature_columns'])
+
+    @property
+    def version(self):
+        return self.manifest['version']
+
+    @classmethod
+    def load(cls, version=None, store_dir=ARTIFACT_DIR, mmap_mode='r'):
+        """번들 로드 (기본: 최신 버전)"""
+        manifest = read_manifest(version, store_dir)
+        path = Path(store_dir) / manifest['version']
+
+        feature_pipeline = load_feature_pipeline(path)
+        if (path / FLAT_MODEL_DIR).exists():
+            return cls(manifest, feature_pipeline, flat_model=FlatForest.load(path / FLAT_MODEL_DIR, mmap_mode), path=path)
+
+        model = joblib.load(path / MODEL_FILE, mmap_mode=mmap_mode)
+        scaler = None
+        if manifest['best_model_name'] in SCALED_MODELS:
+            scaler = joblib.load(path / PREPROCESS_FILE)['scaler']
+        return cls(manifest, feature_pipeline, model=model, scaler=scaler, path=path)
+
+    def features(self, records):
+        """원본 레코드(dict, dict 리스트 또는 DataFrame) -> 모델 입력 피처 DataFrame"""
+        if isinstance(records, dict):
+            records = [records]
+        frame = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+        if self.feature_pipeline is None:
+            raise ValueError("번들에 학습된 전처리기가 없습니다.")
+        return self.feature_pipeline.transform(frame)[self.feature_columns]
+
+    def score(self, X):
+        """피처 DataFrame -> (라벨 배열, 클래스 확률 행렬)"""
+        if self.flat_model is not None:
+            return self.flat_model.predict_with_proba(X.to_numpy(dtype=np.float64))
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        proba = self.model.predict_proba(X)
+        if getattr(self.model, 'probability', False):
+            # SVC의 predict는 decision_function 기준이므로 그대로 사용
+            return self.model.predict(X), proba
+        return np.asarray(self.model.classes_)[proba.argmax(axis=1)], proba
+
+    def _score_cached(self, X):
+        cache = get_prediction_cache()
+        return cache.score(X, self.version, self.score) if cache is not None else self.score(X)
+
+    def predict(self, records):
+        """
+        원본 레코드 예측
+
+        Returns:
+            DataFrame: Index, Prediction, Confidence, Probability_Pass, Probability_Fail
+        """
+        labels, proba = self._score_cached(self.features(records))
+        return build_results(labels, proba[:, 1])
+
+    def predict_one(self, record):
+        """
+        단일 원본 레코드 예측
+
+        Returns:
+            (라벨, Pass 확률)
+        """
+        labels, proba = self._score_cached(self.features(record))
+        return labels[0], float(proba[0, 1])
+
+def load_serving_model(version=None, store_dir=ARTIFACT_DIR, mmap_mode='r'):
+    return ServingModel.load(version, store_dir=store_dir, mmap_mode=mmap_mode)
+
+if __name__ == "__main__":
+    # 콜드 스타트 확인: python -m models.predictor.serving [input.csv]
+    import argparse
+    import sys
+
+    started = time.perf_counter()
+    parser = argparse.ArgumentParser(description="저장된 번들로 예측 (추론 전용 경로)")
+    parser.add_argument("input", nargs="?", help="원본 컬럼 CSV (없으면 로드 시간만 출력)")
+    parser.add_argument("--version", default=None, help="번들 버전 (기본: 최신)")
+    parser.add_argument("--output", default=None, help="예측 결과 CSV 경로")
+    args = parser.parse_args()
+
+    serving = load_serving_model(args.version)
+    print(f"번들 {serving.version} 로드: {(time.perf_counter() - started) * 1000:.0f}ms "
+          f"({'평탄화 포레스트' if serving.flat_model is not None else serving.manifest['model_class']}), "
+          f"sklearn import 여부: {'sklearn' in sys.modules}")
+    if args.input:
+        results = serving.predict(pd.read_csv(args.input))
+        print(results['Prediction'].value_counts().to_string())
+        if args.output:
+            results.to_csv(args.output, index=False)
@@ -1,5 +1,6 @@
 # styles/chart_styles.py
 import streamlit as st
+from datetime import timedelta
 from .style_manager import get_theme_colors
 
 def get_echarts_colors(dark_mode=False):
@@ -34,7 +35,12 @@ def get_echarts_colors(dark_mode=False):
 def create_control_chart_options(data, ucl, lcl, usl, lsl, mean_rate, dark_mode=False):
     """관리도 차트 옵션 생성"""
     colors = get_echarts_colors(dark_mode)
-    time_labels = [t.strftime("%H:%M") for t in data['time_points']]
+    time_points = data['time_points']
+    
+    # 하루 이상의 장기 이력은 날짜까지 표시
+    long_range = len(time_points) > 1 and (time_points[-1] - time_points[0]) >= timedelta(days=1)
+    time_format = "%m-%d %H:%M" if long_range else "%H:%M"
+    time_labels = [t.strftime(time_format) for t in time_points]
     
     return {
         "backgroundColor": colors['bg_color'],
@@ -96,7 +102,7 @@ def create_control_chart_options(data, ucl, lcl, usl, lsl, mean_rate, dark_mode=
             "nameTextStyle": {"color": colors['text_color'], "fontSize": 12, "fontWeight": "600"},
             "axisLine": {"lineStyle": {"color": colors['axis_color'], "width": 1}},
             "axisTick": {"lineStyle": {"color": colors['axis_color']}},
-            "axisLabel": {"color": colors['axis_color'], "fontSize": 11, "interval": 4},
+            "axisLabel": {"color": colors['axis_color'], "fontSize": 11, "interval": 4 if len(time_labels) <= 60 else "auto"},
             "splitLine": {"show": True, "lineStyle": {"color": colors['grid_color'], "type": "dashed"}}
         },
         "yAxis": {
@@ -5,153 +5,403 @@ from plotly.subplots import make_subplots
 import time
 import datetime
 import logging
+import os
+import numpy as np
 from pathlib import Path
+from utils.sigma_limits import SigmaLimitTable
+from utils.ring_buffer import ColumnarRingBuffer, to_epoch_ns
+from utils.downsampling import lttb_downsample
+from utils.multivariate import HotellingT2Detector
+from utils.shift_detectors import CUSUM_H, EwmaCusumState, ewma_cusum_batch
+from utils.feature_drift import DRIFT_WINDOW_MINUTES, PSI_ALERT, PSI_WARNING, drift_report
+from utils.data_utils import (
+    get_sensor_moments_by_mold,
+    get_sensor_series,
+    get_latest_sigma_limits_version,
+    load_sigma_limits,
+    compute_sigma_limits
+)
+from variables.molds import MOLD_CODES, normalize_mold_code
+from variables.monitoring import MONITORING_VARIABLES
 
 project_root = Path(__file__).parent.parent
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 3시그마 데이터 로드
+SIGMA_CSV_FILE = project_root / "data" / "3시그마범위데이터.csv"
+
+# 3시그마 데이터 로드 (버전별 캐시: 새 버전이 계산되면 자동으로 다시 로드)
 @st.cache_data
-def load_sigma_data():
+def load_sigma_data(version=None):
+    """sigma_limits 테이블의 해당 버전 관리한계 (버전이 없으면 정적 CSV로 대체)"""
+    if version is not None:
+        df = load_sigma_limits(version)
+        if not df.empty:
+            return df
     try:
-        # CSV 데이터를 직접 생성 (실제 환경에서는 파일 경로 사용)
-        csv_data = pd.read_csv(Path(project_root) / "data" / "3시그마범위데이터.csv")
-        
-        from io import StringIO
-        df = pd.read_csv(StringIO(csv_data))
-        return df
+        return pd.read_csv(SIGMA_CSV_FILE)
     except Exception as e:
         logger.error(f"3시그마 데이터 로드 실패: {e}")
         return pd.DataFrame()
 
-# 모니터링할 변수 정의
-MONITORING_VARIABLES = {
-    'molten_temp': {'label': '용탕온도', 'unit': '°C'},
-    'sleeve_temperature': {'label': '슬리브온도', 'unit': '°C'}, 
-    'upper_mold_temp1': {'label': '상형온도1', 'unit': '°C'},
-    'upper_mold_temp2': {'label': '상형온도2', 'unit': '°C'},
-    'lower_mold_temp1': {'label': '하형온도1', 'unit': '°C'},
-    'lower_mold_temp2': {'label': '하형온도2', 'unit': '°C'},
-    'cast_pressure': {'label': '주조압력', 'unit': 'bar'},
-    'low_section_speed': {'label': '저속구간속도', 'unit': 'm/s'},
-    'high_section_speed': {'label': '고속구간속도', 'unit': 'm/s'}
-}
+@st.cache_data(ttl=60)
+def load_sigma_version():
+    """최신 관리한계 버전 (1분 캐시 - 재계산된 버전을 주기적으로 확인)"""
+    return get_latest_sigma_limits_version()
+
+# 변수별 히스토리 보관 개수 (환경변수로 조정)
+MONITORING_HISTORY_DEPTH = int(os.getenv('MONITORING_HISTORY_DEPTH', 5000))
+
+# 패널당 브라우저로 전송할 최대 점 개수 (히스토리가 길어도 payload 크기 고정)
+MONITORING_CHART_POINTS = 300
+
+# 다변량(Hotelling T²) 점수 히스토리 컬럼
+T2_COLUMN = 'hotelling_t2'
+
+# 변수별 EWMA / CUSUM 히스토리 컬럼 접미사
+SHIFT_COLUMN_SUFFIXES = ('_ewma', '_cusum_pos', '_cusum_neg')
+
+def history_columns():
+    """히스토리 컬럼 구성: 공유 timestamp + 모니터링 변수별/T² float32"""
+    columns = {'timestamp': np.int64}
+    columns.update({variable: np.float32 for variable in MONITORING_VARIABLES})
+    columns[T2_COLUMN] = np.float32
+    for variable in MONITORING_VARIABLES:
+        for suffix in SHIFT_COLUMN_SUFFIXES:
+            columns[f"{variable}{suffix}"] = np.float32
+    return columns
+
+def create_history_buffer(depth=MONITORING_HISTORY_DEPTH):
+    """모니터링 히스토리 버퍼 생성"""
+    return ColumnarRingBuffer(history_columns(), depth)
 
-# 몰드 코드 매핑
-MOLD_CODE_MAPPING = {
-    8412: 0,
-    8722: 3, 
-    8917: 4
-}
+def record_values(record):
+    """레코드의 모니터링 변수 값 (숫자가 아니거나 없으면 NaN)"""
+    return {
+        variable: pd.to_numeric(record.get(variable), errors='coerce')
+        for variable in MONITORING_VARIABLES
+    }
 
-def get_sigma_limits(mold_code, variable, sigma_df):
+def append_history(history, values, timestamp, **derived):
+    """변수 값과 파생 통계(T² 등)를 히스토리에 한 행으로 추가"""
+    history.append(timestamp=to_epoch_ns(timestamp), **values, **derived)
+
+@st.cache_data(ttl=3600)
+def load_t2_baselines():
+    """sensor_data에서 몰드별 평균 벡터/공분산 기준값 로드 (1시간 캐시)"""
+    return get_sensor_moments_by_mold(list(MONITORING_VARIABLES.keys()))
+
+def get_t2_detector(mold_code):
+    """세션에 유지되는 몰드별 T² 탐지기 (기준값이 없으면 수집 데이터로 워밍업)"""
+    detectors = st.session_state.setdefault('t2_detectors', {})
+    # 모니터링 변수 구성이 바뀐 이전 세션의 탐지기는 새로 생성
+    if mold_code not in detectors or detectors[mold_code].variables != list(MONITORING_VARIABLES):
+        baseline = load_t2_baselines().get(mold_code)
+        if baseline:
+            detectors[mold_code] = HotellingT2Detector(
+                MONITORING_VARIABLES.keys(),
+                mean=baseline['mean'],
+                covariance=baseline['covariance'],
+                count=baseline['count']
+            )
+        else:
+            detectors[mold_code] = HotellingT2Detector(MONITORING_VARIABLES.keys())
+    return detectors[mold_code]
+
+@st.cache_data
+def load_sigma_table(version=None):
+    """3시그마 데이터를 [몰드, 변수] 조회 테이블로 컴파일 (버전당 1회)"""
+    return SigmaLimitTable.from_dataframe(
+        load_sigma_data(version),
+        mold_codes=MOLD_CODES,
+        variables=list(MONITORING_VARIABLES.keys())
+    )
+
+def get_sigma_limits(mold_code, variable, sigma_table):
     """특정 몰드와 변수에 대한 3시그마 범위 반환"""
-    test_label = MOLD_CODE_MAPPING.get(mold_code)
-    if test_label is None or sigma_df.empty:
-        return None, None
+    return sigma_table.limits(mold_code, variable)
+
+def get_shift_state(mold_code, sigma_table):
+    """
+    세션에 유지되는 몰드별 EWMA/CUSUM 상태
     
-    condition = (sigma_df['mold_code'] == mold_code) & (sigma_df['variable'] == variable)
-    filtered = sigma_df[condition]
+    목표 평균/표준편차는 sensor_data 기준값(평균, 공분산 대각)을 우선 사용하고,
+    없으면 3시그마 범위의 중심과 폭/6으로 대신합니다.
+    """
+    states = st.session_state.setdefault('shift_states', {})
+    if mold_code not in states or states[mold_code].variables != list(MONITORING_VARIABLES):
+        baseline = load_t2_baselines().get(mold_code)
+        if baseline:
+            target = baseline['mean']
+            sigma = np.sqrt(np.diag(baseline['covariance']))
+        else:
+            lower, upper = sigma_table.mold_limits(mold_code)
+            target = (lower + upper) / 2
+            sigma = (upper - lower) / 6
+        states[mold_code] = EwmaCusumState(MONITORING_VARIABLES.keys(), target, sigma)
+    return states[mold_code]
+
+def update_shift_statistics(state, values):
+    """
+    레코드 하나로 EWMA/CUSUM 갱신
+    
+    Returns:
+        (히스토리에 저장할 {컬럼: 값}, {변수: 드리프트 메시지} - 알람이 있는 변수만)
+    """
+    x = np.array([values[var] for var in state.variables], dtype=np.float64)
+    ewma_alarm, up_alarm, down_alarm = state.update(x)
+    
+    columns = {}
+    shift_status = {}
+    for j, variable in enumerate(state.variables):
+        columns[f"{variable}_ewma"] = state.ewma[j]
+        columns[f"{variable}_cusum_pos"] = state.cusum_pos[j]
+        columns[f"{variable}_cusum_neg"] = state.cusum_neg[j]
+        
+        messages = []
+        if ewma_alarm[j]:
+            messages.append("EWMA 이탈")
+        if up_alarm[j]:
+            messages.append("CUSUM 상향 이동")
+        if down_alarm[j]:
+            messages.append("CUSUM 하향 이동")
+        if messages:
+            shift_status[variable] = ", ".join(messages)
+    return columns, shift_status
+
+def record_key(record):
+    """레코드 식별 키 (id가 없으면 값 전체)"""
+    if record.get('id') is not None:
+        return record['id']
+    return repr(sorted(record.items(), key=lambda item: str(item[0])))
+
+def process_record(record, sigma_table):
+    """
+    새 레코드 하나를 레코드의 몰드(mold_code) 탐지기에 반영
     
-    if not filtered.empty:
-        return filtered['lower_3'].iloc[0], filtered['upper_3'].iloc[0]
-    return None, None
+    Returns:
+        dict: mold_code, values, time, t2_score, t2_anomaly, shift_columns, shift_status
+    """
+    mold_code = normalize_mold_code(record.get('mold_code'))
+    values = record_values(record)
+    processed = {
+        'mold_code': mold_code, 'values': values, 'time': datetime.datetime.now(),
+        't2_score': None, 't2_anomaly': False, 'shift_columns': {}, 'shift_status': {}
+    }
+    if mold_code is None:
+        # 몰드를 알 수 없는 레코드는 어느 몰드의 기준 분포에도 섞지 않음
+        return processed
+    processed['t2_score'], processed['t2_anomaly'] = get_t2_detector(mold_code).process(values)
+    processed['shift_columns'], processed['shift_status'] = update_shift_statistics(
+        get_shift_state(mold_code, sigma_table), values
+    )
+    return processed
 
-def create_realtime_chart(variable, current_value, history_data, mold_code, sigma_df):
-    """실시간 차트 생성"""
-    fig = go.Figure()
+def _history_trace(times, values, max_points, name, color='#1f77b4', dash=None, markers=True):
+    """히스토리 컬럼 view를 NaN 제외 후 LTTB로 줄인 Scattergl 트레이스"""
+    valid = np.isfinite(values)
+    if not valid.all():
+        times, values = times[valid], values[valid]
+    selected = lttb_downsample(times, values, max_points)
+    return go.Scattergl(
+        x=times[selected].view('datetime64[ns]'),
+        y=values[selected],
+        mode='lines+markers' if markers else 'lines',
+        name=name,
+        line=dict(color=color, width=2, dash=dash),
+        marker=dict(size=4)
+    )
+
+def create_monitoring_figure(history, current_data, mold_code, sigma_table, anomaly_status,
+                             t2_detector=None, max_points=MONITORING_CHART_POINTS):
+    """
+    모니터링 변수 전체를 하나의 3열 서브플롯(WebGL Scattergl)으로 생성
     
-    variable_info = MONITORING_VARIABLES.get(variable, {'label': variable, 'unit': ''})
+    각 패널의 히스토리는 LTTB로 max_points개 이하로 줄여서 전달하므로 히스토리 길이와
+    관계없이 payload 크기가 일정합니다. uirevision을 고정해 새로고침 후에도 확대/이동 상태가 유지됩니다.
+    각 패널에는 EWMA를 원본 값에 겹쳐 그리고, 보조 축에 CUSUM(C⁺/C⁻, σ 단위)과 결정구간 h를
+    표시합니다. 마지막 행에는 다변량 Hotelling T² 점수와 관리한계를 표시합니다.
+    """
+    variables = [var for var in MONITORING_VARIABLES if var in current_data]
+    titles = [
+        f"{MONITORING_VARIABLES[var]['label']} ({MONITORING_VARIABLES[var]['unit']})"
+        for var in variables
+    ]
+    variable_rows = max((len(variables) + 2) // 3, 1)
+    t2_row = variable_rows + 1
+    # 마지막 행이 덜 차도 T² 제목이 T² 행에 오도록 채움
+    titles += [''] * (variable_rows * 3 - len(titles)) + ['다변량 이상 점수 (Hotelling T²)']
+    fig = make_subplots(rows=t2_row, cols=3, subplot_titles=titles,
+                        specs=[[{'secondary_y': True}] * 3] * variable_rows + [[{'colspan': 3}, None, None]],
+                        horizontal_spacing=0.06, vertical_spacing=0.3 / t2_row)
     
-    # 히스토리 데이터가 있는 경우 라인 차트
-    if history_data and len(history_data) > 1:
-        times = [data['timestamp'] for data in history_data]
-        values = [data.get(variable, 0) for data in history_data]
+    times = history.column('timestamp')
+    current_time = times[-1].astype('datetime64[ns]') if len(history) else np.datetime64(datetime.datetime.now())
+    
+    for index, variable in enumerate(variables):
+        row, col = index // 3 + 1, index % 3 + 1
+        current_value = pd.to_numeric(current_data[variable], errors='coerce')
+        is_anomaly = anomaly_status.get(variable, (False, ''))[0]
         
-        fig.add_trace(go.Scatter(
-            x=times,
-            y=values,
-            mode='lines+markers',
-            name=variable_info['label'],
-            line=dict(color='#1f77b4', width=2),
-            marker=dict(size=6)
-        ))
-    
-    # 현재 값 표시
-    current_time = datetime.datetime.now()
-    fig.add_trace(go.Scatter(
-        x=[current_time],
-        y=[current_value],
-        mode='markers',
-        name='현재값',
-        marker=dict(color='red', size=12, symbol='circle')
-    ))
-    
-    # 3시그마 기준선 추가
-    lower_limit, upper_limit = get_sigma_limits(mold_code, variable, sigma_df)
-    if lower_limit is not None and upper_limit is not None:
-        fig.add_hline(
-            y=lower_limit, 
-            line_dash="dot", 
-            line_color="red",
-            annotation_text=f"하한: {lower_limit:.1f}",
-            annotation_position="right"
-        )
-        fig.add_hline(
-            y=upper_limit, 
-            line_dash="dot", 
-            line_color="red",
-            annotation_text=f"상한: {upper_limit:.1f}",
-            annotation_position="right"
-        )
+        # 히스토리 라인
+        if len(history) > 1:
+            fig.add_trace(_history_trace(
+                times, history.column(variable), max_points,
+                MONITORING_VARIABLES[variable]['label']
+            ), row=row, col=col)
+            # EWMA (원본 값과 같은 단위로 겹쳐 표시)
+            fig.add_trace(_history_trace(
+                times, history.column(f"{variable}_ewma"), max_points,
+                'EWMA', color='#ff7f0e', dash='dash', markers=False
+            ), row=row, col=col)
+            # CUSUM (σ 단위, 보조 축) - 결정구간 h를 넘으면 이동 알람
+            fig.add_trace(_history_trace(
+                times, history.column(f"{variable}_cusum_pos"), max_points,
+                'CUSUM C⁺', color='#2ca02c', markers=False
+            ), row=row, col=col, secondary_y=True)
+            fig.add_trace(_history_trace(
+                times, history.column(f"{variable}_cusum_neg"), max_points,
+                'CUSUM C⁻', color='#17becf', markers=False
+            ), row=row, col=col, secondary_y=True)
+            fig.add_trace(go.Scattergl(
+                x=times[[0, -1]].view('datetime64[ns]'), y=[CUSUM_H, CUSUM_H],
+                mode='lines', name='CUSUM h', line=dict(color='#2ca02c', width=1, dash='dot')
+            ), row=row, col=col, secondary_y=True)
+        
+        # 현재 값 (이상치면 주황 삼각형)
+        fig.add_trace(go.Scattergl(
+            x=[current_time],
+            y=[current_value],
+            mode='markers',
+            name='현재값',
+            marker=dict(
+                color='orange' if is_anomaly else 'red',
+                size=14 if is_anomaly else 10,
+                symbol='triangle-up' if is_anomaly else 'circle'
+            )
+        ), row=row, col=col)
         
-        # 이상치 체크
-        if current_value > upper_limit or current_value < lower_limit:
-            fig.add_trace(go.Scatter(
-                x=[current_time],
-                y=[current_value],
-                mode='markers',
-                name='이상치',
-                marker=dict(color='orange', size=15, symbol='triangle-up'),
-                showlegend=False
-            ))
-    
-    # 차트 레이아웃
+        # 3시그마 기준선
+        lower_limit, upper_limit = get_sigma_limits(mold_code, variable, sigma_table)
+        if lower_limit is not None and upper_limit is not None:
+            for limit in (lower_limit, upper_limit):
+                fig.add_hline(y=limit, line_dash="dot", line_color="red", row=row, col=col)
+    
+    # Hotelling T² 점수와 관리한계
+    if len(history) > 1:
+        fig.add_trace(_history_trace(
+            times, history.column(T2_COLUMN), max_points, 'T²', color='#9467bd'
+        ), row=t2_row, col=1)
+    if t2_detector is not None:
+        fig.add_hline(y=t2_detector.ucl, line_dash="dot", line_color="red", row=t2_row, col=1)
+    
     fig.update_layout(
-        title=f"{variable_info['label']} 실시간 모니터링",
-        xaxis_title="시간",
-        yaxis_title=f"{variable_info['label']} ({variable_info['unit']})",
-        height=300,
+        height=290 * t2_row,
         showlegend=False,
-        margin=dict(l=50, r=50, t=50, b=50)
+        margin=dict(l=50, r=30, t=50, b=40),
+        uirevision='monitoring'
     )
     
     return fig
 
-def check_anomaly(value, mold_code, variable, sigma_df):
-    """이상치 체크"""
-    lower_limit, upper_limit = get_sigma_limits(mold_code, variable, sigma_df)
-    if lower_limit is None or upper_limit is None:
-        return False, "정상"
-    
-    if value > upper_limit:
-        return True, f"상한 초과 ({upper_limit:.1f})"
-    elif value < lower_limit:
-        return True, f"하한 미달 ({lower_limit:.1f})"
-    else:
-        return False, "정상"
+def check_all_anomalies(record, mold_code, sigma_table):
+    """
+    레코드의 모니터링 변수 전체를 한 번에 이상치 판정
+    
+    Returns:
+        {변수: (이상 여부, 상태 메시지)} - 레코드에 있는 변수만 포함
+    """
+    variables = sigma_table.variables
+    values = np.array(
+        [pd.to_numeric(record.get(var), errors='coerce') if var in record else np.nan for var in variables],
+        dtype=np.float64
+    )
+    below, above = sigma_table.check(mold_code, values)
+    lower, upper = sigma_table.mold_limits(mold_code)
+    
+    statuses = {}
+    for j, variable in enumerate(variables):
+        if variable not in record:
+            continue
+        if above[j]:
+            statuses[variable] = (True, f"상한 초과 ({upper[j]:.1f})")
+        elif below[j]:
+            statuses[variable] = (True, f"하한 미달 ({lower[j]:.1f})")
+        else:
+            statuses[variable] = (False, "정상")
+    return statuses
+
+def render_shift_backtest(mold_code, sigma_table, days):
+    """sensor_data 이력에 EWMA/CUSUM을 배치로 적용해 변수별 알람 횟수 표시"""
+    variables = list(MONITORING_VARIABLES.keys())
+    df = get_sensor_series(variables, mold_code, days)
+    if df.empty:
+        st.info("백테스트할 센서 데이터가 없습니다.")
+        return
+    
+    state = get_shift_state(mold_code, sigma_table)
+    result = ewma_cusum_batch(df[variables], state.target, state.sigma,
+                              lam=state.lam, L=state.L, k=state.k, h=state.h)
+    
+    times = pd.to_datetime(df['time'])
+    summary = []
+    for j, variable in enumerate(variables):
+        ewma_alarm = result['ewma_alarm'][:, j]
+        cusum_alarm = result['cusum_alarm'][:, j]
+        first_alarm = np.flatnonzero(ewma_alarm | cusum_alarm)
+        summary.append({
+            '변수': MONITORING_VARIABLES[variable]['label'],
+            'EWMA 알람': int(ewma_alarm.sum()),
+            'CUSUM 알람': int(cusum_alarm.sum()),
+            '최초 알람 시각': times.iloc[first_alarm[0]].strftime('%Y-%m-%d %H:%M:%S') if len(first_alarm) else '-'
+        })
+    
+    st.caption(f"몰드 {mold_code} / 최근 {days}일 / {len(df):,}건")
+    st.dataframe(pd.DataFrame(summary), use_container_width=True)
+
+def render_drift_panel(mold_code):
+    """선택 몰드의 피처별 PSI/KS 드리프트 표"""
+    report = drift_report(mold_code)
+    if report.empty:
+        st.info("드리프트 기준 분포가 없습니다. 모델을 학습해 번들로 저장하면 생성됩니다.")
+        return
+    
+    drifted = report[report['status'] == '드리프트']
+    if not drifted.empty:
+        labels = [MONITORING_VARIABLES.get(f, {}).get('label', f) for f in drifted['feature']]
+        st.error(f"학습 분포에서 벗어난 피처: {', '.join(labels)}")
+    
+    display = report.assign(
+        feature=report['feature'].map(lambda f: MONITORING_VARIABLES.get(f, {}).get('label', f))
+    ).rename(columns={
+        'feature': '변수', 'psi': 'PSI', 'ks': 'KS', 'ks_critical': 'KS 임계값',
+        'reference_count': '학습 표본', 'current_count': '수집 표본', 'status': '상태'
+    })
+    st.dataframe(display.round(4), use_container_width=True, hide_index=True)
+    st.caption(
+        f"PSI {PSI_WARNING} 이상 주의, {PSI_ALERT} 이상 또는 KS가 임계값(유의수준 5%)을 넘으면 드리프트로 표시합니다. "
+        "기준 분포는 모델 번들에 저장된 학습 데이터 히스토그램이고, "
+        f"수집 표본은 최근 {DRIFT_WINDOW_MINUTES:g}분 동안의 레코드입니다."
+    )
 
 def run():
     """메인 실행 함수"""
     st.markdown('<h2 class="sub-header">실시간 데이터 모니터링</h2>', unsafe_allow_html=True)
     
-    # 3시그마 데이터 로드
-    sigma_df = load_sigma_data()
+    # 3시그마 관리한계 테이블 로드 (최신 버전)
+    sigma_version = load_sigma_version()
+    sigma_table = load_sigma_table(sigma_version)
+    
+    # 관리한계 버전이 바뀌면 한계 기반 드리프트 상태를 다시 생성
+    if st.session_state.get('sigma_version') != sigma_version:
+        st.session_state.sigma_version = sigma_version
+        st.session_state.pop('shift_states', None)
     
     # 상태 초기화
-    if 'realtime_history' not in st.session_state:
-        st.session_state.realtime_history = []
+    # (컬럼 구성이 바뀐 이전 세션의 히스토리는 새로 생성)
+    history = st.session_state.get('realtime_history')
+    if not isinstance(history, ColumnarRingBuffer) or history.columns != list(history_columns()):
+        st.session_state.realtime_history = create_history_buffer()
     
     # 컨트롤 패널
     col1, col2, col3 = st.columns([2, 2, 4])
@@ -160,7 +410,7 @@ def run():
         # 몰드 선택
         selected_mold = st.selectbox(
             "몰드 코드 선택",
-            options=list(MOLD_CODE_MAPPING.keys()),
+            options=sigma_table.available_molds() or MOLD_CODES,
             format_func=lambda x: f"몰드 {x}"
         )
     
@@ -177,28 +427,39 @@ def run():
         else:
             st.warning("데이터 수집 중지됨")
     
-    # 현재 데이터 가져오기
-    current_data = st.session_state.get('current_status', {})
+    # 현재 데이터 가져오기 (세션의 current_status는 실시간 버퍼의 몰드 집계에 쓰이므로 복사본 사용)
+    current_data = dict(st.session_state.get('current_status', {}))
     
     if not current_data:
         st.info("데이터를 수집하려면 사이드바에서 '시작' 버튼을 클릭하세요.")
         return
     
-    # 선택된 몰드에 맞는 데이터 필터링 (실제 구현에서는 mold_code로 필터링)
-    current_data['mold_code'] = selected_mold
+    # 새 레코드일 때만 T²/EWMA/CUSUM 갱신과 히스토리 추가 (자동 새로고침이나 위젯 조작으로
+    # 다시 실행되어도 같은 레코드를 통계에 중복 반영하지 않음)
+    processed = st.session_state.get('monitoring_processed')
+    record_id = record_key(current_data)
+    if processed is None or processed['key'] != record_id:
+        processed = process_record(current_data, sigma_table)
+        processed['key'] = record_id
+        st.session_state.monitoring_processed = processed
+        append_history(
+            st.session_state.realtime_history, processed['values'], processed['time'],
+            **{T2_COLUMN: processed['t2_score']}, **processed['shift_columns']
+        )
     
-    # 히스토리에 현재 데이터 추가
-    current_time = datetime.datetime.now()
-    current_data['timestamp'] = current_time.isoformat()
+    # 탐지기는 레코드의 실제 몰드 기준 (선택한 몰드는 관리한계 표시에 사용)
+    record_mold = processed['mold_code']
+    t2_detector = get_t2_detector(record_mold) if record_mold is not None else None
+    t2_score, t2_anomaly = processed['t2_score'], processed['t2_anomaly']
+    shift_status = processed['shift_status']
+    current_time = processed['time']
     
-    # 최근 50개 데이터만 유지
-    st.session_state.realtime_history.append(current_data.copy())
-    if len(st.session_state.realtime_history) > 50:
-        st.session_state.realtime_history = st.session_state.realtime_history[-50:]
+    # 전체 변수 이상치 판정 (한 번만 계산해 요약/차트에서 공유)
+    anomaly_status = check_all_anomalies(current_data, selected_mold, sigma_table)
     
     # 상태 요약
     st.markdown("### 시스템 상태 요약")
-    status_cols = st.columns(4)
+    status_cols = st.columns(5)
     
     with status_cols[0]:
         st.metric("수집된 데이터", len(st.session_state.realtime_history))
@@ -212,76 +473,107 @@ def run():
     
     with status_cols[3]:
         # 이상치 개수 계산
-        anomaly_count = 0
-        for var in MONITORING_VARIABLES.keys():
-            if var in current_data:
-                is_anomaly, _ = check_anomaly(
-                    current_data[var], selected_mold, var, sigma_df
-                )
-                if is_anomaly:
-                    anomaly_count += 1
+        anomaly_count = sum(is_anomaly for is_anomaly, _ in anomaly_status.values())
         
         if anomaly_count > 0:
             st.metric("이상치 감지", f"{anomaly_count}개", delta=anomaly_count)
         else:
             st.metric("이상치 감지", "없음")
     
+    with status_cols[4]:
+        if t2_detector is None:
+            st.metric("다변량 T²", "-", help="레코드의 몰드 코드를 알 수 없습니다")
+        elif t2_score is None:
+            st.metric("다변량 T²", "준비 중", help=f"몰드 {record_mold} 기준 데이터 {t2_detector.count}건")
+        elif t2_anomaly:
+            st.metric("다변량 T²", f"{t2_score:.1f}", delta=f"한계 {t2_detector.ucl:.1f} 초과", delta_color="inverse")
+        else:
+            st.metric("다변량 T²", f"{t2_score:.1f}", help=f"관리한계 {t2_detector.ucl:.1f}")
+    
     # 실시간 차트 표시
     st.markdown("### 실시간 모니터링 차트")
     
-    # 3x3 그리드로 차트 배치
-    for i in range(0, len(MONITORING_VARIABLES), 3):
+    # 변수별 상태 (3x3 그리드)
+    variables = [var for var in MONITORING_VARIABLES if var in current_data]
+    for i in range(0, len(variables), 3):
         cols = st.columns(3)
-        variables = list(MONITORING_VARIABLES.keys())[i:i+3]
-        
-        for j, variable in enumerate(variables):
-            if j < len(cols) and variable in current_data:
-                with cols[j]:
-                    current_value = current_data[variable]
-                    
-                    # 이상치 체크
-                    is_anomaly, status_msg = check_anomaly(
-                        current_value, selected_mold, variable, sigma_df
-                    )
-                    
-                    # 차트 생성
-                    chart = create_realtime_chart(
-                        variable, current_value, 
-                        st.session_state.realtime_history,
-                        selected_mold, sigma_df
-                    )
-                    
-                    # 상태에 따른 색상 표시
-                    if is_anomaly:
-                        st.error(f"{MONITORING_VARIABLES[variable]['label']}: {status_msg}")
-                    else:
-                        st.success(f"{MONITORING_VARIABLES[variable]['label']}: {status_msg}")
-                    
-                    # 현재값 표시
-                    unit = MONITORING_VARIABLES[variable]['unit']
-                    st.metric(
-                        f"현재값",
-                        f"{current_value:.2f} {unit}"
-                    )
-                    
-                    # 차트 표시
-                    st.plotly_chart(chart, use_container_width=True)
+        for j, variable in enumerate(variables[i:i+3]):
+            with cols[j]:
+                is_anomaly, status_msg = anomaly_status[variable]
+                label = MONITORING_VARIABLES[variable]['label']
+                unit = MONITORING_VARIABLES[variable]['unit']
+                current_value = pd.to_numeric(current_data[variable], errors='coerce')
+                
+                # 상태에 따른 색상 표시 (3시그마 이탈 > 드리프트 > 정상)
+                if is_anomaly:
+                    st.error(f"{label}: {status_msg} / 현재값 {current_value:.2f} {unit}")
+                elif variable in shift_status:
+                    st.warning(f"{label}: {shift_status[variable]} / 현재값 {current_value:.2f} {unit}")
+                else:
+                    st.success(f"{label}: {status_msg} / 현재값 {current_value:.2f} {unit}")
+    
+    # 전체 변수를 하나의 그림으로 생성/전송
+    build_start = time.perf_counter()
+    fig = create_monitoring_figure(
+        st.session_state.realtime_history, current_data,
+        selected_mold, sigma_table, anomaly_status, t2_detector
+    )
+    build_ms = (time.perf_counter() - build_start) * 1000
+    
+    serialize_start = time.perf_counter()
+    payload_bytes = len(fig.to_json())
+    serialize_ms = (time.perf_counter() - serialize_start) * 1000
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander("디버그: 차트 전송 정보"):
+        debug_cols = st.columns(4)
+        debug_cols[0].metric("Payload 크기", f"{payload_bytes / 1024:.1f} KB")
+        debug_cols[1].metric("Figure 생성", f"{build_ms:.1f} ms")
+        debug_cols[2].metric("직렬화", f"{serialize_ms:.1f} ms")
+        debug_cols[3].metric("히스토리 점 / 패널", f"{len(st.session_state.realtime_history)}")
+        st.caption(
+            f"패널당 최대 {MONITORING_CHART_POINTS}개 점만 전송합니다. "
+            "생성/직렬화 시간은 서버 측 측정값이며 브라우저 렌더링 시간은 포함하지 않습니다."
+        )
     
     # 상세 데이터 테이블
     with st.expander("상세 데이터 보기"):
-        if st.session_state.realtime_history:
+        history = st.session_state.realtime_history
+        if history:
             # 최근 10개 데이터 표시
-            recent_data = st.session_state.realtime_history[-10:]
-            df_display = pd.DataFrame(recent_data)
-            
-            # 필요한 컬럼만 선택
-            display_columns = ['timestamp'] + list(MONITORING_VARIABLES.keys())
-            display_columns = [col for col in display_columns if col in df_display.columns]
-            
-            if display_columns:
-                df_display = df_display[display_columns]
-                df_display['timestamp'] = pd.to_datetime(df_display['timestamp']).dt.strftime('%H:%M:%S')
-                st.dataframe(df_display, use_container_width=True)
+            display_columns = ['timestamp'] + list(MONITORING_VARIABLES.keys()) + [T2_COLUMN]
+            df_display = pd.DataFrame({
+                column: history.column(column, last=10) for column in display_columns
+            })
+            df_display['timestamp'] = pd.to_datetime(df_display['timestamp']).dt.strftime('%H:%M:%S')
+            st.dataframe(df_display, use_container_width=True)
+    
+    # EWMA/CUSUM 백테스트
+    with st.expander("EWMA/CUSUM 백테스트"):
+        backtest_days = st.number_input("조회 기간(일)", min_value=1, max_value=90, value=7, key="shift_backtest_days")
+        if st.button("백테스트 실행", key="shift_backtest_run"):
+            render_shift_backtest(selected_mold, sigma_table, backtest_days)
+    
+    # 학습 분포 대비 피처 드리프트 (수집 시 갱신되는 구간 카운터 기반)
+    with st.expander("피처 드리프트 (PSI / KS)"):
+        render_drift_panel(selected_mold)
+    
+    # 관리한계 재계산 (sensor_data 기반 배치 작업)
+    with st.expander("관리한계 관리"):
+        if sigma_version is not None:
+            computed = datetime.datetime.fromtimestamp(sigma_version).strftime('%Y-%m-%d %H:%M:%S')
+            st.caption(f"현재 관리한계 버전: {sigma_version} ({computed} 계산)")
+        else:
+            st.caption("계산된 관리한계가 없어 정적 CSV를 사용합니다.")
+        limit_days = st.number_input("계산 기간(일)", min_value=1, max_value=365, value=30, key="sigma_limit_days")
+        if st.button("관리한계 재계산", key="sigma_limit_recompute"):
+            new_version = compute_sigma_limits(list(MONITORING_VARIABLES.keys()), limit_days)
+            if new_version is not None:
+                load_sigma_version.clear()
+                st.success(f"새 관리한계 버전 {new_version}을 저장했습니다.")
+            else:
+                st.error("관리한계 계산에 실패했습니다.")
     
     # 자동 새로고침
     if auto_refresh and collection_status:
@@ -8,7 +8,6 @@ from streamlit_echarts import st_echarts
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from collections import deque
 import json
 import hashlib
 import sqlite3
@@ -31,6 +30,16 @@ from utils.data_utils import (
     get_all_pass_sensor_data)
 from streamlit.components.v1 import html
 from typing import Optional
+from variables.molds import MOLD_CODES, normalize_mold_code
+from utils.downsampling import lttb_downsample
+from utils.ring_buffer import (
+    RealtimeRingBuffer,
+    REALTIME_BUFFER_CAPACITY,
+    REALTIME_POINT_DTYPE,
+    to_epoch_ns)
+from utils.control_chart_maintenance import init_rollup_tables, start_compaction_worker
+from utils.group_commit import get_group_commit_writer
+from models.predictor.explanation_service import EXPLANATION_FAILED, format_explanation, lookup_explanation
 
 
 project_root = Path(__file__).parent.parent
@@ -43,6 +52,45 @@ CONTROL_CHART_DB = database_dir / "control_chart.db"
 # 데이터베이스 디렉토리 생성
 database_dir.mkdir(exist_ok=True)
 
+# 관리도 키: 전체 관리도는 'ALL', 몰드별 관리도는 실제 금형 코드
+OVERALL_CHART_KEY = 'ALL'
+CONTROL_CHART_KEYS = [OVERALL_CHART_KEY] + MOLD_CODES
+CONTROL_CHART_MAX_POINTS = 30
+CONTROL_CHART_TARGET_POINTS = 500
+
+# 관리도 조회 기간 (None: 실시간 최근 30개, 0: 전체 이력)
+CONTROL_CHART_RANGES = {
+    "실시간 (최근 30개)": None,
+    "최근 8시간 (교대)": 8,
+    "최근 24시간": 24,
+    "최근 7일": 24 * 7,
+    "최근 30일": 24 * 30,
+    "전체 이력": 0
+}
+
+# 실시간 버퍼 한 점 저장 SQL (그룹 커밋 writer가 배치로 실행)
+REALTIME_BUFFER_INSERT_SQL = '''
+    INSERT OR REPLACE INTO realtime_buffer 
+    ( id,timestamp, molten_temp, cast_pressure, passorfail, 
+    defect, data_id, data_hash,mold_code, registration_time,original_timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def _realtime_buffer_writer():
+    return get_group_commit_writer(CONTROL_CHART_DB, REALTIME_BUFFER_INSERT_SQL)
+
+def _chart_key_from_db(value):
+    """DB에 저장된 mold_code 값을 관리도 키로 변환"""
+    if value is None or value == OVERALL_CHART_KEY:
+        return OVERALL_CHART_KEY
+    return normalize_mold_code(value)
+
+def _empty_chart_series():
+    return {
+        'time_points': [],
+        'defect_rates': []
+    }
+
 def init_control_chart_database():
     """관리도 데이터베이스 테이블 초기화"""
     conn = sqlite3.connect(CONTROL_CHART_DB)
@@ -84,10 +132,19 @@ def init_control_chart_database():
         )
     ''')
     
+    # 몰드별 관리도 컬럼 추가 (기존 DB 마이그레이션, 기존 행은 전체 관리도)
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(control_chart_data)')]
+    if 'mold_code' not in columns:
+        cursor.execute(f"ALTER TABLE control_chart_data ADD COLUMN mold_code TEXT NOT NULL DEFAULT '{OVERALL_CHART_KEY}'")
+    
     # 인덱스 생성
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_control_chart_timestamp ON control_chart_data(timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_control_chart_mold_timestamp ON control_chart_data(mold_code, timestamp)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_buffer_timestamp ON realtime_buffer(timestamp)')
     
+    # 보존 기간이 지난 데이터의 분/시간 단위 집계 테이블
+    init_rollup_tables(cursor)
+    
     conn.commit()
     conn.close()
 
@@ -105,11 +162,13 @@ class RealTimeDataManager:
         # 데이터베이스 초기화
         init_control_chart_database()
         
+        # 롤업/보존 압축 워커 (프로세스당 1회 시작)
+        start_compaction_worker(CONTROL_CHART_DB)
+        
         defaults = {
             'ng_history': [],
             'collected_data': [],
             'control_chart_data': RealTimeDataManager._load_or_generate_chart_data(),
-            'realtime_buffer': deque(maxlen=100),
             'last_chart_update': time.time(),
             'chart_update_interval': 180,
             'data_collection_started': False,
@@ -122,58 +181,57 @@ class RealTimeDataManager:
             if key not in st.session_state:
                 st.session_state[key] = value
         
-        # 데이터베이스에서 버퍼 복원
-        RealTimeDataManager._restore_from_database()
+        # 버퍼가 새로 생성될 때만 데이터베이스에서 복원 (매 rerun마다 중복 적재 방지)
+        if 'realtime_buffer' not in st.session_state:
+            st.session_state.realtime_buffer = RealtimeRingBuffer(REALTIME_BUFFER_CAPACITY)
+            RealTimeDataManager._restore_from_database()
     
     @staticmethod
     def _load_or_generate_chart_data():
-        """데이터베이스에서 관리도 데이터 로드 또는 기본 데이터 생성"""
+        """데이터베이스에서 전체/몰드별 관리도 데이터 로드 (없으면 빈 데이터)"""
         conn = sqlite3.connect(CONTROL_CHART_DB)
         cursor = conn.cursor()
         
-        # 최근 30개 데이터 조회
+        # 관리도 키(전체/몰드)별 최근 30개 데이터를 한 번의 쿼리로 조회
         cursor.execute('''
-            SELECT timestamp, defect_rate, mean_rate, std_rate, ucl, lcl, usl, lsl
-            FROM control_chart_data 
-            ORDER BY timestamp DESC 
-            LIMIT 30
-        ''')
+            SELECT mold_code, timestamp, defect_rate, mean_rate, std_rate, ucl, lcl, usl, lsl
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY mold_code ORDER BY timestamp DESC
+                ) AS rn
+                FROM control_chart_data
+            )
+            WHERE rn <= ?
+            ORDER BY mold_code, timestamp
+        ''', (CONTROL_CHART_MAX_POINTS,))
         
         rows = cursor.fetchall()
         conn.close()
         
-        if rows:
-            # 데이터베이스에서 복원 (시간순 정렬)
-            rows.reverse()
-            time_points = [datetime.fromisoformat(row[0]) for row in rows]
-            defect_rates = [row[1] for row in rows]
-            
-            # 최신 관리한계값 사용
-            latest_row = rows[-1]
-            control_limits = {
-                'mean': latest_row[2],
-                'std': latest_row[3],
-                'ucl': latest_row[4],
-                'lcl': latest_row[5],
-                'usl': latest_row[6],
-                'lsl': latest_row[7]
-            } if latest_row[2] is not None else None
-            
-            chart_data = {
-                'time_points': time_points,
-                'defect_rates': defect_rates
-            }
+        chart_data = {key: _empty_chart_series() for key in CONTROL_CHART_KEYS}
+        
+        for row in rows:
+            key = _chart_key_from_db(row[0])
+            if key not in chart_data:
+                continue
+            series = chart_data[key]
+            series['time_points'].append(datetime.fromisoformat(row[1]))
+            series['defect_rates'].append(row[2])
             
-            if control_limits:
-                chart_data['control_limits'] = control_limits
-                
-            return chart_data
-        else:
-            # 빈 데이터로 시작
-            return {
-                'time_points': [],
-                'defect_rates': []
-            }
+            # 최신 관리한계값 사용 (시간순 정렬이므로 마지막 행이 최신)
+            if row[3] is not None:
+                series['control_limits'] = {
+                    'mean': row[3],
+                    'std': row[4],
+                    'ucl': row[5],
+                    'lcl': row[6],
+                    'usl': row[7],
+                    'lsl': row[8]
+                }
+            else:
+                series.pop('control_limits', None)
+        
+        return chart_data
     
     @staticmethod
     def _restore_from_database():
@@ -184,31 +242,30 @@ class RealTimeDataManager:
         # 최근 24시간 버퍼 데이터 복원
         cutoff_time = datetime.now() - timedelta(hours=24)
         cursor.execute('''
-            SELECT timestamp, mold_code, molten_temp, cast_pressure, passorfail, 
-                defect, data_id, data_hash, original_timestamp
+            SELECT timestamp, id, mold_code, molten_temp, cast_pressure, defect, data_hash
             FROM realtime_buffer 
             WHERE timestamp > ?
             ORDER BY timestamp
         ''', (cutoff_time.isoformat(),))
         
         buffer_rows = cursor.fetchall()
+        conn.close()
         
-        for row in buffer_rows:
-            data_point = {
-                'timestamp': datetime.fromisoformat(row[0]),
-                'mold_code': row[1],
-                'molten_temp': row[2],
-                'cast_pressure': row[3],
-                'passorfail': row[4],
-                'defect': row[5],
-                'data_id': row[6],
-                'data_hash': row[7],
-                'original_timestamp': row[8]
-            }
-            st.session_state.realtime_buffer.append(data_point)
-            st.session_state.processed_data_hashes.add(row[7])
+        if not buffer_rows:
+            return
         
-        conn.close()
+        # 열 단위로 변환하여 구조화 배열로 한 번에 적재
+        timestamps, ids, mold_codes, molten_temps, cast_pressures, defects, data_hashes = zip(*buffer_rows)
+        records = np.zeros(len(buffer_rows), dtype=REALTIME_POINT_DTYPE)
+        records['timestamp'] = np.array(timestamps, dtype='datetime64[ns]').astype(np.int64)
+        records['id'] = [-1 if v is None else v for v in ids]
+        records['mold_code'] = [normalize_mold_code(v) or 0 for v in mold_codes]
+        records['molten_temp'] = np.array(molten_temps, dtype=np.float64)
+        records['cast_pressure'] = np.array(cast_pressures, dtype=np.float64)
+        records['defect'] = [1 if v else 0 for v in defects]
+        
+        st.session_state.realtime_buffer.extend(records)
+        st.session_state.processed_data_hashes.update(data_hashes)
     
     @staticmethod
     def create_data_hash(data):
@@ -253,7 +310,7 @@ class RealTimeDataManager:
                 'original_timestamp': current_data.get('timestamp', '')
             }
             
-            st.session_state.realtime_buffer.append(data_point)
+            RealTimeDataManager._append_to_buffer(data_point)
             st.session_state.processed_data_hashes.add(data_hash)
             st.session_state.last_collected_id = data_id
             
@@ -262,18 +319,30 @@ class RealTimeDataManager:
             return True
         return False
     
+    @staticmethod
+    def _append_to_buffer(data_point):
+        """데이터 포인트를 구조화 배열 버퍼에 추가 (문자열/해시 등은 DB에만 저장)"""
+        def _as_float(value):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return np.nan
+        
+        record_id = data_point.get('id')
+        st.session_state.realtime_buffer.append(
+            timestamp=to_epoch_ns(data_point['timestamp']),
+            id=int(record_id) if record_id is not None else -1,
+            molten_temp=_as_float(data_point['molten_temp']),
+            cast_pressure=_as_float(data_point['cast_pressure']),
+            defect=data_point['defect'],
+            mold_code=normalize_mold_code(data_point['mold_code']) or 0
+        )
+    
     @staticmethod
     def _save_buffer_point_to_db(data_point):
+        """버퍼 포인트를 그룹 커밋 대기열에 추가 (UI 스레드는 커밋을 기다리지 않음)"""
         try:
-            conn = sqlite3.connect(CONTROL_CHART_DB)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO realtime_buffer 
-                ( id,timestamp, molten_temp, cast_pressure, passorfail, 
-                defect, data_id, data_hash,mold_code, registration_time,original_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            _realtime_buffer_writer().submit((
                 data_point['id'],
                 data_point['timestamp'].isoformat(),
                 data_point['molten_temp'],
@@ -286,36 +355,47 @@ class RealTimeDataManager:
                 data_point['registration_time'],
                 data_point['original_timestamp']
             ))
-            conn.commit()
-            conn.close()
         except Exception as e:
             st.error(f"버퍼 데이터 저장 오류: {str(e)}")
     
     @staticmethod
-    def calculate_defect_rate_from_buffer(time_window_minutes=60):
+    def calculate_defect_rates_by_mold_from_buffer(time_window_minutes=60):
+        """버퍼를 한 번만 훑어 전체/몰드별 불량률을 함께 계산"""
         if not st.session_state.realtime_buffer:
-            return None
+            return {}
         now = datetime.now()
         cutoff_time = now - timedelta(minutes=time_window_minutes)
         
-        recent_data = [
-            point for point in st.session_state.realtime_buffer 
-            if point['timestamp'] >= cutoff_time
-        ]
+        # 시간 구간 조회는 복사 없는 view
+        recent_data = st.session_state.realtime_buffer.since(cutoff_time)
         
-        if not recent_data:
-            return None
+        if len(recent_data) == 0:
+            return {}
         
-        total_count = len(recent_data)
-        defect_count = sum(point['defect'] for point in recent_data)
-        defect_rate = (defect_count / total_count) * 100
+        # 몰드 인덱스 (알 수 없는 몰드는 마지막 버킷 -> 전체 관리도에만 반영)
+        mold_codes = np.asarray(MOLD_CODES)
+        unknown_idx = len(MOLD_CODES)
+        groups = np.searchsorted(mold_codes, recent_data['mold_code'])
+        groups[mold_codes[np.minimum(groups, unknown_idx - 1)] != recent_data['mold_code']] = unknown_idx
+        defects = recent_data['defect']
         
-        return {
-            'timestamp': now,
-            'defect_rate': defect_rate,
-            'total_count': total_count,
-            'defect_count': defect_count
-        }
+        total_counts = np.bincount(groups, minlength=unknown_idx + 1)
+        defect_counts = np.bincount(groups, weights=defects, minlength=unknown_idx + 1)
+        
+        def _to_defect_data(total_count, defect_count):
+            return {
+                'timestamp': now,
+                'defect_rate': (defect_count / total_count) * 100,
+                'total_count': int(total_count),
+                'defect_count': int(defect_count)
+            }
+        
+        results = {OVERALL_CHART_KEY: _to_defect_data(total_counts.sum(), defect_counts.sum())}
+        for i, code in enumerate(MOLD_CODES):
+            if total_counts[i] > 0:
+                results[code] = _to_defect_data(total_counts[i], defect_counts[i])
+        
+        return results
     
     @staticmethod
     def should_update_chart():
@@ -329,61 +409,80 @@ class RealTimeDataManager:
     def update_control_chart():
         if not st.session_state.realtime_buffer:
             return False
-        defect_data = RealTimeDataManager.calculate_defect_rate_from_buffer()
+        defect_data_by_key = RealTimeDataManager.calculate_defect_rates_by_mold_from_buffer()
         
-        if defect_data is None:
+        if not defect_data_by_key:
             return False
         
-        chart_data = st.session_state.control_chart_data
-        chart_data['time_points'].append(defect_data['timestamp'])
-        chart_data['defect_rates'].append(defect_data['defect_rate'])
-        
-        # 30개 제한
-        if len(chart_data['time_points']) > 30:
-            chart_data['time_points'] = chart_data['time_points'][-30:]
-            chart_data['defect_rates'] = chart_data['defect_rates'][-30:]
+        all_chart_data = st.session_state.control_chart_data
+        rows_to_save = []
         
-        # 관리한계 재계산
-        ucl, lcl, usl, lsl, mean_rate = RealTimeDataManager._recalculate_control_limits(chart_data)
+        for key, defect_data in defect_data_by_key.items():
+            chart_data = all_chart_data.setdefault(key, _empty_chart_series())
+            chart_data['time_points'].append(defect_data['timestamp'])
+            chart_data['defect_rates'].append(defect_data['defect_rate'])
+            
+            # 30개 제한
+            if len(chart_data['time_points']) > CONTROL_CHART_MAX_POINTS:
+                chart_data['time_points'] = chart_data['time_points'][-CONTROL_CHART_MAX_POINTS:]
+                chart_data['defect_rates'] = chart_data['defect_rates'][-CONTROL_CHART_MAX_POINTS:]
+            
+            # 관리한계 재계산
+            ucl, lcl, usl, lsl, mean_rate = RealTimeDataManager._recalculate_control_limits(chart_data)
+            rows_to_save.append((key, defect_data, mean_rate, chart_data['control_limits']))
         
-        # 데이터베이스에 저장
-        RealTimeDataManager._save_control_chart_to_db(defect_data, mean_rate, 
-                                                       chart_data.get('control_limits', {}))
+        # 데이터베이스에 한 번에 저장
+        RealTimeDataManager._save_control_chart_to_db(rows_to_save)
         
         st.session_state.last_chart_update = time.time()
         
         return True
     
     @staticmethod
-    def _save_control_chart_to_db(defect_data, mean_rate, control_limits):
-        """관리도 데이터를 데이터베이스에 저장"""
+    def _save_control_chart_to_db(rows_to_save):
+        """전체/몰드별 관리도 데이터를 하나의 트랜잭션으로 저장"""
         try:
             conn = sqlite3.connect(CONTROL_CHART_DB)
             cursor = conn.cursor()
             
-            cursor.execute('''
+            cursor.executemany('''
                 INSERT INTO control_chart_data 
-                (timestamp, defect_rate, total_count, defect_count, 
+                (timestamp, mold_code, defect_rate, total_count, defect_count, 
                  mean_rate, std_rate, ucl, lcl, usl, lsl)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                defect_data['timestamp'].isoformat(),
-                defect_data['defect_rate'],
-                defect_data['total_count'],
-                defect_data['defect_count'],
-                mean_rate,
-                control_limits.get('std'),
-                control_limits.get('ucl'),
-                control_limits.get('lcl'),
-                control_limits.get('usl'),
-                control_limits.get('lsl')
-            ))
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (
+                    defect_data['timestamp'].isoformat(),
+                    str(key),
+                    defect_data['defect_rate'],
+                    defect_data['total_count'],
+                    defect_data['defect_count'],
+                    mean_rate,
+                    control_limits.get('std'),
+                    control_limits.get('ucl'),
+                    control_limits.get('lcl'),
+                    control_limits.get('usl'),
+                    control_limits.get('lsl')
+                )
+                for key, defect_data, mean_rate, control_limits in rows_to_save
+            ])
             
             conn.commit()
             conn.close()
         except Exception as e:
             st.error(f"관리도 데이터 저장 오류: {str(e)}")
     
+    @staticmethod
+    def _compute_control_limits(mean_rate, std_rate):
+        return {
+            'mean': mean_rate,
+            'std': std_rate,
+            'ucl': mean_rate + 3 * std_rate,
+            'lcl': max(0, mean_rate - 3 * std_rate),
+            'usl': mean_rate + 2 * std_rate,
+            'lsl': max(0, mean_rate - 2 * std_rate)
+        }
+    
     @staticmethod
     def _recalculate_control_limits(chart_data):
         if len(chart_data['defect_rates']) < 5:
@@ -395,40 +494,90 @@ class RealTimeDataManager:
             mean_rate = np.mean(recent_rates)
             std_rate = np.std(recent_rates)
         
-        ucl = mean_rate + 3 * std_rate
-        lcl = max(0, mean_rate - 3 * std_rate)
-        usl = mean_rate + 2 * std_rate
-        lsl = max(0, mean_rate - 2 * std_rate)
+        limits = RealTimeDataManager._compute_control_limits(mean_rate, std_rate)
+        chart_data['control_limits'] = limits
         
-        chart_data['control_limits'] = {
-            'mean': mean_rate,
-            'std': std_rate,
-            'ucl': ucl,
-            'lcl': lcl,
-            'usl': usl,
-            'lsl': lsl
-        }
+        return limits['ucl'], limits['lcl'], limits['usl'], limits['lsl'], mean_rate
+    
+    @staticmethod
+    def query_control_chart_history(chart_key=OVERALL_CHART_KEY, start_time=None, end_time=None,
+                                    target_points=CONTROL_CHART_TARGET_POINTS):
+        """
+        관리도 이력을 시간 범위로 조회하여 LTTB로 다운샘플링
+        
+        관리한계는 다운샘플링 전 전체 이력으로 계산하고, 화면에 전달되는 점의 수만
+        target_points 이하로 제한합니다. 보존 기간이 지나 원본이 삭제된 구간은
+        시간 단위 집계(control_chart_data_1h)의 평균 불량률로 채웁니다.
+        
+        관리한계는 시간 단위 평균과 원본 값을 같은 무게로 섞지 않고, 집계의 표본 수/합/제곱합과
+        원본 행을 합쳐 표본 가중 합동 평균과 표준편차로 계산합니다.
+        """
+        conditions = ''
+        range_params = []
+        if start_time is not None:
+            conditions += ' AND {col} >= ?'
+            range_params.append(start_time.isoformat())
+        if end_time is not None:
+            conditions += ' AND {col} <= ?'
+            range_params.append(end_time.isoformat())
+        
+        query = f'''
+            SELECT bucket AS timestamp, sample_count, sum_defect_rate,
+                   -- 제곱합이 없는 마이그레이션 이전 집계는 시간 내 분산을 0으로 간주
+                   COALESCE(sum_sq_defect_rate, sum_defect_rate * sum_defect_rate / sample_count)
+            FROM control_chart_data_1h
+            WHERE mold_code = ?{conditions.format(col='bucket')}
+            UNION ALL
+            SELECT timestamp, 1, defect_rate, defect_rate * defect_rate
+            FROM control_chart_data
+            WHERE mold_code = ?{conditions.format(col='timestamp')}
+            ORDER BY timestamp
+        '''
+        params = [str(chart_key)] + range_params + [str(chart_key)] + range_params
+        
+        conn = sqlite3.connect(CONTROL_CHART_DB)
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
         
-        return ucl, lcl, usl, lsl, mean_rate
+        if not rows:
+            return _empty_chart_series()
+        
+        times = np.array([row[0] for row in rows], dtype='datetime64[us]')
+        counts = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        sums = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        squares = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+        rates = sums / counts
+        
+        # 표본 가중 합동 평균/표준편차 (원본 표본 전체의 np.mean/np.std와 같은 값)
+        total = counts.sum()
+        mean_rate = sums.sum() / total
+        std_rate = np.sqrt(max(squares.sum() / total - mean_rate ** 2, 0.0))
+        
+        selected = lttb_downsample(times.astype(np.int64), rates, target_points)
+        
+        return {
+            'time_points': times[selected].tolist(),
+            'defect_rates': rates[selected].tolist(),
+            'control_limits': RealTimeDataManager._compute_control_limits(
+                float(mean_rate), float(std_rate)
+            ),
+            'source_points': len(rows)
+        }
     
     @staticmethod
     def save_buffer_to_file():
-        """파일로 버퍼 저장 (백업용)"""
+        """파일로 버퍼 저장 (백업용, 구조화 배열 그대로 .npy로 저장)"""
         if not st.session_state.realtime_buffer:
             return False
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = snapshots_dir / f"realtime_buffer_{timestamp}.json"
+            # 대기 중인 버퍼 포인트를 DB에 먼저 반영
+            _realtime_buffer_writer().flush()
             
-            buffer_data = []
-            for point in st.session_state.realtime_buffer:
-                serializable_point = point.copy()
-                serializable_point['timestamp'] = point['timestamp'].isoformat()
-                buffer_data.append(serializable_point)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = snapshots_dir / f"realtime_buffer_{timestamp}.npy"
             
             snapshots_dir.mkdir(exist_ok=True)
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(buffer_data, f, ensure_ascii=False, indent=2)
+            np.save(filename, st.session_state.realtime_buffer.view())
             
             return True
         except Exception as e:
@@ -438,10 +587,15 @@ class RealTimeDataManager:
 def reset_control_chart_database():
     """관리도 데이터베이스를 완전히 초기화"""
     try:
-        # 기존 데이터베이스 파일 삭제
+        # 대기 중인 쓰기를 마치고 writer 연결 종료 (다음 저장 시 새 DB로 다시 연결)
+        _realtime_buffer_writer().close()
+        
+        # 기존 데이터베이스 파일 삭제 (WAL 파일 포함)
         if CONTROL_CHART_DB.exists():
             CONTROL_CHART_DB.unlink()
             print("기존 데이터베이스 파일 삭제 완료")
+        for suffix in ('-wal', '-shm'):
+            Path(f"{CONTROL_CHART_DB}{suffix}").unlink(missing_ok=True)
         
         # 새로운 데이터베이스 생성
         init_control_chart_database()
@@ -637,6 +791,14 @@ def display_status_metric(
         height=100  # 필요에 따라 조정
     )
 
+@st.cache_data(ttl=60)
+def load_control_chart_history(chart_key, range_hours, target_points=CONTROL_CHART_TARGET_POINTS):
+    """기간별 관리도 이력 조회 (range_hours=0이면 전체 이력)"""
+    start_time = datetime.now() - timedelta(hours=range_hours) if range_hours else None
+    return RealTimeDataManager.query_control_chart_history(
+        chart_key, start_time=start_time, target_points=target_points
+    )
+
 def create_control_chart():
     dark_mode = st.session_state.get('dark_mode', False)
     
@@ -645,7 +807,26 @@ def create_control_chart():
             create_toast_notification("관리도가 자동 업데이트되었습니다!", "success")
             RealTimeDataManager.save_buffer_to_file()
     
-    data = st.session_state.control_chart_data
+    # 관리도 대상 선택 (전체/몰드별) - 이미 계산된 데이터만 조회하므로 전환 시 재계산 없음
+    selected_key = st.selectbox(
+        "관리도 대상",
+        options=CONTROL_CHART_KEYS,
+        format_func=lambda key: "전체 몰드" if key == OVERALL_CHART_KEY else f"몰드 {key}",
+        key="control_chart_mold"
+    )
+    range_label = st.selectbox(
+        "조회 기간",
+        options=list(CONTROL_CHART_RANGES.keys()),
+        key="control_chart_range"
+    )
+    range_hours = CONTROL_CHART_RANGES[range_label]
+    
+    if range_hours is None:
+        data = st.session_state.control_chart_data.get(selected_key, _empty_chart_series())
+    else:
+        data = load_control_chart_history(selected_key, range_hours)
+        if data.get('source_points'):
+            st.caption(f"원본 {data['source_points']:,}개 중 {len(data['defect_rates']):,}개 표시 (LTTB 다운샘플링)")
     
     # 데이터가 없으면 빈 차트 표시
     if not data['defect_rates']:
@@ -720,9 +901,9 @@ def display_compact_update_status():
     st.markdown(status_html, unsafe_allow_html=True)
 
 def create_mold_status_overview():
-    mold_codes = [8412, 8573, 8600, 8722, 8917]
+    mold_codes = MOLD_CODES
     current_data = st.session_state.get("current_status", {})
-    current_mold = current_data.get("mold_code", None)
+    current_mold = normalize_mold_code(current_data.get("mold_code", None))
     dark_mode = st.session_state.get('dark_mode', False)
     
     mold_info = {
@@ -733,29 +914,11 @@ def create_mold_status_overview():
         8917: {"name": "E Mold", "type": "Custom"}
     }
     
-    mold_mapping = {
-        0.0: 8412, 0: 8412,
-        1.0: 8573, 1: 8573,
-        2.0: 8600, 2: 8600,
-        3.0: 8722, 3: 8722,
-        4.0: 8917, 4: 8917
-    }
-    
     cols = st.columns(len(mold_codes))
     
     for i, mold_code in enumerate(mold_codes):
         with cols[i]:
-            is_active = False
-            if current_mold is not None:
-                try:
-                    mapped_mold = mold_mapping.get(float(current_mold))
-                    is_active = (mapped_mold == mold_code)
-                except (ValueError, TypeError):
-                    try:
-                        mapped_mold = mold_mapping.get(int(float(str(current_mold))))
-                        is_active = (mapped_mold == mold_code)
-                    except:
-                        is_active = False
+            is_active = (current_mold == mold_code)
             
             info = mold_info.get(mold_code, {"name": "Unknown", "type": "Standard"})
             
@@ -907,6 +1070,23 @@ def create_key_metrics(key_metrics):
                         )
 
 
+def explanation_text(record_id):
+    """
+    불량 레코드의 주요 원인 피처 (설명 서비스 캐시 조회)
+    
+    캐시에 없으면 설명 계산을 요청해 "계산 중"으로 표시하고, 피처를 찾을 수 없는 레코드
+    (리플레이 데이터에 없는 id 등)는 "설명 없음", 계산에 실패한 레코드는 다시 요청하지 않고
+    "설명 실패"로 표시합니다.
+    """
+    if record_id is None:
+        return "설명 없음"
+    result, pending = lookup_explanation(record_id, request=True)
+    if result is EXPLANATION_FAILED:
+        return "설명 실패"
+    if result is not None:
+        return format_explanation(result) or "-"
+    return "계산 중" if pending else "설명 없음"
+
 def create_ng_data_from_db_with_pagination():
     try:
         min_date, max_date = get_available_date_range()
@@ -1146,7 +1326,8 @@ def create_ng_data_from_db_with_pagination():
                     "용융온도": f"{fail_data.get('molten_temp', 0):.1f}",
                     "주조압력": f"{fail_data.get('cast_pressure', 0):.1f}",
                     "상금형온도": f"{fail_data.get('upper_mold_temp1', 0):.1f}",
-                    "판정": fail_data.get("passorfail", "")
+                    "판정": fail_data.get("passorfail", ""),
+                    "주요 원인": explanation_text(fail_data.get("id"))
                 }
                 formatted_data.append(formatted_entry)
             
@@ -1256,7 +1437,8 @@ def create_ng_data_from_db_with_pagination():
                     "용융온도": f"{fail_data.get('molten_temp', 0):.1f}",
                     "주조압력": f"{fail_data.get('cast_pressure', 0):.1f}",
                     "상금형온도": f"{fail_data.get('upper_mold_temp1', 0):.1f}",
-                    "판정": fail_data.get("passorfail", "")
+                    "판정": fail_data.get("passorfail", ""),
+                    "주요 원인": explanation_text(fail_data.get("id"))
                 }
                 formatted_data.append(formatted_entry)
             
@@ -1360,8 +1542,8 @@ def render_quality_overview():
             status = "데이터 수집 중" if first_cycle_completed else "준비 중"
             st.metric("수집 상태", status)
 
-def get_control_chart_statistics():
-    """관리도 통계 정보 조회"""
+def get_control_chart_statistics(chart_key=OVERALL_CHART_KEY):
+    """관리도 통계 정보 조회 (전체 또는 특정 몰드)"""
     try:
         conn = sqlite3.connect(CONTROL_CHART_DB)
         cursor = conn.cursor()
@@ -1371,8 +1553,8 @@ def get_control_chart_statistics():
         cursor.execute('''
             SELECT COUNT(*), AVG(defect_rate), MIN(defect_rate), MAX(defect_rate)
             FROM control_chart_data 
-            WHERE timestamp > ?
-        ''', (yesterday.isoformat(),))
+            WHERE mold_code = ? AND timestamp > ?
+        ''', (str(chart_key), yesterday.isoformat()))
         
         stats = cursor.fetchone()
         conn.close()
@@ -1446,7 +1628,9 @@ def run():
                 st.metric("양품률", f"{stats['pass_rate']:.1f}%")
         
         # 관리도 통계 표시
-        chart_stats = get_control_chart_statistics()
+        chart_stats = get_control_chart_statistics(
+            st.session_state.get('control_chart_mold', OVERALL_CHART_KEY)
+        )
         if chart_stats:
             st.markdown("#### 24시간 관리도 통계")
             col1, col2, col3, col4 = st.columns(4)
@@ -0,0 +1,207 @@
+# utils/control_chart_maintenance.py
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).resolve().parents[1]
+CONTROL_CHART_DB = project_root / "database/control_chart.db"
+
+# 보존 정책 (환경변수로 조정)
+RAW_RETENTION_DAYS = max(1, int(os.getenv('CONTROL_CHART_RAW_RETENTION_DAYS', 7)))
+MINUTE_ROLLUP_RETENTION_DAYS = max(RAW_RETENTION_DAYS, int(os.getenv('CONTROL_CHART_MINUTE_RETENTION_DAYS', 90)))
+COMPACTION_INTERVAL_SECONDS = int(os.getenv('CONTROL_CHART_COMPACTION_INTERVAL', 600))
+INCREMENTAL_VACUUM_PAGES = 2000
+
+def init_rollup_tables(cursor):
+    """롤업(집계) 테이블 생성"""
+    # 실시간 버퍼 분/시간 단위 집계 (몰드별)
+    for table in ('realtime_buffer_1m', 'realtime_buffer_1h'):
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket TEXT NOT NULL,
+                mold_code INTEGER NOT NULL DEFAULT -1,
+                total_count INTEGER NOT NULL,
+                defect_count INTEGER NOT NULL,
+                sum_molten_temp REAL,
+                sum_cast_pressure REAL,
+                PRIMARY KEY (bucket, mold_code)
+            )
+        ''')
+
+    # 관리도 시간 단위 집계 (관리도 키별)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS control_chart_data_1h (
+            bucket TEXT NOT NULL,
+            mold_code TEXT NOT NULL,
+            sample_count INTEGER NOT NULL,
+            sum_defect_rate REAL NOT NULL,
+            sum_sq_defect_rate REAL,
+            min_defect_rate REAL,
+            max_defect_rate REAL,
+            total_count INTEGER NOT NULL,
+            defect_count INTEGER NOT NULL,
+            PRIMARY KEY (mold_code, bucket)
+        )
+    ''')
+
+    # 관리한계의 합동 표준편차용 제곱합 컬럼 추가 (기존 DB 마이그레이션, 기존 행은 NULL)
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(control_chart_data_1h)')]
+    if 'sum_sq_defect_rate' not in columns:
+        cursor.execute('ALTER TABLE control_chart_data_1h ADD COLUMN sum_sq_defect_rate REAL')
+
+def _retention_cutoff(days):
+    """보존 기준 시각 (버킷이 나뉘지 않도록 시 단위로 내림)"""
+    cutoff = datetime.now() - timedelta(days=days)
+    return cutoff.replace(minute=0, second=0, microsecond=0).isoformat()
+
+def _enable_incremental_vacuum(conn):
+    """auto_vacuum을 INCREMENTAL로 전환 (최초 1회 전체 VACUUM 필요)"""
+    mode = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    if mode != 2:
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+        logger.info("관리도 DB auto_vacuum을 INCREMENTAL로 전환했습니다.")
+
+def compact_control_chart_db(db_path=CONTROL_CHART_DB):
+    """
+    오래된 원본 데이터를 분/시간 단위로 집계하고 보존 기간이 지난 행을 삭제
+
+    - realtime_buffer: RAW_RETENTION_DAYS 이전 -> realtime_buffer_1m
+    - realtime_buffer_1m: MINUTE_ROLLUP_RETENTION_DAYS 이전 -> realtime_buffer_1h
+    - control_chart_data: RAW_RETENTION_DAYS 이전 -> control_chart_data_1h
+    집계와 삭제는 하나의 트랜잭션에서 수행하며, 마지막에 incremental vacuum으로 빈 페이지를 반환합니다.
+    """
+    started = time.perf_counter()
+    raw_cutoff = _retention_cutoff(RAW_RETENTION_DAYS)
+    minute_cutoff = _retention_cutoff(MINUTE_ROLLUP_RETENTION_DAYS)
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        _enable_incremental_vacuum(conn)
+        init_rollup_tables(conn.cursor())
+
+        with conn:
+            # 원본 버퍼 -> 분 단위
+            conn.execute('''
+                INSERT INTO realtime_buffer_1m
+                    (bucket, mold_code, total_count, defect_count, sum_molten_temp, sum_cast_pressure)
+                SELECT substr(timestamp, 1, 16) || ':00', COALESCE(mold_code, -1),
+                       COUNT(*), SUM(defect), SUM(molten_temp), SUM(cast_pressure)
+                FROM realtime_buffer
+                WHERE timestamp < ?
+                GROUP BY 1, 2
+                ON CONFLICT (bucket, mold_code) DO UPDATE SET
+                    total_count = total_count + excluded.total_count,
+                    defect_count = defect_count + excluded.defect_count,
+                    sum_molten_temp = sum_molten_temp + excluded.sum_molten_temp,
+                    sum_cast_pressure = sum_cast_pressure + excluded.sum_cast_pressure
+            ''', (raw_cutoff,))
+            raw_deleted = conn.execute(
+                'DELETE FROM realtime_buffer WHERE timestamp < ?', (raw_cutoff,)
+            ).rowcount
+
+            # 분 단위 -> 시간 단위
+            conn.execute('''
+                INSERT INTO realtime_buffer_1h
+                    (bucket, mold_code, total_count, defect_count, sum_molten_temp, sum_cast_pressure)
+                SELECT substr(bucket, 1, 13) || ':00:00', mold_code,
+                       SUM(total_count), SUM(defect_count), SUM(sum_molten_temp), SUM(sum_cast_pressure)
+                FROM realtime_buffer_1m
+                WHERE bucket < ?
+                GROUP BY 1, 2
+                ON CONFLICT (bucket, mold_code) DO UPDATE SET
+                    total_count = total_count + excluded.total_count,
+                    defect_count = defect_count + excluded.defect_count,
+                    sum_molten_temp = sum_molten_temp + excluded.sum_molten_temp,
+                    sum_cast_pressure = sum_cast_pressure + excluded.sum_cast_pressure
+            ''', (minute_cutoff,))
+            minute_deleted = conn.execute(
+                'DELETE FROM realtime_buffer_1m WHERE bucket < ?', (minute_cutoff,)
+            ).rowcount
+
+            # 관리도 원본 -> 시간 단위
+            conn.execute('''
+                INSERT INTO control_chart_data_1h
+                    (bucket, mold_code, sample_count, sum_defect_rate, sum_sq_defect_rate,
+                     min_defect_rate, max_defect_rate, total_count, defect_count)
+                SELECT substr(timestamp, 1, 13) || ':00:00', mold_code,
+                       COUNT(*), SUM(defect_rate), SUM(defect_rate * defect_rate),
+                       MIN(defect_rate), MAX(defect_rate),
+                       SUM(total_count), SUM(defect_count)
+                FROM control_chart_data
+                WHERE timestamp < ?
+                GROUP BY 1, 2
+                ON CONFLICT (mold_code, bucket) DO UPDATE SET
+                    sample_count = sample_count + excluded.sample_count,
+                    sum_defect_rate = sum_defect_rate + excluded.sum_defect_rate,
+                    sum_sq_defect_rate = sum_sq_defect_rate + excluded.sum_sq_defect_rate,
+                    min_defect_rate = MIN(min_defect_rate, excluded.min_defect_rate),
+                    max_defect_rate = MAX(max_defect_rate, excluded.max_defect_rate),
+                    total_count = total_count + excluded.total_count,
+                    defect_count = defect_count + excluded.defect_count
+            ''', (raw_cutoff,))
+            chart_deleted = conn.execute(
+                'DELETE FROM control_chart_data WHERE timestamp < ?', (raw_cutoff,)
+            ).rowcount
+
+        conn.execute(f'PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})')
+    finally:
+        conn.close()
+
+    summary = {
+        'raw_buffer_deleted': raw_deleted,
+        'minute_rollup_deleted': minute_deleted,
+        'control_chart_deleted': chart_deleted,
+        'elapsed_seconds': time.perf_counter() - started
+    }
+    if raw_deleted or minute_deleted or chart_deleted:
+        logger.info(f"관리도 DB 압축 완료: {summary}")
+    return summary
+
+class ControlChartCompactor:
+    """관리도 DB 롤업/보존 작업을 주기적으로 실행하는 백그라운드 워커"""
+
+    def __init__(self, db_path=CONTROL_CHART_DB, interval_seconds=COMPACTION_INTERVAL_SECONDS):
+        self.db_path = db_path
+        self.interval_seconds = interval_seconds
+        self.last_summary = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._worker, name="control-chart-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _worker(self):
+        while not self._stop_event.is_set():
+            try:
+                self.last_summary = compact_control_chart_db(self.db_path)
+            except Exception as e:
+                logger.error(f"관리도 DB 압축 실패: {e}")
+            self._stop_event.wait(self.interval_seconds)
+
+_compactor = None
+_compactor_lock = threading.Lock()
+
+def start_compaction_worker(db_path=CONTROL_CHART_DB):
+    """프로세스당 하나의 압축 워커를 시작 (이미 실행 중이면 그대로 반환)"""
+    global _compactor
+    with _compactor_lock:
+        if _compactor is None:
+            _compactor = ControlChartCompactor(db_path)
+        _compactor.start()
+        return _compactor
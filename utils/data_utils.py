@@ -2,15 +2,18 @@
 import json
 import logging
 import pandas as pd
+import numpy as np
 from sqlalchemy import create_engine, text
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pathlib import Path
 import hashlib
 import streamlit as st
 
 # datetime 관련 import - 이것만 사용
 from datetime import datetime, timedelta
+from variables.molds import MOLD_CODES, normalize_mold_code
+from utils.feature_drift import observe_drift
 
 logger = logging.getLogger(__name__)
 
@@ -251,19 +254,38 @@ def save_to_timescale(data: Dict) -> bool:
             logger.error(f"정수 변환 오류 - 문제 데이터: working={data.get('working')}")
         return False
 
+# 로드된 test.py 모듈 (test.py 또는 모듈이 읽는 모델/테스트 CSV의 수정 시각이 바뀔 때만 다시 실행)
+_test_module_cache = {'mtime': None, 'module': None}
+
+def _test_module_mtime(test_module=None):
+    """test.py와 모듈이 읽는 모델 pkl/테스트 CSV(model_path/test_path)의 수정 시각"""
+    paths = [TEST_PY_FILE]
+    if test_module is not None:
+        paths += [getattr(test_module, name) for name in ('model_path', 'test_path') if hasattr(test_module, name)]
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(Path(path).stat().st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+def _load_test_module():
+    """test.py 모듈 로드 - 호출마다 다시 실행하면 모델/데이터/전처리기를 매번 새로 읽으므로 캐시"""
+    import importlib.util
+    
+    cached = _test_module_cache['module']
+    if cached is None or _test_module_cache['mtime'] != _test_module_mtime(cached):
+        spec = importlib.util.spec_from_file_location("test_module", TEST_PY_FILE)
+        test_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(test_module)
+        _test_module_cache.update(mtime=_test_module_mtime(test_module), module=test_module)
+    return _test_module_cache['module']
+
 def read_data_from_test_py():
     """test.py에서 간단하게 데이터를 읽어오는 함수 - 저장 실패와 관계없이 데이터 반환"""
     try:
-        import sys
-        import importlib.util
-        
-        module_name = "test_module"
-        if module_name in sys.modules:
-            del sys.modules[module_name]
-        
-        spec = importlib.util.spec_from_file_location(module_name, TEST_PY_FILE)
-        test_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(test_module)
+        test_module = _load_test_module()
         
         # 현재 ID 가져오기 (없으면 73612부터 시작)
         if 'current_data_id' not in st.session_state:
@@ -586,16 +608,7 @@ _last_data_hash = None
 def read_data_from_test_py():
     """test.py에서 간단하게 데이터를 읽어오는 함수"""
     try:
-        import sys
-        import importlib.util
-        
-        module_name = "test_module"
-        if module_name in sys.modules:
-            del sys.modules[module_name]
-        
-        spec = importlib.util.spec_from_file_location(module_name, TEST_PY_FILE)
-        test_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(test_module)
+        test_module = _load_test_module()
         
         # 현재 ID 가져오기 (없으면 73612부터 시작)
         if 'current_data_id' not in st.session_state:
@@ -614,6 +627,12 @@ def read_data_from_test_py():
                     
                     # TimescaleDB에 저장
                     if save_to_timescale(data):
+                        # 새로 적재된 레코드를 학습 분포 대비 드리프트 카운터에 반영
+                        try:
+                            observe_drift(data)
+                        except Exception as e:
+                            logger.warning(f"드리프트 모니터 갱신 실패: {e}")
+                        
                         # 성공했으면 다음 ID로 증가
                         st.session_state.current_data_id += 1
                         logger.info(f"ID {current_id} 데이터 읽기 및 저장 성공, 다음 ID: {st.session_state.current_data_id}")
@@ -1507,4 +1526,246 @@ def get_all_pass_sensor_data() -> List[Dict]:
         return df.to_dict('records')
     except Exception as e:
         logger.error(f"전체 Pass 데이터 조회 실패: {e}")
-        return []
\ No newline at end of file
+        return []
+
+
+def get_sensor_moments_by_mold(variables: List[str], days: int = 30) -> Dict:
+    """
+    몰드별 센서 변수의 평균 벡터/공분산 행렬 조회 (다변량 이상 탐지 기준값)
+    
+    정상(Pass) 데이터에 대해 개수, 변수별 합, 변수 쌍별 곱의 합을 몰드별 GROUP BY 한 번으로
+    집계하고, 평균과 공분산은 그 합들로부터 계산합니다. 인코딩 라벨로 저장된 mold_code는
+    실제 금형 코드로 합쳐집니다.
+    
+    Returns:
+        {금형 코드: {'count': n, 'mean': (d,), 'covariance': (d, d)}}
+    """
+    engine = get_db_engine()
+    if not engine:
+        return {}
+    
+    d = len(variables)
+    pairs = [(i, j) for i in range(d) for j in range(i, d)]
+    sum_columns = [f"SUM({var}::float8) AS s_{i}" for i, var in enumerate(variables)]
+    product_columns = [
+        f"SUM({variables[i]}::float8 * {variables[j]}::float8) AS p_{i}_{j}" for i, j in pairs
+    ]
+    not_null = " AND ".join(f"{var} IS NOT NULL" for var in variables)
+    
+    try:
+        query = f"""
+            SELECT mold_code, COUNT(*) AS n, {", ".join(sum_columns + product_columns)}
+            FROM sensor_data
+            WHERE passorfail = 'Pass'
+              AND time >= NOW() - make_interval(days => :days)
+              AND {not_null}
+            GROUP BY mold_code
+        """
+        df = pd.read_sql(text(query), engine, params={'days': days})
+    except Exception as e:
+        logger.error(f"몰드별 센서 통계 조회 실패: {e}")
+        return {}
+    
+    # 실제 금형 코드 기준으로 합 누적
+    totals = {}
+    for row in df.itertuples(index=False):
+        row = row._asdict()
+        mold_code = normalize_mold_code(row['mold_code'])
+        if mold_code is None:
+            continue
+        sums = np.array([row[f's_{i}'] for i in range(d)], dtype=np.float64)
+        products = np.zeros((d, d))
+        for i, j in pairs:
+            products[i, j] = products[j, i] = row[f'p_{i}_{j}']
+        n_total, s_total, p_total = totals.get(mold_code, (0, 0.0, 0.0))
+        totals[mold_code] = (n_total + int(row['n']), s_total + sums, p_total + products)
+    
+    moments = {}
+    for mold_code, (n, sums, products) in totals.items():
+        if n <= d:
+            continue
+        mean = sums / n
+        covariance = (products - n * np.outer(mean, mean)) / (n - 1)
+        moments[mold_code] = {'count': n, 'mean': mean, 'covariance': covariance}
+    return moments
+
+def get_sensor_series(variables: List[str], mold_code: int, days: int = 7) -> pd.DataFrame:
+    """
+    특정 몰드의 센서 변수 시계열 조회 (EWMA/CUSUM 백테스트용, 시간순)
+    
+    mold_code는 실제 금형 코드이며, 인코딩 라벨로 저장된 행도 함께 조회합니다.
+    결과 컬럼명은 요청한 변수명 그대로입니다 (Coolant_temperature 등 대소문자 유지).
+    """
+    engine = get_db_engine()
+    if not engine:
+        return pd.DataFrame()
+    
+    label = MOLD_CODES.index(mold_code) if mold_code in MOLD_CODES else mold_code
+    try:
+        query = f"""
+            SELECT time, {", ".join(f'{var} AS "{var}"' for var in variables)}
+            FROM sensor_data
+            WHERE mold_code IN (:code, :label)
+              AND time >= NOW() - make_interval(days => :days)
+            ORDER BY time
+        """
+        return pd.read_sql(text(query), engine, params={'code': mold_code, 'label': label, 'days': days})
+    except Exception as e:
+        logger.error(f"센서 시계열 조회 실패: {e}")
+        return pd.DataFrame()
+
+# sensor_data 컬럼명 -> 학습 데이터(CSV) 컬럼명
+SENSOR_TRAINING_COLUMNS = {
+    'facility_operation_cycletime': 'facility_operation_cycleTime',
+    'coolant_temperature': 'Coolant_temperature',
+    'ems_operation_time': 'EMS_operation_time'
+}
+
+def get_labelled_sensor_data(since=None, limit: int = 5000) -> pd.DataFrame:
+    """
+    since 이후 적재된 라벨(Pass/Fail) 있는 레코드를 학습 데이터 형식으로 조회 (온라인 학습용, 시간순)
+    
+    컬럼명을 학습 CSV와 맞추고, time 컬럼은 date/time(HH:MM:SS)/registration_time으로 나눕니다.
+    """
+    engine = get_db_engine()
+    if not engine:
+        return pd.DataFrame()
+    
+    try:
+        query = """
+            SELECT *
+            FROM sensor_data
+            WHERE passorfail IN ('Pass', 'Fail')
+              AND (CAST(:since AS TIMESTAMPTZ) IS NULL OR time > CAST(:since AS TIMESTAMPTZ))
+            ORDER BY time
+            LIMIT :limit
+        """
+        df = pd.read_sql(text(query), engine, params={'since': since, 'limit': limit})
+    except Exception as e:
+        logger.error(f"라벨 데이터 조회 실패: {e}")
+        return pd.DataFrame()
+    
+    if df.empty:
+        return df
+    df = df.rename(columns=SENSOR_TRAINING_COLUMNS)
+    timestamps = pd.to_datetime(df['time'])
+    df['registration_time'] = timestamps
+    df['date'] = timestamps.dt.strftime('%Y-%m-%d')
+    df['time'] = timestamps.dt.strftime('%H:%M:%S')
+    return df
+
+# 데이터 기반 3시그마 관리한계 (버전별 보관 개수)
+SIGMA_LIMITS_KEEP_VERSIONS = 5
+
+def init_sigma_limits_table(engine) -> None:
+    """버전별 관리한계 테이블 생성"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS sigma_limits (
+                version BIGINT NOT NULL,
+                mold_code INTEGER NOT NULL,
+                variable TEXT NOT NULL,
+                sample_count BIGINT NOT NULL,
+                mean DOUBLE PRECISION,
+                std DOUBLE PRECISION,
+                p_lower DOUBLE PRECISION,
+                median DOUBLE PRECISION,
+                p_upper DOUBLE PRECISION,
+                lower_3 DOUBLE PRECISION,
+                upper_3 DOUBLE PRECISION,
+                window_days INTEGER NOT NULL,
+                computed_at TIMESTAMPTZ DEFAULT NOW(),
+                PRIMARY KEY (version, mold_code, variable)
+            );
+        """))
+
+def compute_sigma_limits(variables: List[str], days: int = 30) -> Optional[int]:
+    """
+    sensor_data에서 몰드별/변수별 관리한계를 계산해 새 버전으로 저장 (배치 작업)
+    
+    변수 컬럼을 LATERAL VALUES로 (variable, value) 행으로 펼친 뒤 GROUP BY 한 번으로
+    평균, 표준편차, 0.135/50/99.865 백분위수(정규분포 ±3σ 대응)를 집계합니다.
+    불량(Fail) 샷이 한계를 넓히지 않도록 정상(Pass) 데이터만 사용하고,
+    인코딩 라벨로 저장된 mold_code는 실제 금형 코드로 합쳐 집계합니다.
+    
+    Returns:
+        저장된 버전 번호 (실패 시 None)
+    """
+    engine = get_db_engine()
+    if not engine:
+        return None
+    
+    values_clause = ", ".join(f"('{var}', {var}::float8)" for var in variables)
+    mold_case = " ".join(f"WHEN {label} THEN {code}" for label, code in enumerate(MOLD_CODES))
+    version = int(datetime.now().timestamp())
+    
+    try:
+        init_sigma_limits_table(engine)
+        with engine.begin() as conn:
+            conn.execute(text(f"""
+                INSERT INTO sigma_limits
+                    (version, mold_code, variable, sample_count, mean, std,
+                     p_lower, median, p_upper, lower_3, upper_3, window_days)
+                SELECT
+                    :version, mold, v.variable, COUNT(*),
+                    AVG(v.value), STDDEV_SAMP(v.value),
+                    percentile_cont(0.00135) WITHIN GROUP (ORDER BY v.value),
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY v.value),
+                    percentile_cont(0.99865) WITHIN GROUP (ORDER BY v.value),
+                    AVG(v.value) - 3 * STDDEV_SAMP(v.value),
+                    AVG(v.value) + 3 * STDDEV_SAMP(v.value),
+                    :days
+                FROM (
+                    SELECT CASE mold_code {mold_case} ELSE mold_code END AS mold, *
+                    FROM sensor_data
+                    WHERE passorfail = 'Pass'
+                      AND time >= NOW() - make_interval(days => :days)
+                ) s
+                CROSS JOIN LATERAL (VALUES {values_clause}) AS v(variable, value)
+                WHERE v.value IS NOT NULL
+                GROUP BY mold, v.variable
+            """), {'version': version, 'days': days})
+            
+            # 오래된 버전 정리
+            conn.execute(text("""
+                DELETE FROM sigma_limits
+                WHERE version NOT IN (
+                    SELECT DISTINCT version FROM sigma_limits
+                    ORDER BY version DESC LIMIT :keep
+                )
+            """), {'keep': SIGMA_LIMITS_KEEP_VERSIONS})
+        
+        logger.info(f"관리한계 계산 완료: version={version}, 기간={days}일")
+        return version
+    except Exception as e:
+        logger.error(f"관리한계 계산 실패: {e}")
+        return None
+
+def get_latest_sigma_limits_version():
+    """최신 관리한계 버전 번호 (없으면 None)"""
+    engine = get_db_engine()
+    if not engine:
+        return None
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT MAX(version) FROM sigma_limits")).scalar()
+    except Exception as e:
+        logger.error(f"관리한계 버전 조회 실패: {e}")
+        return None
+
+def load_sigma_limits(version: int) -> pd.DataFrame:
+    """특정 버전의 관리한계 조회"""
+    engine = get_db_engine()
+    if not engine or version is None:
+        return pd.DataFrame()
+    try:
+        query = """
+            SELECT mold_code, variable, sample_count, mean, std,
+                   p_lower, median, p_upper, lower_3, upper_3
+            FROM sigma_limits
+            WHERE version = :version
+        """
+        return pd.read_sql(text(query), engine, params={'version': version})
+    except Exception as e:
+        logger.error(f"관리한계 조회 실패: {e}")
+        return pd.DataFrame()
@@ -0,0 +1,54 @@
+# utils/downsampling.py
+import numpy as np
+
+def lttb_downsample(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링
+
+    시계열 모양(피크/이탈점)을 최대한 보존하면서 n_out개의 점을 선택하고,
+    선택된 원본 인덱스 배열을 반환합니다. 버킷 평균은 reduceat으로 한 번에 계산하고
+    각 버킷 내부의 삼각형 면적 계산도 벡터 연산으로 처리합니다.
+
+    Args:
+        x: 정렬된 x 값 (예: epoch 초)
+        y: y 값
+        n_out: 목표 점 개수 (3 미만이거나 원본보다 크면 다운샘플링하지 않음)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 첫/마지막 점을 제외한 구간을 n_out - 2개의 버킷으로 분할
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    starts = edges[:-1]
+    ends = edges[1:]
+
+    # 버킷별 평균 (다음 버킷의 평균점으로 사용)
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[:-1], starts) / counts
+    avg_y = np.add.reduceat(y[:-1], starts) / counts
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    for i in range(n_out - 2):
+        start, end = starts[i], ends[i]
+        bx = x[start:end]
+        by = y[start:end]
+
+        # 이전 선택점(a), 현재 버킷 후보, 다음 버킷 평균으로 이루어진 삼각형 면적 (상수배 생략)
+        area = np.abs(
+            (x[a] - next_x[i]) * (by - y[a]) -
+            (x[a] - bx) * (next_y[i] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
@@ -0,0 +1,274 @@
+# utils/feature_drift.py
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from variables.molds import MOLD_CODES, normalize_mold_code
+
+# 기준 분포 구간 수 (학습 데이터 분위수로 경계 결정, 양끝은 열린 구간)
+DRIFT_BINS = 20
+
+# PSI 판정 기준 (관례적 임계값: 0.1 미만 안정, 0.25 이상 유의한 이동)
+PSI_WARNING = 0.1
+PSI_ALERT = 0.25
+
+# KS 임계값 계수 (유의수준 5%)
+KS_ALPHA_COEFFICIENT = 1.36
+
+# 빈 구간의 log(0)을 피하기 위한 비율 하한
+PSI_EPSILON = 1e-4
+
+# 학습 데이터 기준 분포를 누적할 때 한 번에 float64로 바꾸는 행 수
+DRIFT_CHUNK_ROWS = 500_000
+
+# 현재 분포로 보는 최근 구간(분)과 그 구간을 나누는 카운터 조각 수
+# (조각 하나 = 창/조각 수, 가장 오래된 조각부터 버려 최근 창만 비교)
+DRIFT_WINDOW_MINUTES = float(os.getenv('DRIFT_WINDOW_MINUTES', 120))
+DRIFT_WINDOW_SLABS = int(os.getenv('DRIFT_WINDOW_SLABS', 12))
+
+class DriftReference:
+    """
+    피처별 기준 히스토그램 (모델 번들에 함께 저장)
+
+    edges: (피처 수, 구간 수 - 1) 내부 경계
+    counts: (1 + 몰드 수, 피처 수, 구간 수) - 0번은 전체, 1번부터 MOLD_CODES 순서
+    """
+
+    def __init__(self, features, edges, counts, mold_codes=MOLD_CODES):
+        self.features = list(features)
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.mold_codes = list(mold_codes)
+
+    @property
+    def n_bins(self):
+        return self.counts.shape[2]
+
+    @classmethod
+    def from_dataframe(cls, df, features, mold_column='mold_code', n_bins=DRIFT_BINS):
+        """
+        학습 데이터에서 분위수 경계와 전체/몰드별 구간 개수 계산
+
+        경계는 컬럼 단위로, 구간 개수는 DRIFT_CHUNK_ROWS 행 단위로 계산해
+        전체 데이터의 float64 사본을 한 번에 만들지 않습니다.
+        """
+        features = [feature for feature in features if feature in df.columns]
+
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        edges = np.empty((len(features), n_bins - 1))
+        for j, feature in enumerate(features):
+            column = pd.to_numeric(df[feature], errors='coerce').to_numpy(dtype=np.float64)
+            column = column[np.isfinite(column)]
+            edges[j] = np.quantile(column, quantiles) if len(column) else np.zeros(n_bins - 1)
+
+        reference = cls(features, edges, np.zeros((1 + len(MOLD_CODES), len(features), n_bins), dtype=np.int64))
+        for start in range(0, len(df), DRIFT_CHUNK_ROWS):
+            part = df.iloc[start:start + DRIFT_CHUNK_ROWS]
+            values = part[features].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+            molds = part[mold_column] if mold_column in part.columns else np.full(len(part), None)
+            reference.accumulate(reference.counts, values, molds)
+        return reference
+
+    def mold_index(self, mold_code):
+        """몰드 코드의 counts 인덱스 (알 수 없으면 None)"""
+        code = normalize_mold_code(mold_code)
+        return 1 + self.mold_codes.index(code) if code in self.mold_codes else None
+
+    def bin_indices(self, values):
+        """(행, 피처) 값 -> 구간 인덱스 (NaN은 -1)"""
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        bins = np.empty(values.shape, dtype=np.intp)
+        for j in range(len(self.features)):
+            bins[:, j] = np.searchsorted(self.edges[j], values[:, j], side='right')
+        bins[~np.isfinite(values)] = -1
+        return bins
+
+    def accumulate(self, counts, values, mold_codes):
+        """값을 구간 개수 배열(counts)에 누적 - 전체와 해당 몰드 양쪽에 더함"""
+        bins = self.bin_indices(values)
+        positions = {code: 1 + i for i, code in enumerate(self.mold_codes)}
+        # 몰드 코드 변환은 고유값에만 적용 (결측은 코드 -1 -> 마지막 항목 0)
+        codes, uniques = pd.factorize(mold_codes if isinstance(mold_codes, pd.Series)
+                                      else pd.Series(mold_codes, dtype=object))
+        lookup = [positions.get(normalize_mold_code(code), 0) for code in uniques] + [0]
+        mold_rows = np.asarray(lookup, dtype=np.intp)[codes]
+        rows, cols = np.nonzero(bins >= 0)
+        np.add.at(counts, (0, cols, bins[rows, cols]), 1)
+        known = mold_rows[rows] > 0
+        np.add.at(counts, (mold_rows[rows][known], cols[known], bins[rows, cols][known]), 1)
+
+    def to_dict(self):
+        return {
+            'features': self.features,
+            'edges': self.edges.tolist(),
+            'counts': self.counts.tolist(),
+            'mold_codes': self.mold_codes
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['features'], data['edges'], data['counts'], data.get('mold_codes', MOLD_CODES))
+
+def drift_statistics(reference_counts, current_counts):
+    """
+    구간 개수 배열(피처, 구간)로 피처별 PSI와 (구간 단위) KS 통계량 계산
+
+    Returns:
+        (psi 배열, ks 배열, 기준 표본 수 배열, 현재 표본 수 배열)
+    """
+    reference_counts = np.asarray(reference_counts, dtype=np.float64)
+    current_counts = np.asarray(current_counts, dtype=np.float64)
+    n_reference = reference_counts.sum(axis=1)
+    n_current = current_counts.sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = reference_counts / n_reference[:, np.newaxis]
+        q = current_counts / n_current[:, np.newaxis]
+    p_safe = np.maximum(p, PSI_EPSILON)
+    q_safe = np.maximum(q, PSI_EPSILON)
+    psi = ((q_safe - p_safe) * np.log(q_safe / p_safe)).sum(axis=1)
+    ks = np.abs(np.cumsum(p, axis=1) - np.cumsum(q, axis=1)).max(axis=1)
+
+    empty = (n_reference == 0) | (n_current == 0)
+    psi[empty] = np.nan
+    ks[empty] = np.nan
+    return psi, ks, n_reference, n_current
+
+class DriftMonitor:
+    """
+    수집되는 레코드로 고정 구간 카운터를 갱신하며 기준 분포 대비 PSI/KS를 계산
+
+    레코드마다 피처별 구간 하나씩 카운터를 올리기만 하므로 갱신은 O(피처 수)이고,
+    통계량은 카운터만으로 계산해 과거 데이터를 다시 읽지 않습니다.
+    카운터는 시간 조각(slab)별로 따로 두고 최근 window_minutes 동안의 조각만 합산하므로,
+    오래 안정적이던 데이터가 쌓여 있어도 최근의 분포 이동이 PSI/KS에 그대로 드러납니다.
+    """
+
+    def __init__(self, reference, version=None, window_minutes=DRIFT_WINDOW_MINUTES,
+                 n_slabs=DRIFT_WINDOW_SLABS, clock=time.monotonic):
+        self.reference = reference
+        self.version = version
+        self.window_minutes = window_minutes
+        self.slab_seconds = window_minutes * 60 / n_slabs
+        self.slabs = np.zeros((n_slabs,) + reference.counts.shape, dtype=np.int64)
+        self._slab = None
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def counts(self):
+        """최근 창 전체의 구간 개수 (1 + 몰드 수, 피처 수, 구간 수)"""
+        with self._lock:
+            self._advance()
+            return self.slabs.sum(axis=0)
+
+    def _advance(self):
+        """현재 시각의 조각으로 이동하며 창을 벗어난 조각을 비움 (lock 안에서 호출) - 현재 조각 반환"""
+        n_slabs = len(self.slabs)
+        current = int(self._clock() // self.slab_seconds)
+        if self._slab is None:
+            self._slab = current
+        for slab in range(self._slab + 1, min(current, self._slab + n_slabs) + 1):
+            self.slabs[slab % n_slabs] = 0
+        self._slab = max(self._slab, current)
+        return self.slabs[self._slab % n_slabs]
+
+    def update(self, mold_code, values):
+        """
+        레코드 반영
+
+        Args:
+            mold_code: 금형 코드(또는 인코딩 라벨), 레코드가 여러 개면 배열
+            values: 피처 이름을 키로 갖는 dict, 또는 reference.features 순서의 값 배열 (행, 피처)
+        """
+        if isinstance(values, dict):
+            values = [[pd.to_numeric(values.get(feature), errors='coerce') for feature in self.reference.features]]
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        mold_codes = np.broadcast_to(np.asarray(mold_code, dtype=object), (len(values),))
+        with self._lock:
+            self.reference.accumulate(self._advance(), values, mold_codes)
+
+    def reset(self):
+        with self._lock:
+            self.slabs[:] = 0
+
+    def report(self, mold_code=None):
+        """
+        최근 창의 피처별 드리프트 통계 (mold_code가 None이면 전체)
+
+        몰드별 기준 분포가 없으면 전체 기준 분포와 비교합니다.
+
+        Returns:
+            DataFrame: feature, psi, ks, ks_critical, reference_count, current_count, status
+        """
+        index = 0 if mold_code is None else self.reference.mold_index(mold_code)
+        if index is None:
+            return pd.DataFrame()
+
+        reference_counts = self.reference.counts[index]
+        if index and reference_counts.sum() == 0:
+            reference_counts = self.reference.counts[0]
+        with self._lock:
+            self._advance()
+            current_counts = self.slabs[:, index].sum(axis=0)
+
+        psi, ks, n_reference, n_current = drift_statistics(reference_counts, current_counts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ks_critical = KS_ALPHA_COEFFICIENT * np.sqrt((n_reference + n_current) / (n_reference * n_current))
+
+        status = np.where(
+            np.isnan(psi), '데이터 부족',
+            np.where((psi >= PSI_ALERT) | (ks > ks_critical), '드리프트',
+                     np.where(psi >= PSI_WARNING, '주의', '안정'))
+        )
+        return pd.DataFrame({
+            'feature': self.reference.features,
+            'psi': psi,
+            'ks': ks,
+            'ks_critical': ks_critical,
+            'reference_count': n_reference.astype(np.int64),
+            'current_count': n_current.astype(np.int64),
+            'status': status
+        })
+
+_monitor = {'version': None, 'monitor': None}
+_monitor_lock = threading.Lock()
+
+def get_drift_monitor():
+    """
+    최신 모델 번들의 기준 분포를 쓰는 프로세스 공용 드리프트 모니터 (기준 분포가 없으면 None)
+
+    새 번들 버전이 저장되면 새 기준 분포로 모니터를 다시 만듭니다. 기준 분포가 같은 버전
+    (온라인 갱신으로 트리만 바뀐 번들 등)이면 누적 카운터를 그대로 이어 씁니다.
+    """
+    from models.predictor.artifact_store import latest_version, load_drift_reference
+
+    version = latest_version()
+    with _monitor_lock:
+        if version is not None and _monitor['version'] != version:
+            reference = load_drift_reference(version)
+            previous = _monitor['monitor']
+            if reference is None:
+                _monitor['monitor'] = None
+            elif (previous is not None and previous.reference.features == reference.features
+                  and np.array_equal(previous.reference.edges, reference.edges)):
+                previous.reference = reference
+                previous.version = version
+            else:
+                _monitor['monitor'] = DriftMonitor(reference, version)
+            _monitor['version'] = version
+        return _monitor['monitor']
+
+def observe_drift(record):
+    """수집된 레코드 하나를 드리프트 모니터에 반영 (모니터가 없으면 무시)"""
+    monitor = get_drift_monitor()
+    if monitor is not None:
+        monitor.update(record.get('mold_code'), record)
+
+def drift_report(mold_code=None):
+    """몰드별(또는 전체) 피처 드리프트 통계 - 기준 분포가 없으면 빈 DataFrame"""
+    monitor = get_drift_monitor()
+    return monitor.report(mold_code) if monitor is not None else pd.DataFrame()
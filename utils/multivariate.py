@@ -0,0 +1,98 @@
+# utils/multivariate.py
+import numpy as np
+
+# 3시그마와 같은 오경보율(단측 0.27%)에 해당하는 표준정규 분위수
+T2_ALPHA_Z = 2.7822
+
+def chi2_upper_limit(dof, z=T2_ALPHA_Z):
+    """카이제곱 상측 분위수 근사 (Wilson-Hilferty, scipy 없이 계산)"""
+    k = float(dof)
+    return k * (1.0 - 2.0 / (9.0 * k) + z * np.sqrt(2.0 / (9.0 * k))) ** 3
+
+class HotellingT2Detector:
+    """
+    몰드 하나의 다변량 이상 탐지기 (Hotelling T² / Mahalanobis 거리)
+
+    평균 벡터와 편차 곱 합 행렬 C = Σ(x-μ)(x-μ)ᵀ, 그리고 C의 역행렬을 유지합니다.
+    점수 계산은 T² = (n-1)·(x-μ)ᵀ C⁻¹ (x-μ) 로 O(d²)이며, 정상 판정된 레코드로
+    Welford 방식의 평균/C 갱신과 Sherman-Morrison 역행렬 rank-1 갱신을 수행해
+    추정치를 역시 O(d²)로 점진 갱신합니다.
+    """
+
+    def __init__(self, variables, mean=None, covariance=None, count=0, ridge=1e-6):
+        self.variables = list(variables)
+        d = len(self.variables)
+        self.ridge = ridge
+        self.ucl = chi2_upper_limit(d)
+        self.count = int(count)
+        self.mean = np.zeros(d) if mean is None else np.asarray(mean, dtype=np.float64).copy()
+        self._scatter = np.zeros((d, d))
+        self._scatter_inv = None
+
+        if covariance is not None and self.count > d:
+            self._scatter = np.asarray(covariance, dtype=np.float64) * (self.count - 1)
+            self._refresh_inverse()
+
+    @property
+    def dimension(self):
+        return len(self.variables)
+
+    @property
+    def ready(self):
+        """점수를 계산할 수 있는 상태인지 (역행렬 확보 여부)"""
+        return self._scatter_inv is not None
+
+    def _refresh_inverse(self):
+        """C 역행렬을 직접 계산 (초기화 시 1회, 상수에 가까운 변수는 ridge로 보정)"""
+        d = self.dimension
+        scale = np.trace(self._scatter) / d if d else 0.0
+        regularized = self._scatter + np.eye(d) * max(scale * self.ridge, 1e-12)
+        self._scatter_inv = np.linalg.inv(regularized)
+
+    def vector(self, record):
+        """레코드(dict)를 변수 순서의 벡터로 변환 (값이 없으면 NaN)"""
+        return np.array([record.get(var, np.nan) for var in self.variables], dtype=np.float64)
+
+    def score(self, x):
+        """T² 점수 (준비 전이거나 NaN이 있으면 None)"""
+        x = np.asarray(x, dtype=np.float64)
+        if not self.ready or not np.isfinite(x).all():
+            return None
+        delta = x - self.mean
+        return float((self.count - 1) * (delta @ self._scatter_inv @ delta))
+
+    def update(self, x):
+        """관측치 하나로 평균/C/C⁻¹ 점진 갱신 (Welford + Sherman-Morrison)"""
+        x = np.asarray(x, dtype=np.float64)
+        if not np.isfinite(x).all():
+            return
+
+        n_old = self.count
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+
+        c = n_old / self.count
+        self._scatter += c * np.outer(delta, delta)
+
+        if self._scatter_inv is not None:
+            u = self._scatter_inv @ delta
+            self._scatter_inv -= (c * np.outer(u, u)) / (1.0 + c * (delta @ u))
+        elif self.count > 2 * self.dimension:
+            # 기준 데이터 없이 시작한 경우 충분히 쌓이면 역행렬 계산
+            self._refresh_inverse()
+
+    def process(self, record):
+        """
+        레코드 하나를 점수화하고 정상이면 추정치에 반영
+
+        Returns:
+            (T² 점수 또는 None, 이상 여부)
+        """
+        x = self.vector(record)
+        t2 = self.score(x)
+        is_anomaly = t2 is not None and t2 > self.ucl
+        # 이상 레코드는 기준 분포를 오염시키지 않도록 갱신에서 제외
+        if not is_anomaly:
+            self.update(x)
+        return t2, is_anomaly
@@ -0,0 +1,153 @@
+# utils/ring_buffer.py
+import os
+import numpy as np
+from datetime import datetime
+
+# 실시간 버퍼 기본 용량 (환경변수로 10^5 ~ 10^6 범위 조정)
+REALTIME_BUFFER_CAPACITY = int(os.getenv('REALTIME_BUFFER_CAPACITY', 100_000))
+
+# 실시간 버퍼 한 점의 레이아웃 (27 bytes)
+REALTIME_POINT_DTYPE = np.dtype([
+    ('timestamp', np.int64),      # epoch ns
+    ('id', np.int64),             # 원본 데이터 ID (없으면 -1)
+    ('molten_temp', np.float32),
+    ('cast_pressure', np.float32),
+    ('defect', np.uint8),         # 1: Fail, 0: Pass
+    ('mold_code', np.uint16)      # 실제 금형 코드 (알 수 없으면 0)
+])
+
+def to_epoch_ns(value):
+    """datetime / ISO 문자열 / datetime64를 epoch ns 정수로 변환"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return int(np.datetime64(value, 'ns').astype(np.int64))
+
+class RealtimeRingBuffer:
+    """
+    구조화 배열 기반 실시간 버퍼 (고정 용량 링 버퍼)
+
+    각 점을 [i]와 [i + capacity] 두 위치에 기록하는 미러링 방식을 사용하므로
+    가장 최근 점들은 항상 연속된 메모리 구간에 있고, 조회 결과는 복사 없는 view로 반환됩니다.
+    점들은 시간순으로 추가된다고 가정합니다.
+    """
+
+    def __init__(self, capacity=REALTIME_BUFFER_CAPACITY, dtype=REALTIME_POINT_DTYPE):
+        if capacity <= 0:
+            raise ValueError(f"버퍼 용량은 1 이상이어야 합니다: {capacity}")
+        self.capacity = int(capacity)
+        self._data = np.zeros(2 * self.capacity, dtype=dtype)
+        self._write_pos = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def append(self, **fields):
+        """한 점 추가 (필드명=값)"""
+        row = np.zeros((), dtype=self._data.dtype)
+        for name, value in fields.items():
+            row[name] = value
+        self._data[self._write_pos] = row
+        self._data[self._write_pos + self.capacity] = row
+
+        self._write_pos = (self._write_pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, records):
+        """구조화 배열을 한 번에 추가 (용량을 넘으면 최근 점만 유지)"""
+        records = np.asarray(records, dtype=self._data.dtype)[-self.capacity:]
+        n = len(records)
+        if n == 0:
+            return
+
+        positions = (self._write_pos + np.arange(n)) % self.capacity
+        self._data[positions] = records
+        self._data[positions + self.capacity] = records
+
+        self._write_pos = (self._write_pos + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def view(self):
+        """저장된 전체 점을 시간순으로 담은 view (복사 없음)"""
+        end = self._write_pos + self.capacity
+        return self._data[end - self._size:end]
+
+    def window(self, start_ns=None, end_ns=None):
+        """[start_ns, end_ns] 시간 구간의 점들을 view로 반환 (복사 없음)"""
+        points = self.view()
+        timestamps = points['timestamp']
+        lo = 0 if start_ns is None else int(np.searchsorted(timestamps, start_ns, side='left'))
+        hi = len(points) if end_ns is None else int(np.searchsorted(timestamps, end_ns, side='right'))
+        return points[lo:hi]
+
+    def since(self, cutoff_time):
+        """cutoff_time(datetime) 이후의 점들을 view로 반환"""
+        return self.window(start_ns=to_epoch_ns(cutoff_time))
+
+    def clear(self):
+        self._write_pos = 0
+        self._size = 0
+
+class ColumnarRingBuffer:
+    """
+    컬럼별 배열 기반 링 버퍼 (컬럼마다 독립된 타입 배열 + 공유 쓰기 위치)
+
+    RealtimeRingBuffer와 같은 미러링 방식을 컬럼마다 적용하므로 column()은 항상
+    연속된 메모리의 view를 반환합니다. 차트처럼 변수 하나씩 읽는 용도에 적합합니다.
+    """
+
+    def __init__(self, columns, capacity):
+        if capacity <= 0:
+            raise ValueError(f"버퍼 용량은 1 이상이어야 합니다: {capacity}")
+        self.capacity = int(capacity)
+        self._columns = {}
+        for name, dtype in columns.items():
+            dtype = np.dtype(dtype)
+            # 실수형 컬럼은 값이 없으면 NaN으로 남도록 초기화
+            fill = np.nan if dtype.kind == 'f' else 0
+            self._columns[name] = np.full(2 * self.capacity, fill, dtype=dtype)
+        self._write_pos = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    @property
+    def columns(self):
+        return list(self._columns.keys())
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._columns.values())
+
+    def append(self, **values):
+        """한 행 추가 (지정하지 않은 컬럼은 NaN/0)"""
+        for name, array in self._columns.items():
+            value = values.get(name)
+            if value is None:
+                value = np.nan if array.dtype.kind == 'f' else 0
+            array[self._write_pos] = value
+            array[self._write_pos + self.capacity] = value
+
+        self._write_pos = (self._write_pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def column(self, name, last=None):
+        """컬럼 하나의 최근 last개(기본 전체)를 시간순 view로 반환 (복사 없음)"""
+        size = self._size if last is None else min(int(last), self._size)
+        end = self._write_pos + self.capacity
+        return self._columns[name][end - size:end]
+
+    def clear(self):
+        self._write_pos = 0
+        self._size = 0
@@ -0,0 +1,92 @@
+# utils/shift_detectors.py
+import numpy as np
+import pandas as pd
+
+# EWMA 가중치 / 관리한계 폭, CUSUM 허용량 k / 결정구간 h (σ 단위)
+EWMA_LAMBDA = 0.2
+EWMA_L = 3.0
+CUSUM_K = 0.5
+CUSUM_H = 5.0
+
+class EwmaCusumState:
+    """
+    몰드 하나의 변수별 EWMA / 양측 CUSUM 상태
+
+    목표 평균 μ₀와 표준편차 σ를 기준으로 레코드마다 변수 전체를 벡터 연산 한 번으로
+    갱신합니다 (변수당 O(1)). 작은 지속 이동(드리프트)을 3시그마 밴드보다 먼저 감지합니다.
+
+        z_t  = λ·x_t + (1-λ)·z_{t-1}                       (z_0 = μ₀)
+        C⁺_t = max(0, C⁺_{t-1} + (x_t-μ₀)/σ - k)
+        C⁻_t = max(0, C⁻_{t-1} - (x_t-μ₀)/σ - k)
+    """
+
+    def __init__(self, variables, target, sigma, lam=EWMA_LAMBDA, L=EWMA_L, k=CUSUM_K, h=CUSUM_H):
+        self.variables = list(variables)
+        self.target = np.asarray(target, dtype=np.float64)
+        self.sigma = np.asarray(sigma, dtype=np.float64)
+        self.lam, self.L, self.k, self.h = lam, L, k, h
+
+        # 정상 상태(점근) EWMA 관리한계 폭
+        self.ewma_width = L * self.sigma * np.sqrt(lam / (2.0 - lam))
+        self.ewma = self.target.copy()
+        self.cusum_pos = np.zeros(len(self.variables))
+        self.cusum_neg = np.zeros(len(self.variables))
+
+    def update(self, x):
+        """
+        변수 순서의 값 배열로 상태 갱신 (NaN인 변수는 이전 상태 유지)
+
+        Returns:
+            (EWMA 이탈 마스크, CUSUM 상향 알람 마스크, CUSUM 하향 알람 마스크)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        valid = np.isfinite(x) & np.isfinite(self.target) & (self.sigma > 0)
+
+        z = (x - self.target) / np.where(self.sigma > 0, self.sigma, np.nan)
+        self.ewma = np.where(valid, self.lam * x + (1.0 - self.lam) * self.ewma, self.ewma)
+        self.cusum_pos = np.where(valid, np.maximum(0.0, self.cusum_pos + z - self.k), self.cusum_pos)
+        self.cusum_neg = np.where(valid, np.maximum(0.0, self.cusum_neg - z - self.k), self.cusum_neg)
+
+        ewma_alarm = np.abs(self.ewma - self.target) > self.ewma_width
+        return ewma_alarm, self.cusum_pos > self.h, self.cusum_neg > self.h
+
+def ewma_cusum_batch(values, target, sigma, lam=EWMA_LAMBDA, L=EWMA_L, k=CUSUM_K, h=CUSUM_H):
+    """
+    EWMA / 양측 CUSUM 배치 계산 (백테스트용, EwmaCusumState와 같은 결과)
+
+    EWMA는 pandas ewm(adjust=False)에 μ₀ 초기 행을 붙여 계산하고, CUSUM은 Lindley 재귀의 해
+    C_t = S_t - min(0, min_{s≤t} S_s) (S_t = Σ(z - k))를 누적합/누적최소로 벡터화합니다.
+    NaN 값은 직전 값으로 채웁니다 (EwmaCusumState의 '상태 유지'와 동일).
+
+    Args:
+        values: (n, d) 배열 또는 DataFrame (시간순)
+        target, sigma: 변수별 목표 평균/표준편차 (d,)
+
+    Returns:
+        dict: 'ewma', 'cusum_pos', 'cusum_neg' (n, d) 배열과 'ewma_alarm', 'cusum_alarm' 마스크
+    """
+    target = np.asarray(target, dtype=np.float64)
+    sigma = np.asarray(sigma, dtype=np.float64)
+    x = pd.DataFrame(np.asarray(values, dtype=np.float64))
+
+    # EWMA (초기값 μ₀, NaN은 건너뛰도록 ignore_na 사용)
+    seeded = pd.concat([pd.DataFrame([target]), x], ignore_index=True)
+    ewma = seeded.ewm(alpha=lam, adjust=False, ignore_na=True).mean().to_numpy()[1:]
+
+    # CUSUM (NaN 구간은 증분 0 -> 상태 유지)
+    z = ((x.to_numpy() - target) / sigma)
+    step_pos = np.nan_to_num(z - k, nan=0.0)
+    step_neg = np.nan_to_num(-z - k, nan=0.0)
+    s_pos = np.cumsum(step_pos, axis=0)
+    s_neg = np.cumsum(step_neg, axis=0)
+    cusum_pos = s_pos - np.minimum(0.0, np.minimum.accumulate(s_pos, axis=0))
+    cusum_neg = s_neg - np.minimum(0.0, np.minimum.accumulate(s_neg, axis=0))
+
+    ewma_width = L * sigma * np.sqrt(lam / (2.0 - lam))
+    return {
+        'ewma': ewma,
+        'cusum_pos': cusum_pos,
+        'cusum_neg': cusum_neg,
+        'ewma_alarm': np.abs(ewma - target) > ewma_width,
+        'cusum_alarm': (cusum_pos > h) | (cusum_neg > h)
+    }
@@ -0,0 +1,95 @@
+# utils/sigma_limits.py
+import numpy as np
+import pandas as pd
+
+class SigmaLimitTable:
+    """
+    [몰드, 변수] -> (하한, 상한) 3시그마 관리한계 조회 테이블
+
+    로드 시점에 DataFrame을 (몰드 수 x 변수 수) 크기의 dense 배열 두 개로 컴파일해 두고,
+    조회는 인덱스 접근만 하며 한 레코드의 전체 변수 판정도 벡터 연산 한 번으로 처리합니다.
+    한계가 없는 칸은 NaN입니다.
+    """
+
+    def __init__(self, mold_codes, variables, lower, upper):
+        self.mold_codes = list(mold_codes)
+        self.variables = list(variables)
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self._mold_index = {code: i for i, code in enumerate(self.mold_codes)}
+        self._variable_index = {var: j for j, var in enumerate(self.variables)}
+
+    @classmethod
+    def from_dataframe(cls, sigma_df, mold_codes, variables,
+                       lower_column='lower_3', upper_column='upper_3'):
+        """mold_code / variable / 하한 / 상한 컬럼을 가진 DataFrame에서 테이블 생성"""
+        shape = (len(mold_codes), len(variables))
+        lower = np.full(shape, np.nan)
+        upper = np.full(shape, np.nan)
+        table = cls(mold_codes, variables, lower, upper)
+
+        if sigma_df is None or sigma_df.empty:
+            return table
+
+        rows = pd.to_numeric(sigma_df['mold_code'], errors='coerce').map(table._mold_index)
+        cols = sigma_df['variable'].map(table._variable_index)
+        valid = rows.notna() & cols.notna()
+
+        rows = rows[valid].astype(np.intp).to_numpy()
+        cols = cols[valid].astype(np.intp).to_numpy()
+        # 중복 행은 첫 번째 값을 사용 (역순으로 기록해 앞의 값이 남도록)
+        table.lower[rows[::-1], cols[::-1]] = sigma_df.loc[valid, lower_column].to_numpy(dtype=np.float64)[::-1]
+        table.upper[rows[::-1], cols[::-1]] = sigma_df.loc[valid, upper_column].to_numpy(dtype=np.float64)[::-1]
+        return table
+
+    @property
+    def empty(self):
+        return not np.isfinite(self.lower).any()
+
+    def available_molds(self):
+        """관리한계가 하나 이상 있는 몰드 코드 목록"""
+        has_limits = np.isfinite(self.lower).any(axis=1)
+        return [code for code, present in zip(self.mold_codes, has_limits) if present]
+
+    def limits(self, mold_code, variable):
+        """단일 (몰드, 변수)의 (하한, 상한), 없으면 (None, None)"""
+        i = self._mold_index.get(mold_code)
+        j = self._variable_index.get(variable)
+        if i is None or j is None:
+            return None, None
+        lower, upper = self.lower[i, j], self.upper[i, j]
+        if np.isnan(lower) or np.isnan(upper):
+            return None, None
+        return float(lower), float(upper)
+
+    def mold_limits(self, mold_code):
+        """몰드 하나의 전체 변수 (하한 배열, 상한 배열), 알 수 없는 몰드는 NaN 배열"""
+        i = self._mold_index.get(mold_code)
+        if i is None:
+            nan_row = np.full(len(self.variables), np.nan)
+            return nan_row, nan_row
+        return self.lower[i], self.upper[i]
+
+    def check(self, mold_code, values):
+        """
+        변수 순서대로 정렬된 값 배열을 한 번에 판정
+
+        Returns:
+            (하한 미달 마스크, 상한 초과 마스크) - 한계나 값이 NaN이면 둘 다 False
+        """
+        lower, upper = self.mold_limits(mold_code)
+        values = np.asarray(values, dtype=np.float64)
+        return values < lower, values > upper
+
+if __name__ == "__main__":
+    # 배치 작업: python -m utils.sigma_limits --days 30
+    import argparse
+    from utils.data_utils import compute_sigma_limits
+    from variables.monitoring import MONITORING_VARIABLES
+
+    parser = argparse.ArgumentParser(description="sensor_data 기반 몰드별 3시그마 관리한계 계산")
+    parser.add_argument("--days", type=int, default=30, help="집계 기간(일)")
+    args = parser.parse_args()
+
+    version = compute_sigma_limits(list(MONITORING_VARIABLES.keys()), args.days)
+    print(f"관리한계 버전: {version}" if version is not None else "관리한계 계산 실패")
@@ -0,0 +1,19 @@
+# variables/molds.py
+
+# 공정에서 사용하는 금형 코드 (LabelEncoder 인코딩 순서와 동일)
+MOLD_CODES = [8412, 8573, 8600, 8722, 8917]
+
+# test.py 전처리에서 인코딩된 라벨(0~4) -> 실제 금형 코드
+MOLD_LABEL_TO_CODE = {label: code for label, code in enumerate(MOLD_CODES)}
+
+def normalize_mold_code(value):
+    """인코딩 라벨/실제 코드/문자열 어떤 형태든 실제 금형 코드로 변환 (알 수 없으면 None)"""
+    if value is None:
+        return None
+    try:
+        numeric = int(float(str(value)))
+    except (ValueError, TypeError):
+        return None
+    if numeric in MOLD_CODES:
+        return numeric
+    return MOLD_LABEL_TO_CODE.get(numeric)
@@ -0,0 +1,15 @@
+# variables/monitoring.py
+
+# 모니터링할 변수 정의
+MONITORING_VARIABLES = {
+    'molten_temp': {'label': '용탕온도', 'unit': '°C'},
+    'sleeve_temperature': {'label': '슬리브온도', 'unit': '°C'}, 
+    'upper_mold_temp1': {'label': '상형온도1', 'unit': '°C'},
+    'upper_mold_temp2': {'label': '상형온도2', 'unit': '°C'},
+    'lower_mold_temp1': {'label': '하형온도1', 'unit': '°C'},
+    'lower_mold_temp2': {'label': '하형온도2', 'unit': '°C'},
+    'cast_pressure': {'label': '주조압력', 'unit': 'bar'},
+    'low_section_speed': {'label': '저속구간속도', 'unit': 'm/s'},
+    'high_section_speed': {'label': '고속구간속도', 'unit': 'm/s'},
+    'Coolant_temperature': {'label': '냉각수온도', 'unit': '°C'}
+}